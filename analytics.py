@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Історія оброблених статей у колонковому сховищі та тижнева аналітика
+
+Конвеєр додає по рядку на статтю; кожен запуск пише окремий стиснутий
+npz-фрагмент у data/history, фрагменти закритих місяців зливаються в один.
+Рядкові колонки (джерело, мова) кодуються словником у межах фрагмента.
+
+    python analytics.py              # звіт за останні 4 тижні
+    python analytics.py --weeks 12
+"""
+
+import argparse
+import hashlib
+import logging
+import pathlib
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = 'data/history'
+
+# Куди дійшла стаття (коди зберігаються у файлах - лише дописувати)
+PUBLISHED = 0
+DROPPED_CLASSIFY = 1
+DROPPED_PROCESS = 2
+DEFERRED = 3
+DROPPED_PUBLISH = 4
+FAILED = 5
+PENDING = 255
+OUTCOMES = ['published', 'classify', 'process', 'deferred', 'publish', 'error']
+
+# Категорії ключових слів (біт = позиція; лише дописувати)
+CATEGORIES = {
+    'ukraine': r'ukrain|україн',
+    'status_s': r'(schutz)?stat(us|ut)\s?-?s\b|статус[\s-]?s',
+    'vote': r'abstimmung|votation|référendum|referendum|\bvote\b|голосуван|референдум',
+    'refugees': r'flüchtling|geflüchtet|réfugié|refugee|біженц',
+    'asylum': r'\basyl|\basile|asylum|притул',
+    'aid': r'humanit|\bhilfe\b|\baide?\b|допомог|гуманітар',
+    'integration': r'integration|intégration|accueil|aufenthalt|protection|shelter',
+}
+_CATEGORY_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in CATEGORIES.values()]
+
+COLUMNS = ['run', 'url', 'source', 'language', 'categories', 'relevance',
+           'fetched', 'outcome', 'published', 'delivered']
+WEEK = 7 * 86400
+# 1970-01-01 - четвер: зсув, щоб тижні починались з понеділка
+WEEK_OFFSET = 3 * 86400
+
+
+def categories_of(text: str) -> int:
+    """Бітова маска категорій ключових слів у тексті"""
+    mask = 0
+    for bit, pattern in enumerate(_CATEGORY_PATTERNS):
+        if pattern.search(text):
+            mask |= 1 << bit
+    return mask
+
+
+def url_key(url: str) -> int:
+    """64-бітний ключ URL (повторні спроби статті зводяться до останньої)"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class ArticleHistory:
+    """
+    Накопичує рядки запуску в пам'яті (звичайні списки - numpy
+    потрібен лише при збереженні) і пише їх одним фрагментом
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR, run_started: Optional[float] = None):
+        self.directory = pathlib.Path(directory)
+        self.run = int(run_started or time.time())
+        self.rows: List[list] = []
+        self._by_url: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def record(self, article, outcome: int = PENDING):
+        """Додає статтю (PENDING - результат уточнить resolve після публікації)"""
+        published = int(article.published_date.timestamp()) if article.published_date else 0
+        row = [0, url_key(article.url), article.source, article.language or 'unknown',
+               categories_of(f"{article.title} {article.description}"),
+               min(article.relevance or 0, 255), bool(article.full_text), outcome, published, 0]
+        with self._lock:
+            row[0] = self.run
+            self._by_url[article.url] = len(self.rows)
+            self.rows.append(row)
+
+    def record_delivery(self, data: dict, outcome: int, delivered: Optional[float] = None):
+        """
+        Додає статтю, відкладену минулим запуском уже після обробки: рядок
+        будується з даних для публікації, а звіт лишає лише цю, останню спробу
+        """
+        published = int(datetime.fromisoformat(data['published']).timestamp()) if data.get('published') else 0
+        text = f"{data.get('original_title') or data.get('title', '')} {data.get('original_description') or ''}"
+        row = [0, url_key(data['url']), data.get('source', ''),
+               data.get('original_language') or 'unknown', categories_of(text), 0,
+               bool(data.get('full_text')), outcome, published, int(delivered or 0)]
+        with self._lock:
+            row[0] = self.run
+            self.rows.append(row)
+
+    def resolve(self, url: str, outcome: int, delivered: Optional[float] = None):
+        """Фіксує результат публікації статті"""
+        with self._lock:
+            index = self._by_url.get(url)
+            if index is None:
+                return
+            self.rows[index][7] = outcome
+            if delivered:
+                self.rows[index][9] = int(delivered)
+
+    def start_run(self, started: Optional[float] = None):
+        """Наступні статті належать новому запуску (тривалий режим: фрагмент на інтервал)"""
+        with self._lock:
+            self.run = int(started or time.time())
+
+    def save(self, keep_pending: bool = False):
+        """
+        Пише фрагмент запуску та зливає фрагменти закритих місяців
+
+        Args:
+            keep_pending: Статті, що ще публікуються (PENDING), лишаються в
+                пам'яті до наступного збереження - їх resolve ще прийде
+        """
+        with self._lock:
+            if keep_pending:
+                pending = [row for row in self.rows if row[7] == PENDING]
+                positions = {id(row): index for index, row in enumerate(pending)}
+                rows = [row for row in self.rows if row[7] != PENDING]
+                self._by_url = {url: positions[id(self.rows[index])]
+                                for url, index in self._by_url.items() if id(self.rows[index]) in positions}
+                self.rows = pending
+            else:
+                rows, self.rows = self.rows, []
+                self._by_url = {}
+            run = self.run
+        if not rows:
+            return
+        import numpy as np
+
+        columns = list(zip(*rows))
+        sources, source_codes = np.unique(np.array(columns[2], dtype=str), return_inverse=True)
+        languages, language_codes = np.unique(np.array(columns[3], dtype=str), return_inverse=True)
+        outcome = np.array(columns[7], dtype=np.uint8)
+        # Статті без результату публікації (збій, дедлайн) - не опубліковані
+        outcome[outcome == PENDING] = DROPPED_PUBLISH
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.fromtimestamp(run, timezone.utc).strftime('%Y%m%d-%H%M%S')
+        write_chunk(self.directory / f'run-{stamp}.npz', {
+            'run': np.array(columns[0], dtype=np.int64),
+            'url': np.array(columns[1], dtype=np.uint64),
+            'source': source_codes.astype(np.uint16),
+            'language': language_codes.astype(np.uint8),
+            'categories': np.array(columns[4], dtype=np.uint16),
+            'relevance': np.array(columns[5], dtype=np.uint8),
+            'fetched': np.array(columns[6], dtype=bool),
+            'outcome': outcome,
+            'published': np.array(columns[8], dtype=np.int64),
+            'delivered': np.array(columns[9], dtype=np.int64),
+        }, sources, languages)
+        logger.info(f"📈 Історія: записано {len(rows)} статей")
+        compact(self.directory)
+
+
+def write_chunk(path: pathlib.Path, columns: dict, sources, languages):
+    import numpy as np
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, sources=sources, languages=languages, **columns)
+    tmp.replace(path)
+
+
+def compact(directory: pathlib.Path):
+    """Зливає фрагменти запусків кожного закритого місяця в month-YYYYMM.npz"""
+    current = datetime.now(timezone.utc).strftime('%Y%m')
+    months = defaultdict(list)
+    for path in directory.glob('run-*.npz'):
+        month = path.name[4:10]
+        if month < current:
+            months[month].append(path)
+    for month, paths in months.items():
+        target = directory / f'month-{month}.npz'
+        if target.exists():
+            paths.append(target)
+        table = load_history(paths)
+        write_chunk(target, {name: table[name] for name in COLUMNS},
+                    table['sources'], table['languages'])
+        for path in paths:
+            if path != target:
+                path.unlink()
+        logger.info(f"📦 Історія: {len(paths)} фрагментів за {month} злито в {target.name}")
+
+
+def load_history(paths: Optional[List[pathlib.Path]] = None, directory: str = HISTORY_DIR,
+                 since: Optional[int] = None) -> dict:
+    """
+    Читає фрагменти в одну таблицю {колонка: масив}
+
+    Коди джерел і мов фрагментів перекодовуються в спільні словники
+    'sources' та 'languages'.
+    """
+    import numpy as np
+
+    if paths is None:
+        paths = sorted(pathlib.Path(directory).glob('*.npz'))
+        if since is not None:
+            # Назви фрагментів містять дату: старі файли навіть не відкриваються
+            day = datetime.fromtimestamp(since, timezone.utc).strftime('%Y%m%d')
+            paths = [path for path in paths
+                     if (path.name[6:12] >= day[:6] if path.name.startswith('month-')
+                         else path.name[4:12] >= day)]
+    chunks = []
+    for path in paths:
+        with np.load(path) as data:
+            chunk = {name: data[name] for name in COLUMNS + ['sources', 'languages']}
+        if since is not None and chunk['run'].size and chunk['run'].max() < since:
+            continue
+        chunks.append(chunk)
+
+    sources = np.unique(np.concatenate([c['sources'] for c in chunks] or [np.array([], dtype=str)]))
+    languages = np.unique(np.concatenate([c['languages'] for c in chunks] or [np.array([], dtype=str)]))
+    table = {'sources': sources, 'languages': languages}
+    for name in COLUMNS:
+        parts = []
+        for chunk in chunks:
+            column = chunk[name]
+            if name == 'source':
+                column = np.searchsorted(sources, chunk['sources'])[column].astype(np.uint16)
+            elif name == 'language':
+                column = np.searchsorted(languages, chunk['languages'])[column].astype(np.uint8)
+            parts.append(column)
+        table[name] = np.concatenate(parts) if parts else np.array([], dtype=np.int64)
+    if since is not None and table['run'].size:
+        keep = table['run'] >= since
+        for name in COLUMNS:
+            table[name] = table[name][keep]
+    return table
+
+
+def weekly_report(table: dict) -> List[dict]:
+    """
+    Агрегати по тижнях (векторно): збіги за джерелами, категорії,
+    мови, затримка публікації, частка відкинутих на кожному етапі.
+    Повторні спроби статті (відкладені) рахуються один раз - за останньою.
+    """
+    import numpy as np
+
+    if not table['run'].size:
+        return []
+    # Повторно трапляються лише відкладені статті: серед них лишаємо останню
+    # спробу кожного URL (сортувати всю таблицю за URL не потрібно)
+    urls = table['url']
+    retried = np.unique(urls[table['outcome'] == DEFERRED])
+    if retried.size:
+        repeated = np.flatnonzero(np.isin(urls, retried))
+        latest = repeated[np.argsort(table['run'][repeated], kind='stable')[::-1]]
+        _, first = np.unique(urls[latest], return_index=True)
+        keep = np.ones(urls.size, dtype=bool)
+        keep[repeated] = False
+        keep[latest[first]] = True
+        rows = np.flatnonzero(keep)
+    else:
+        rows = np.arange(urls.size)
+
+    week = (table['run'][rows] + WEEK_OFFSET) // WEEK
+    weeks, week_index = np.unique(week, return_inverse=True)
+    n_weeks = len(weeks)
+    n_sources, n_languages = len(table['sources']), len(table['languages'])
+
+    totals = np.bincount(week_index, minlength=n_weeks)
+    by_source = np.bincount(week_index * n_sources + table['source'][rows],
+                            minlength=n_weeks * n_sources).reshape(n_weeks, n_sources)
+    by_language = np.bincount(week_index * n_languages + table['language'][rows],
+                              minlength=n_weeks * n_languages).reshape(n_weeks, n_languages)
+    outcome = table['outcome'][rows].astype(np.int64)
+    by_outcome = np.bincount(week_index * len(OUTCOMES) + outcome,
+                             minlength=n_weeks * len(OUTCOMES)).reshape(n_weeks, len(OUTCOMES))
+    categories = table['categories'][rows]
+    by_category = np.stack([np.bincount(week_index, weights=(categories >> bit) & 1, minlength=n_weeks)
+                            for bit in range(len(CATEGORIES))], axis=1).astype(np.int64)
+
+    # Затримки, згруповані за тижнями (одне сортування замість маски на тиждень)
+    published, delivered = table['published'][rows], table['delivered'][rows]
+    has_lag = (delivered > 0) & (published > 0)
+    lag_weeks = week_index[has_lag]
+    order = np.argsort(lag_weeks, kind='stable')
+    lag_minutes = ((delivered - published)[has_lag] / 60)[order]
+    week_lags = np.split(lag_minutes, np.searchsorted(lag_weeks[order], np.arange(1, n_weeks)))
+
+    report = []
+    for i, week_number in enumerate(weeks):
+        lags = week_lags[i]
+        start = datetime.fromtimestamp(int(week_number) * WEEK - WEEK_OFFSET, timezone.utc)
+        report.append({
+            'week': start.date().isoformat(),
+            'articles': int(totals[i]),
+            'sources': {str(table['sources'][s]): int(by_source[i, s])
+                        for s in np.argsort(by_source[i])[::-1] if by_source[i, s]},
+            'categories': {name: int(by_category[i, c]) for c, name in enumerate(CATEGORIES)},
+            'languages': {str(table['languages'][l]): int(by_language[i, l])
+                          for l in range(n_languages) if by_language[i, l]},
+            'lag_median': float(np.median(lags)) if lags.size else None,
+            'lag_p90': float(np.percentile(lags, 90)) if lags.size else None,
+            'outcomes': {name: float(by_outcome[i, o] / totals[i]) for o, name in enumerate(OUTCOMES)},
+        })
+    return report
+
+
+def print_report(report: List[dict], top_sources: int = 5):
+    for week in report:
+        print(f"\n📅 Тиждень з {week['week']}: статей {week['articles']}")
+        sources = list(week['sources'].items())[:top_sources]
+        print("   Джерела: " + ', '.join(f"{name} {count}" for name, count in sources))
+        print("   Категорії: " + ', '.join(f"{name} {count}" for name, count in week['categories'].items()
+                                          if count))
+        print("   Мови: " + ', '.join(f"{name} {count}" for name, count in week['languages'].items()))
+        if week['lag_median'] is not None:
+            print(f"   Затримка публікації: медіана {week['lag_median']:.0f} хв, "
+                  f"90% - {week['lag_p90']:.0f} хв")
+        print("   Результат: " + ', '.join(f"{name} {share:.0%}" for name, share in week['outcomes'].items()
+                                         if share))
+
+
+def main():
+    arguments = argparse.ArgumentParser(description="Тижнева аналітика оброблених статей")
+    arguments.add_argument('--weeks', type=int, default=4)
+    arguments.add_argument('--directory', default=HISTORY_DIR)
+    options = arguments.parse_args()
+
+    started = time.perf_counter()
+    since = int(time.time()) - options.weeks * WEEK
+    table = load_history(directory=options.directory, since=since)
+    report = weekly_report(table)
+    elapsed = time.perf_counter() - started
+
+    print("📊 Аналітика оброблених статей")
+    print("=" * 60)
+    if not report:
+        print(f"Немає історії в {options.directory}")
+        return
+    print_report(report[-options.weeks:])
+    print(f"\n⏱️ {len(table['run'])} записів оброблено за {elapsed * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Архів опублікованих статей з інвертованим індексом для пошуку"""
+
+import json
+import logging
+import os
+import pathlib
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Слова довші за це обрізаються до основи: "біженців" і "біженці",
+# "Flüchtlinge" і "Flüchtling" потрапляють в один термін
+STEM_LENGTH = 6
+MIN_TERM_LENGTH = 2
+
+WORD_RE = re.compile(r'\w+')
+
+RECORD_FIELDS = ('title', 'summary', 'url', 'source', 'original_language',
+                 'original_title', 'original_description', 'published')
+
+
+def terms_of(text: str) -> List[str]:
+    """Нормалізовані терміни тексту (нижній регістр, обрізані основи)"""
+    terms = []
+    for word in WORD_RE.findall(text.casefold()):
+        if len(word) >= MIN_TERM_LENGTH:
+            terms.append(word[:STEM_LENGTH])
+    return terms
+
+
+class ArticleArchive:
+    """
+    Архів у форматі JSON Lines лише з дописуванням. Індекс (терм → номери
+    записів, зміщення записів у файлі) зберігається окремо і при
+    завантаженні доповнюється записами, яких у ньому ще немає.
+    """
+
+    def __init__(self, path: str = 'data/archive.jsonl',
+                 index_path: str = 'data/archive_index.json'):
+        self.path = pathlib.Path(path)
+        self.index_path = pathlib.Path(index_path)
+        self.offsets = []
+        self.urls = set()
+        self.terms = {}
+        self.indexed_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+        self._catch_up()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.index_path}, індекс буде перебудовано: {e}")
+            return
+        self.offsets = data['offsets']
+        self.urls = set(data['urls'])
+        self.terms = data['terms']
+        self.indexed_bytes = data['indexed_bytes']
+
+    def _catch_up(self):
+        """Індексує записи, дописані після останнього збереження індексу"""
+        if not self.path.exists():
+            return
+        size = self.path.stat().st_size
+        if size < self.indexed_bytes:
+            # Архів замінено - індекс неактуальний
+            self.offsets, self.urls, self.terms, self.indexed_bytes = [], set(), {}, 0
+        if size == self.indexed_bytes:
+            return
+
+        added = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.indexed_bytes)
+            offset = self.indexed_bytes
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Запис ще дописується (або обірваний) - файл не чіпаємо,
+                    # наступний прохід продовжить з цього місця
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    offset += len(line)
+                    continue
+                self._index(record, offset)
+                offset += len(line)
+                added += 1
+        self.indexed_bytes = offset
+        if added:
+            logger.info(f"Проіндексовано {added} нових записів архіву")
+
+    def _repair_tail(self):
+        """
+        Відрізає обірваний останній запис перед дописуванням (лише запис під
+        self._lock - читачі файл не змінюють)
+        """
+        self._catch_up()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if size > self.indexed_bytes:
+            # Обірваний запис попереднього запуску - інакше склеївся б з новим
+            logger.warning(f"Відрізано недописаний запис архіву ({size - self.indexed_bytes} байт)")
+            os.truncate(self.path, self.indexed_bytes)
+
+    def _index(self, record: dict, offset: int):
+        doc_id = len(self.offsets)
+        self.offsets.append(offset)
+        self.urls.add(record['url'])
+        text = ' '.join(record.get(field) or '' for field in
+                        ('title', 'summary', 'original_title', 'original_description', 'source'))
+        for term in set(terms_of(text)):
+            self.terms.setdefault(term, []).append(doc_id)
+
+    def refresh(self):
+        """Підхоплює записи, дописані іншим процесом (основним запуском)"""
+        with self._lock:
+            self._catch_up()
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.urls
+
+    def add(self, data: dict) -> bool:
+        """
+        Дописує оброблену статтю в архів
+
+        Args:
+            data: Дані для публікації (title, summary, url, source, original_language,
+                  original_title, original_description, published)
+
+        Returns:
+            False, якщо URL вже є в архіві
+        """
+        record = {field: data.get(field) for field in RECORD_FIELDS}
+        record['archived_at'] = datetime.now(pytz.UTC).isoformat(timespec='seconds')
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._lock:
+            if record['url'] in self.urls:
+                return False
+            self._repair_tail()
+            if record['url'] in self.urls:
+                return False
+            self.path.parent.mkdir(exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(line)
+            self._index(record, offset)
+            self.indexed_bytes = offset + len(line)
+        return True
+
+    def save(self):
+        """Зберігає індекс (архів записується одразу при додаванні)"""
+        with self._lock:
+            data = {
+                'indexed_bytes': self.indexed_bytes,
+                'offsets': self.offsets,
+                'urls': sorted(self.urls),
+                'terms': self.terms
+            }
+            tmp = self.index_path.with_suffix('.tmp')
+            self.index_path.parent.mkdir(exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')),
+                           encoding='utf-8')
+            os.replace(tmp, self.index_path)
+
+    def _read(self, doc_ids: List[int]) -> List[dict]:
+        records = []
+        with open(self.path, 'rb') as f:
+            for doc_id in doc_ids:
+                f.seek(self.offsets[doc_id])
+                records.append(json.loads(f.readline()))
+        return records
+
+    def search(self, query: str, limit: int = 5) -> List[dict]:
+        """Статті, що містять усі слова запиту (найновіші першими)"""
+        query_terms = set(terms_of(query))
+        if not query_terms:
+            return []
+        with self._lock:
+            postings = [self.terms.get(term) for term in query_terms]
+            if not all(postings):
+                return []
+            postings.sort(key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches.intersection_update(posting)
+            doc_ids = sorted(matches, reverse=True)[:limit]
+            return self._read(doc_ids)
+
+    def latest(self, limit: int = 5) -> List[dict]:
+        """Останні додані статті"""
+        with self._lock:
+            doc_ids = list(range(len(self.offsets) - 1, max(-1, len(self.offsets) - 1 - limit), -1))
+            return self._read(doc_ids) if doc_ids else []
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'articles': len(self.offsets), 'terms': len(self.terms),
+                    'bytes': self.indexed_bytes}
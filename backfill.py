@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Бекфіл: повторна обробка архівованих стрічок і сторінок за минулі тижні
+
+Для нового каналу чи змінених ключових слів. Каталог знімків:
+
+    feeds/<джерело>/*.xml        збережені RSS/Atom стрічки (назви файлів довільні)
+    pages/<snapshot_name(url)>   збережені HTML сторінки статей
+
+Стрічки розбираються на всіх ядрах, дублікати між знімками відкидаються,
+заголовки й описи перекладаються спільними пакетами. Результат іде в
+архів або в чергу публікації, яку main_mvp.py публікує потроху
+(BACKFILL_PUBLISH_PER_RUN за запуск), - а не в канал одразу.
+
+    python backfill.py snapshots --days 28                        # в архів
+    python backfill.py snapshots --subscription new --output queue
+    python backfill.py snapshots --capture                        # дописати знімки
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import pathlib
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import feedparser
+import pytz
+import requests
+
+import main_mvp
+from archive import ArticleArchive
+from cpu_pool import CpuPool
+from deadline import BACKFILL_QUEUE, DeferredQueue
+from host_health import HostHealthRegistry
+from langid import identify_batch
+from llm_budget import BudgetExceeded, TokenBudget, rank_articles
+from parser import (KEYWORDS, LIST_RSS, STREAM_FEED_BYTES, Article, NewsParser, clean_text,
+                    entry_timestamp)
+from state_backend import SeenStore, shared_backend
+from stream_feed import iter_entries
+from subscriptions import SubscriptionRegistry
+
+logger = logging.getLogger(__name__)
+
+FEED_SUFFIXES = ('.xml', '.rss', '.atom')
+DEFAULT_DAYS = 28
+
+ARCHIVE = 'archive'
+QUEUE = 'queue'
+
+
+def snapshot_name(url: str) -> str:
+    """Ім'я файлу знімка сторінки статті в pages/"""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html'
+
+
+class SnapshotTransport:
+    """Віддає збережені сторінки замість мережевих запитів (404 - знімка немає)"""
+
+    def __init__(self, pages: pathlib.Path):
+        self.pages = pages
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.url = url
+        path = self.pages / snapshot_name(url)
+        if path.is_file():
+            response.status_code = 200
+            response._content = path.read_bytes()
+        else:
+            response.status_code = 404
+            response._content = b''
+        return response
+
+
+def find_feeds(directory: pathlib.Path) -> List[Tuple[str, str]]:
+    """(шлях знімка, джерело) усіх збережених стрічок"""
+    return [(str(path), path.parent.name) for path in sorted((directory / 'feeds').rglob('*'))
+            if path.suffix in FEED_SUFFIXES and path.is_file()]
+
+
+def scan_feed(task: tuple) -> Tuple[int, list]:
+    """
+    Релевантні записи одного знімка стрічки у вікні часу (виконується у пулі)
+
+    Мова визначається пакетом для всіх кандидатів знімка одразу.
+
+    Returns:
+        (записів у знімку, [(url, заголовок, опис, час, мова, [підписки], сила збігу)])
+    """
+    path, source, registry, since, until = task
+    content = pathlib.Path(path).read_bytes()
+    if len(content) < STREAM_FEED_BYTES:
+        entries = feedparser.parse(content).entries
+    else:
+        entries = iter_entries(content, cutoff=since)
+
+    total = 0
+    candidates = []
+    for entry in entries:
+        total += 1
+        published = entry_timestamp(entry)
+        if published is None or not since <= published < until:
+            continue
+        title = clean_text(entry.get('title', ''))
+        description = clean_text(entry.get('summary', ''))
+        url = entry.get('link', '')
+        if title and url and registry.prefilter.search(f"{title} {description}"):
+            candidates.append((url, title, description, published))
+
+    found = []
+    languages = identify_batch([f"{title} {description}" for _, title, description, _ in candidates])
+    for (url, title, description, published), language in zip(candidates, languages):
+        text = f"{title} {description}"
+        subscriptions = registry.match(text, language)
+        if subscriptions:
+            found.append((url, title, description, published, language,
+                          [sub.name for sub in subscriptions], registry.score(text)))
+    return total, found
+
+
+def capture(directory: pathlib.Path, feeds: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+    """
+    Дописує знімки поточних стрічок і ще не збережених сторінок їхніх записів
+
+    Returns:
+        (збережено стрічок, збережено сторінок)
+    """
+    from http_client import shared_transport
+
+    transport = shared_transport()
+    stamp = datetime.now(pytz.UTC).strftime('%Y%m%d-%H%M%S')
+    pages = directory / 'pages'
+    pages.mkdir(parents=True, exist_ok=True)
+    saved_feeds = saved_pages = 0
+    for source, feed_url in (feeds or LIST_RSS).items():
+        try:
+            response = transport.get(feed_url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Не вдалося зберегти стрічку {source}: {e}")
+            continue
+        target = directory / 'feeds' / source / f'{stamp}.xml'
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(response.content)
+        saved_feeds += 1
+
+        for entry in feedparser.parse(response.content).entries:
+            url = entry.get('link')
+            if not url or (pages / snapshot_name(url)).exists():
+                continue
+            try:
+                page = transport.get(url, timeout=15)
+                page.raise_for_status()
+            except requests.RequestException as e:
+                logger.warning(f"Не вдалося зберегти сторінку {url}: {e}")
+                continue
+            (pages / snapshot_name(url)).write_bytes(page.content)
+            saved_pages += 1
+    return saved_feeds, saved_pages
+
+
+class Backfill:
+    """
+    Знімки → розбір стрічок у пулі процесів → дедуплікація → повний текст
+    зі знімків сторінок → пакетний переклад → синопсиси → архів або черга
+    """
+
+    def __init__(self, directory: pathlib.Path, registry: SubscriptionRegistry,
+                 since: float, until: float, output: str = ARCHIVE, llm: bool = True,
+                 cpu_pool: Optional[CpuPool] = None):
+        self.directory = directory
+        self.registry = registry
+        self.since = since
+        self.until = until
+        self.output = output
+        self.llm = llm
+        self.cpu_pool = cpu_pool or CpuPool.from_env()
+        self.archive = ArticleArchive()
+        self.queue = DeferredQueue(BACKFILL_QUEUE)
+        self.stats = defaultdict(float)
+
+    def _timed(self, phase: str, started: float):
+        self.stats[f'{phase}_seconds'] += time.perf_counter() - started
+
+    def scan(self) -> List[Article]:
+        """Кандидати з усіх знімків стрічок без дублікатів і вже опрацьованого"""
+        started = time.perf_counter()
+        feeds = find_feeds(self.directory)
+        tasks = [(path, source, self.registry, self.since, self.until) for path, source in feeds]
+        chunksize = max(1, len(tasks) // (max(self.cpu_pool.workers, 1) * 4))
+
+        by_name = {sub.name: sub for sub in self.registry.subscriptions}
+        # Канал не отримує статтю вдруге - перевіряємо його журнал публікацій
+        published = {name: SeenStore(shared_backend(), sub.seen_namespace)
+                     for name, sub in by_name.items()} if self.output == QUEUE else {}
+        # ...і чергу попереднього бекфілу, що ще не опублікована
+        queued = {(item['subscription'], item['data']['url'])
+                  for item in self.queue.ready} if self.output == QUEUE else set()
+        articles = {}
+        for (path, source), (total, found) in zip(feeds, self.cpu_pool.map(scan_feed, tasks, chunksize)):
+            self.stats['snapshots'] += 1
+            self.stats['entries'] += total
+            for url, title, description, timestamp, language, names, relevance in found:
+                self.stats['matched'] += 1
+                if url in articles:
+                    continue
+                if self.output == ARCHIVE and url in self.archive:
+                    self.stats['already_done'] += 1
+                    continue
+                subscriptions = [by_name[name] for name in names
+                                 if name in by_name and url not in published.get(name, ())
+                                 and (name, url) not in queued]
+                if not subscriptions:
+                    self.stats['already_done'] += 1
+                    continue
+                article = Article(title, description, url, source,
+                                  datetime.fromtimestamp(timestamp, pytz.UTC), language=language)
+                article.subscriptions = subscriptions
+                article.is_ukraine_related = True
+                article.relevance = relevance
+                articles[url] = article
+        self._timed('scan', started)
+        self.stats['articles'] = len(articles)
+        return sorted(articles.values(), key=lambda article: article.published_date)
+
+    def fetch(self, articles: List[Article]):
+        """Повний текст зі знімків сторінок (розбір у пулі процесів)"""
+        started = time.perf_counter()
+        parser = NewsParser(transport=SnapshotTransport(self.directory / 'pages'),
+                            subscriptions=self.registry, cpu_pool=self.cpu_pool)
+        # Стан живих хостів не стосується знімків і не зберігається
+        parser.host_health = HostHealthRegistry(str(self.directory / 'host_health.json'))
+        with ThreadPoolExecutor(max_workers=max(2, self.cpu_pool.workers * 2)) as executor:
+            texts = list(executor.map(parser.fetch_full_text, articles))
+        self.stats['pages'] = sum(1 for text in texts if text)
+        self._timed('fetch', started)
+
+    def _translate_batches(self, articles: List[Article], translator) -> Dict[str, tuple]:
+        """Заголовки й описи всіх статей однієї мови - спільними пакетами речень"""
+        by_language = defaultdict(list)
+        for article in articles:
+            if any(sub.translate for sub in article.subscriptions):
+                by_language[article.language].append(article)
+
+        translated = {}
+        for language, group in by_language.items():
+            texts = [article.title for article in group] + [article.description for article in group]
+            try:
+                results = translator.translate_many(texts, language)
+            except BudgetExceeded as e:
+                logger.warning(f"💸 {e} - решта статей перекладається окремо або публікується в оригіналі")
+                break
+            for article, title_ua, description_ua in zip(group, results, results[len(group):]):
+                if title_ua:
+                    translated[article.url] = (title_ua, description_ua)
+        return translated
+
+    def process(self, articles: List[Article], translator, summarizer) -> List[tuple]:
+        """Переклад і синопсиси; (підписка, дані для публікації) у порядку статей"""
+        started = time.perf_counter()
+        translated = self._translate_batches(articles, translator) if self.llm else {}
+
+        def process_one(article: Article) -> list:
+            # Повний текст перекладає process_article - після перевірки бюджету
+            cache = {}
+            if article.url in translated:
+                cache['headline'] = translated[article.url]
+            try:
+                return main_mvp.process_for_subscriptions(article, translator, summarizer,
+                                                          llm=self.llm, cache=cache) or []
+            except Exception as e:
+                logger.error(f"❌ Помилка обробки {article.url}: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=main_mvp.PROCESS_WORKERS) as executor:
+            deliveries = [delivery for result in executor.map(process_one, articles)
+                          for delivery in result]
+        self.stats['processed'] = len(articles)
+        self._timed('process', started)
+        return deliveries
+
+    def write(self, deliveries: List[tuple]) -> int:
+        """Архів або черга публікації; повертає кількість записаних"""
+        written = 0
+        for sub, data in deliveries:
+            if self.output == QUEUE:
+                self.queue.defer_delivery(sub.name, data)
+                written += 1
+            elif self.archive.add(data):
+                written += 1
+        self.queue.save()
+        self.archive.save()
+        self.stats['written'] = written
+        return written
+
+    def run(self, translator=None, summarizer=None) -> dict:
+        started = time.perf_counter()
+        try:
+            articles = self.scan()
+            logger.info(f"📚 Знімків: {self.stats['snapshots']:.0f}, записів: {self.stats['entries']:.0f}, "
+                        f"статей до обробки: {len(articles)}")
+            if translator is not None and translator.budget is not None and translator.budget.limited:
+                articles = rank_articles(articles)
+            if articles:
+                self.fetch(articles)
+                self.write(self.process(articles, translator, summarizer))
+        finally:
+            self.cpu_pool.shutdown()
+        self.stats['total_seconds'] = time.perf_counter() - started
+        return self.stats
+
+
+def rate(count: float, seconds: float) -> float:
+    return count / seconds if seconds else 0.0
+
+
+def log_report(stats: dict, output: str):
+    """Підсумок з пропускною здатністю кожного етапу"""
+    logger.info("📊 Бекфіл:")
+    logger.info(f"   - Стрічки: {stats['snapshots']:.0f} знімків, {stats['entries']:.0f} записів "
+                f"за {stats['scan_seconds']:.1f} с ({rate(stats['entries'], stats['scan_seconds']):.0f} записів/с)")
+    logger.info(f"   - Про Україну у вікні: {stats['matched']:.0f}, без дублікатів: {stats['articles']:.0f}, "
+                f"вже опрацьовано раніше: {stats['already_done']:.0f}")
+    if stats['articles']:
+        logger.info(f"   - Сторінки: {stats['pages']:.0f} зі знімків за {stats['fetch_seconds']:.1f} с "
+                    f"({rate(stats['articles'], stats['fetch_seconds']):.1f} статей/с)")
+        logger.info(f"   - Обробка: {stats['processed']:.0f} статей за {stats['process_seconds']:.1f} с "
+                    f"({rate(stats['processed'], stats['process_seconds']):.1f} статей/с)")
+    logger.info(f"   - {'У чергу публікації' if output == QUEUE else 'В архів'}: {stats['written']:.0f}")
+    logger.info(f"   - Разом: {rate(stats['articles'], stats['total_seconds']):.1f} статей/с "
+                f"({stats['total_seconds']:.1f} с)")
+
+
+def parse_date(value: str) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=pytz.UTC).timestamp()
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument('directory', type=pathlib.Path, help="каталог знімків")
+    arguments.add_argument('--days', type=int, default=DEFAULT_DAYS, help="вікно від сьогодні назад")
+    arguments.add_argument('--since', help="початок вікна (YYYY-MM-DD), замість --days")
+    arguments.add_argument('--until', help="кінець вікна (YYYY-MM-DD), за замовчуванням зараз")
+    arguments.add_argument('--subscription', action='append',
+                           help="лише ці підписки (можна кілька); за замовчуванням усі")
+    arguments.add_argument('--output', choices=(ARCHIVE, QUEUE), default=ARCHIVE,
+                           help="архів або черга публікації для main_mvp.py")
+    arguments.add_argument('--no-llm', action='store_true', help="без OpenAI: оригінальні тексти")
+    arguments.add_argument('--workers', type=int, help="процесів (за замовчуванням CPU_WORKERS/ядра)")
+    arguments.add_argument('--capture', action='store_true',
+                           help="лише дописати знімки поточних стрічок і сторінок")
+    options = arguments.parse_args()
+
+    import log_setup
+    log_setup.setup_logging('logs/backfill.log')
+
+    if options.capture:
+        feeds, pages = capture(options.directory)
+        logger.info(f"💾 Збережено стрічок: {feeds}, сторінок: {pages}")
+        return
+
+    now = time.time()
+    until = parse_date(options.until) if options.until else now
+    since = parse_date(options.since) if options.since else now - options.days * 86400
+
+    registry = SubscriptionRegistry.load(
+        KEYWORDS, channel=os.getenv('TELEGRAM_CHANNEL', ''),
+        translate=main_mvp.USE_TRANSLATION, summarize=main_mvp.USE_SUMMARIZATION
+    )
+    if options.subscription:
+        unknown = set(options.subscription) - {sub.name for sub in registry.subscriptions}
+        if unknown:
+            raise ValueError(f"Невідомі підписки: {', '.join(sorted(unknown))}")
+        registry = SubscriptionRegistry([sub for sub in registry.subscriptions
+                                         if sub.name in options.subscription])
+
+    translator = summarizer = budget = None
+    if not options.no_llm:
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("Відсутня змінна середовища OPENAI_API_KEY (або --no-llm)")
+
+        from translate import Translator
+        from translation_memory import TranslationMemory
+        from summary import Summarizer
+
+        budget = TokenBudget.from_env()
+        translator = Translator(api_key, budget, TranslationMemory())
+        summarizer = Summarizer(api_key, budget)
+
+    cpu_pool = CpuPool(options.workers) if options.workers is not None else None
+    backfill = Backfill(options.directory, registry, since, until, options.output,
+                        llm=not options.no_llm, cpu_pool=cpu_pool)
+    logger.info(f"🗂️ Бекфіл {options.directory}: "
+                f"{datetime.fromtimestamp(since, pytz.UTC):%Y-%m-%d} - "
+                f"{datetime.fromtimestamp(until, pytz.UTC):%Y-%m-%d}, вивід: {options.output}")
+    stats = backfill.run(translator, summarizer)
+    if translator is not None:
+        translator.memory.save()
+        budget.save()
+        main_mvp.log_budget_stats(budget)
+        main_mvp.log_translation_memory_stats(translator.memory)
+    log_report(stats, options.output)
+
+
+if __name__ == "__main__":
+    main()
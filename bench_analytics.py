@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Бенчмарк аналітики: тижневий звіт по місяцях синтетичної історії"""
+
+import pathlib
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from analytics import (CATEGORIES, COLUMNS, OUTCOMES, compact, load_history,
+                       weekly_report, write_chunk)
+
+SOURCES = np.array(['20 Minuten', 'Blick', 'Le Temps', 'NZZ', 'RSI News', 'RTS Info',
+                    'SRF News', 'Swissinfo DE', 'Swissinfo EN', 'Swissinfo FR', 'Tages-Anzeiger'])
+LANGUAGES = np.array(['de', 'en', 'fr', 'it', 'unknown'])
+RUNS_PER_DAY = 2
+
+
+def write_history(directory: pathlib.Path, days: int, rows_per_run: int) -> int:
+    """Фрагменти запусків за останні days днів, повертає кількість рядків"""
+    rng = np.random.default_rng(0)
+    now = int(time.time())
+    total = 0
+    for run_index in range(days * RUNS_PER_DAY):
+        run = now - days * 86400 + run_index * 86400 // RUNS_PER_DAY
+        published = run - rng.integers(600, 86400, rows_per_run)
+        outcome = rng.choice(len(OUTCOMES), rows_per_run, p=[0.6, 0.15, 0.1, 0.05, 0.07, 0.03])
+        columns = {
+            'run': np.full(rows_per_run, run, dtype=np.int64),
+            'url': rng.integers(0, 2**63, rows_per_run, dtype=np.uint64),
+            'source': rng.integers(0, len(SOURCES), rows_per_run).astype(np.uint16),
+            'language': rng.integers(0, len(LANGUAGES), rows_per_run).astype(np.uint8),
+            'categories': rng.integers(1, 2 ** len(CATEGORIES), rows_per_run).astype(np.uint16),
+            'relevance': rng.integers(1, 6, rows_per_run).astype(np.uint8),
+            'fetched': rng.random(rows_per_run) < 0.7,
+            'outcome': outcome.astype(np.uint8),
+            'published': published,
+            'delivered': np.where(outcome == 0, run + rng.integers(60, 1800, rows_per_run), 0),
+        }
+        assert set(columns) == set(COLUMNS)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(run))
+        write_chunk(directory / f'run-{stamp}.npz', columns, SOURCES, LANGUAGES)
+        total += rows_per_run
+    return total
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+    rows_per_run = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+    print("🏁 Бенчмарк аналітики історії")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory)
+        rows = write_history(path, days, rows_per_run)
+        compact(path)
+        files = sorted(path.glob('*.npz'))
+        size = sum(f.stat().st_size for f in files)
+        print(f"Днів: {days}, записів: {rows}, файлів: {len(files)}, "
+              f"{size / 1024:.0f} КБ ({size / rows:.1f} байт на запис)")
+
+        for weeks in (4, days // 7 + 1):
+            started = time.perf_counter()
+            table = load_history(directory=directory, since=int(time.time()) - weeks * 7 * 86400)
+            loaded = time.perf_counter()
+            report = weekly_report(table)
+            finished = time.perf_counter()
+            print(f"{weeks:>3} тижнів: {len(table['run']):>8} записів, читання "
+                  f"{(loaded - started) * 1000:>5.0f} мс, агрегати {(finished - loaded) * 1000:>5.0f} мс, "
+                  f"тижнів у звіті {len(report)}")
+
+
+if __name__ == "__main__":
+    main()
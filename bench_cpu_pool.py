@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Бенчмарк розбору сторінок: потоки конвеєра проти пулу з 1..N процесів"""
+
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cpu_pool import CpuPool
+from extraction import GENERIC_SELECTORS
+
+# Потоки, що "завантажують" сторінки і передають їх у пул (як етап fetch)
+FETCH_THREADS = 8
+
+PARAGRAPH = ("<p>Der Bundesrat hat am Mittwoch entschieden, den Schutzstatus S für Geflüchtete "
+             "aus der Ukraine zu verlängern. <a href='/x'>Mehr dazu</a> Die Kantone begrüssen "
+             "den Entscheid und fordern zusätzliche Mittel für die Integration.</p>")
+
+
+def build_page(index: int, paragraphs: int = 60) -> bytes:
+    """Синтетична сторінка новини: меню, тизери, стаття, футер"""
+    nav = ''.join(f"<li><a href='/r{i}'>Rubrik {i}</a></li>" for i in range(80))
+    teasers = ''.join(f"<div class='teaser'><a href='/t{i}'>Teaser {i}</a></div>" for i in range(40))
+    body = PARAGRAPH * paragraphs
+    return (f"<html><head><script>var x = {index};</script><style>p{{}}</style></head><body>"
+            f"<nav><ul>{nav}</ul></nav><div class='teasers'>{teasers}</div>"
+            f"<div class='story-body'>{body}</div><footer>© {index}</footer></body></html>").encode()
+
+
+def measure(pool: CpuPool, pages: list) -> float:
+    """Сторінок за секунду при паралельних запитах з потоків"""
+    selectors = ['.article-content'] + GENERIC_SELECTORS
+    # Прогрів: запуск процесів та імпорти не враховуємо
+    with ThreadPoolExecutor(max(pool.workers, 1)) as threads:
+        list(threads.map(lambda page: pool.parse_page(page, selectors), pages[:max(pool.workers, 1)]))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(FETCH_THREADS) as threads:
+        results = list(threads.map(lambda page: pool.parse_page(page, selectors), pages))
+    elapsed = time.perf_counter() - started
+    assert all(len(result.text) > 1000 for result in results)
+    return len(pages) / elapsed
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    cores = os.cpu_count() or 1
+    worker_counts = [int(x) for x in sys.argv[2:]] or [0] + list(range(1, cores + 1))
+    pages = [build_page(i) for i in range(count)]
+
+    print("🏁 Бенчмарк розбору сторінок у пулі процесів")
+    print("=" * 60)
+    print(f"Ядер: {cores}, сторінок: {count} по {len(pages[0]) / 1024:.0f} КБ, "
+          f"потоків завантаження: {FETCH_THREADS}")
+    print(f"{'процесів':>9}{'сторінок/с':>12}{'прискорення':>13}")
+
+    baseline = None
+    for workers in worker_counts:
+        pool = CpuPool(workers)
+        try:
+            rate = measure(pool, pages)
+        finally:
+            pool.shutdown()
+        baseline = baseline or rate
+        label = workers if workers else 'потоки'
+        print(f"{label:>9}{rate:>12.1f}{rate / baseline:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Бенчмарк розбору великої стрічки: feedparser проти потокового lxml"""
+
+import logging
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import feedparser
+
+from stream_feed import iter_entries
+
+# Свіжа частина стрічки (години); решта записів - старі
+RECENT_HOURS = 24
+
+
+def build_feed(entries: int, recent: int) -> bytes:
+    """Синтетична RSS стрічка від нових до старих: recent свіжих записів, решта - старші за добу"""
+    now = datetime.now(timezone.utc)
+    items = []
+    for i in range(entries):
+        if i < recent:
+            moment = now - timedelta(minutes=i)
+        else:
+            moment = now - timedelta(hours=RECENT_HOURS + 1, minutes=i)
+        items.append(
+            f"<item><title>Meldung {i}: Ukrainer in der Schweiz</title>"
+            f"<description><![CDATA[<p>Der Bundesrat hat den Schutzstatus S verlängert. "
+            f"Absatz {i} mit etwas mehr Text, damit der Eintrag realistisch lang ist.</p>]]></description>"
+            f"<link>https://example.ch/news/{i}</link><guid>https://example.ch/news/{i}</guid>"
+            f"<pubDate>{format_datetime(moment)}</pubDate></item>"
+        )
+    return (f"<?xml version='1.0' encoding='utf-8'?><rss version='2.0'><channel>"
+            f"<title>big</title>{''.join(items)}</channel></rss>").encode('utf-8')
+
+
+def measure(func) -> tuple:
+    """Повертає (кількість записів, пік МБ, секунди)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak / 1024 / 1024, elapsed
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    recent = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    sizes = [int(x) for x in sys.argv[2:]] or [1000, 5000]
+    cutoff = time.time() - RECENT_HOURS * 3600
+
+    scenarios = {
+        'feedparser': lambda content: len(feedparser.parse(content).entries),
+        'lxml потоково': lambda content: sum(1 for _ in iter_entries(content)),
+        'lxml до межі': lambda content: sum(1 for _ in iter_entries(content, cutoff=cutoff)),
+    }
+
+    print("🏁 Бенчмарк розбору великої стрічки")
+    print("=" * 72)
+    print(f"{'записів':>8}{'МБ XML':>8}  {'парсер':<16}{'віддано':>9}{'пік МБ':>9}{'записів/с':>12}{'с':>8}")
+
+    for size in sizes:
+        content = build_feed(size, recent)
+        for name, scenario in scenarios.items():
+            count, peak, elapsed = measure(lambda: scenario(content))
+            print(f"{size:>8}{len(content) / 1024 / 1024:>8.2f}  {name:<16}{count:>9}"
+                  f"{peak:>9.2f}{size / elapsed:>12.0f}{elapsed:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
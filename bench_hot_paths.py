@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Мікробенчмарки гарячих шляхів парсера та Telegram клієнта на збережених фікстурах
+
+    python bench_hot_paths.py                  # звіт
+    python bench_hot_paths.py --save           # звіт + запис базової лінії
+    python bench_hot_paths.py --compare        # порівняння з базовою лінією (код 1 при регресії)
+    python bench_hot_paths.py clean escape     # лише вибрані бенчмарки
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import cycle
+
+import requests
+
+FIXTURES = pathlib.Path(__file__).resolve().parent / 'bench_fixtures'
+BASELINE = FIXTURES / 'baseline.json'
+
+# Кожен повтор триває щонайменше стільки; звітується найкращий повтор
+# (найменш спотворений іншими процесами), розкид - для оцінки шуму
+MIN_REPEAT_SECONDS = 0.2
+REPEATS = 7
+
+# Допустиме погіршення відносно базової лінії
+SLOWDOWN_TOLERANCE = 0.15
+MEMORY_TOLERANCE = 0.25
+
+
+class FixtureTransport:
+    """Віддає збережену сторінку замість мережевого запиту"""
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def get(self, url, timeout=None, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.content
+        response.url = url
+        return response
+
+
+def build_benchmarks(workdir: str) -> dict:
+    """{назва: функція однієї операції} на фікстурах"""
+    os.chdir(workdir)
+    from parser import Article, NewsParser
+    from telegram_client import TelegramClient
+
+    items = json.loads((FIXTURES / 'feed_items.json').read_text(encoding='utf-8'))
+    page = (FIXTURES / 'article.html').read_bytes()
+
+    news_parser = NewsParser(transport=FixtureTransport(page))
+    client = TelegramClient('0:bench', '@bench')
+
+    descriptions = cycle([item['description'] for item in items])
+    dates = cycle([item['published'] for item in items])
+    texts = cycle([(f"{item['title']} {news_parser._clean_text(item['description'])}",
+                    'fr' if 'rts.ch' in item['link'] or 'letemps' in item['link'] else 'de')
+                   for item in items])
+    articles = [Article(item['title'], news_parser._clean_text(item['description']),
+                        item['link'], item['source'], None) for item in items]
+    article_cycle = cycle(articles)
+    page_article = Article(items[2]['title'], items[2]['description'], items[2]['link'],
+                           items[2]['source'], None)
+    full_text = news_parser.fetch_full_text(page_article)
+    assert len(full_text) > 1000, "фікстура сторінки не витягується"
+    messages = cycle([(item['title'], news_parser._clean_text(item['description']), full_text,
+                       item['link'], item['source']) for item in items])
+
+    def match_keywords():
+        # Як у parser: швидкий prefilter, підписки - лише для збігів
+        text, language = next(texts)
+        if news_parser.subscriptions.prefilter.search(text):
+            news_parser.subscriptions.match(text, language)
+
+    def extract():
+        page_article.full_text = None
+        news_parser.fetch_full_text(page_article)
+
+    return {
+        'clean': lambda: news_parser._clean_text(next(descriptions)),
+        'date': lambda: news_parser._parse_date(next(dates)),
+        'keywords': match_keywords,
+        'language': lambda: next(article_cycle)._detect_language(),
+        'extract': extract,
+        'escape': lambda: client._escape_markdown_v2(full_text),
+        'format': lambda: client._format_message(*next(messages)),
+    }
+
+
+def calibrate(func) -> int:
+    """Кількість операцій на повтор, щоб повтор тривав MIN_REPEAT_SECONDS"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_REPEAT_SECONDS / 10:
+            return max(1, int(number * MIN_REPEAT_SECONDS / elapsed))
+        number *= 10
+
+
+def measure(func) -> dict:
+    """ops/sec (найкращий повтор, розкид), пік пам'яті та блоки, що лишаються після операції"""
+    func()  # прогрів: відкладені імпорти, кеші
+    number = calibrate(func)
+    rates = []
+    gc.disable()
+    try:
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            rates.append(number / (time.perf_counter() - started))
+    finally:
+        gc.enable()
+
+    # Алокації рахуються окремо: tracemalloc сповільнює виконання в рази
+    samples = min(number, 200)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    for _ in range(samples):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    best = max(rates)
+    return {
+        'ops': best,
+        'spread': (best - statistics.median(rates)) / best,
+        'peak_kb': (peak - base) / 1024,
+        'retained_blocks': blocks / samples
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = SLOWDOWN_TOLERANCE) -> list:
+    """
+    Назви бенчмарків, що погіршились понад допуск
+
+    Допуск не менший за розкид повторів у цьому запуску та в базовій лінії:
+    на зашумленій машині зміна в межах шуму регресією не вважається.
+    """
+    regressions = []
+    print(f"\n{'бенчмарк':<10}{'ops/s':>12}{'база':>12}{'зміна':>9}{'пік КБ':>9}{'база':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<10}{result['ops']:>12.0f}{'-':>12}")
+            continue
+        change = result['ops'] / base['ops'] - 1
+        slower = change < -max(tolerance, result['spread'], base.get('spread', 0))
+        heavier = result['peak_kb'] > base['peak_kb'] * (1 + MEMORY_TOLERANCE) + 1
+        flag = ' ❌' if slower or heavier else ''
+        if flag:
+            regressions.append(name)
+        print(f"{name:<10}{result['ops']:>12.0f}{base['ops']:>12.0f}{change:>+9.0%}"
+              f"{result['peak_kb']:>9.1f}{base['peak_kb']:>8.1f}{flag}")
+    return regressions
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument('names', nargs='*', help="бенчмарки (за замовчуванням усі)")
+    arguments.add_argument('--save', action='store_true', help="записати базову лінію")
+    arguments.add_argument('--compare', action='store_true', help="порівняти з базовою лінією")
+    arguments.add_argument('--baseline', default=str(BASELINE))
+    arguments.add_argument('--tolerance', type=float, default=SLOWDOWN_TOLERANCE,
+                           help="допустиме сповільнення (частка, за замовчуванням 0.15)")
+    options = arguments.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # Стан парсера (data/...) пишеться в тимчасовий каталог, не в робочий
+    workdir = tempfile.TemporaryDirectory(prefix='bench-hot-')
+    benchmarks = build_benchmarks(workdir.name)
+    unknown = set(options.names) - set(benchmarks)
+    if unknown:
+        sys.exit(f"Невідомі бенчмарки: {', '.join(sorted(unknown))}; є: {', '.join(benchmarks)}")
+
+    print("🏁 Мікробенчмарки гарячих шляхів")
+    print("=" * 60)
+    print(f"{'бенчмарк':<10}{'ops/s':>12}{'±':>7}{'пік КБ':>9}{'блоків/оп':>11}")
+    results = {}
+    for name, func in benchmarks.items():
+        if options.names and name not in options.names:
+            continue
+        result = results[name] = measure(func)
+        print(f"{name:<10}{result['ops']:>12.0f}{result['spread']:>7.0%}"
+              f"{result['peak_kb']:>9.1f}{result['retained_blocks']:>11.2f}")
+
+    baseline_path = pathlib.Path(options.baseline)
+    if options.compare:
+        if not baseline_path.exists():
+            sys.exit(f"Немає базової лінії {baseline_path}: спершу запустіть з --save")
+        regressions = compare(results, json.loads(baseline_path.read_text(encoding='utf-8')),
+                              options.tolerance)
+        if regressions:
+            print(f"\n❌ Регресії: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Регресій немає")
+
+    if options.save:
+        saved = json.loads(baseline_path.read_text(encoding='utf-8')) if baseline_path.exists() else {}
+        saved.update(results)
+        baseline_path.write_text(json.dumps(saved, indent=1), encoding='utf-8')
+        print(f"\n💾 Базову лінію записано у {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк визначення мови: langid (пакетні n-грами NumPy) проти langdetect
+
+Точність на розмічених заголовках та описах з bench_fixtures/langid_samples.json
+(коротких і довгих окремо), стабільність результатів між прогонами і швидкість.
+
+    python bench_langid.py [розмір пакета]
+"""
+
+import json
+import pathlib
+import sys
+import time
+from collections import Counter
+
+from langid import LANGUAGES, LanguageIdentifier
+
+SAMPLES = pathlib.Path(__file__).resolve().parent / 'bench_fixtures' / 'langid_samples.json'
+
+# Заголовки коротші за це - саме на них langdetect помиляється найчастіше
+SHORT_CHARS = 60
+STABILITY_RUNS = 5
+
+
+def langdetect_detector(seed=0):
+    from langdetect import DetectorFactory, detect
+    DetectorFactory.seed = seed
+
+    def run(text: str) -> str:
+        try:
+            return detect(text)
+        except Exception:
+            return 'unknown'
+    return run
+
+
+def rate(func, texts, min_seconds: float = 1.0) -> float:
+    """Текстів на секунду"""
+    done = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_seconds:
+        func(texts)
+        done += len(texts)
+    return done / (time.perf_counter() - started)
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    samples = json.loads(SAMPLES.read_text(encoding='utf-8'))
+    labels = [language for language, _ in samples]
+    texts = [text for _, text in samples]
+
+    started = time.perf_counter()
+    identifier = LanguageIdentifier()
+    load_ms = (time.perf_counter() - started) * 1000
+    detect = langdetect_detector()
+    detect(texts[0])  # профілі langdetect завантажуються при першому виклику
+
+    predictions = {
+        'langid': identifier.identify_batch(texts),
+        'langdetect': [detect(text) for text in texts],
+    }
+
+    print("🏁 Бенчмарк визначення мови")
+    print("=" * 60)
+    print(f"Текстів: {len(texts)} ({sum(len(t) < SHORT_CHARS for t in texts)} коротких), "
+          f"профілі langid: {len(identifier.vocabulary)} n-грам, {load_ms:.0f} мс")
+    print(f"\n{'мова':<8}{'текстів':>8}{'langid':>10}{'langdetect':>12}")
+    for language in LANGUAGES + ('короткі', 'довгі', 'усі'):
+        if language == 'короткі':
+            chosen = [i for i, text in enumerate(texts) if len(text) < SHORT_CHARS]
+        elif language == 'довгі':
+            chosen = [i for i, text in enumerate(texts) if len(text) >= SHORT_CHARS]
+        elif language == 'усі':
+            chosen = range(len(texts))
+        else:
+            chosen = [i for i, label in enumerate(labels) if label == language]
+        accuracy = {name: sum(predicted[i] == labels[i] for i in chosen) / len(chosen)
+                    for name, predicted in predictions.items()}
+        print(f"{language:<8}{len(chosen):>8}{accuracy['langid']:>10.0%}{accuracy['langdetect']:>12.0%}")
+    # rm у langdetect немає взагалі - показуємо, куди він відносить ці тексти
+    romansh = Counter(p for p, label in zip(predictions['langdetect'], labels) if label == 'rm')
+    print(f"langdetect для rm: {dict(romansh.most_common())}")
+
+    # Без зафіксованого seed langdetect дає різні відповіді між прогонами
+    runs = [[langdetect_detector(None)(text) for text in texts] for _ in range(STABILITY_RUNS)]
+    unstable = sum(len(set(answers)) > 1 for answers in zip(*runs))
+    langid_runs = [identifier.identify_batch(texts) for _ in range(STABILITY_RUNS)]
+    assert all(run == langid_runs[0] for run in langid_runs), "langid має бути детермінованим"
+    print(f"\nЗмінили мову між {STABILITY_RUNS} прогонами: langdetect без seed - {unstable}, langid - 0")
+
+    batch = (texts * (batch_size // len(texts) + 1))[:batch_size]
+    single = texts[:20]
+    speeds = {
+        'langdetect, по одному': rate(lambda chunk: [detect(text) for text in chunk], single),
+        'langid, по одному': rate(lambda chunk: [identifier.identify_batch([text]) for text in chunk],
+                                  single),
+        f'langid, пакет {batch_size}': rate(identifier.identify_batch, batch),
+    }
+    print(f"\n{'режим':<24}{'текстів/с':>12}{'прискорення':>13}")
+    baseline = speeds['langdetect, по одному']
+    for name, speed in speeds.items():
+        print(f"{name:<24}{speed:>12.0f}{speed / baseline:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
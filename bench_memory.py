@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пам'яті парсингу великої кількості стрічок
+
+Записи не накопичуються, але пік усе одно росте з кількістю стрічок:
+для кожної стрічки зберігається водяний знак (час і guid найновішого
+запису), а feedparser тримає розібрану поточну стрічку. Тому бенчмарк
+також друкує приріст піку на стрічку.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from parser import NewsParser, Article, detect_language
+
+# Кожен N-й запис стрічки - про Україну
+RELEVANT_EVERY = 50
+
+RELEVANT_ITEM = ("Ukrainer in der Schweiz: Schutzstatus S verlängert",
+                 "Der Bundesrat hat entschieden, den Schutzstatus S für Geflüchtete zu verlängern.")
+OTHER_ITEM = ("Wetterprognose für das Wochenende",
+              "Im Mittelland bleibt es sonnig, in den Alpen ziehen am Nachmittag Gewitter auf.")
+
+
+def write_feeds(directory: str, feed_count: int, entries_per_feed: int) -> dict:
+    """Створює синтетичні RSS файли, повертає {джерело: шлях}"""
+    now = datetime.now(timezone.utc)
+    feeds = {}
+    counter = 0
+    for f in range(feed_count):
+        items = []
+        for e in range(entries_per_feed):
+            counter += 1
+            # Різні дати від нових до старих, як у справжніх стрічках
+            pub_date = format_datetime(now - timedelta(minutes=e))
+            title, description = RELEVANT_ITEM if counter % RELEVANT_EVERY == 0 else OTHER_ITEM
+            items.append(
+                f"<item><title>{title} #{counter}</title>"
+                f"<description>{description}</description>"
+                f"<link>https://example.ch/{f}/{e}</link>"
+                f"<pubDate>{pub_date}</pubDate></item>"
+            )
+        path = os.path.join(directory, f"feed{f}.xml")
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(f"<rss version='2.0'><channel><title>feed {f}</title>{''.join(items)}</channel></rss>")
+        feeds[f"feed{f}"] = path
+    return feeds
+
+
+def measure(feeds: dict, workdir: str) -> tuple:
+    """Парсить стрічки генератором, повертає (кандидати, пік МБ, секунди)"""
+    os.chdir(workdir)
+    parser = NewsParser()
+    tracemalloc.start()
+    started = time.perf_counter()
+    candidates = sum(1 for _ in parser.iter_all_feeds(feeds))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return candidates, peak / 1024 / 1024, elapsed
+
+
+def article_size() -> int:
+    """Розмір одного екземпляра Article без рядків (байти)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    articles = [Article.__new__(Article) for _ in range(10000)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del articles
+    return total // 10000
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    entries_per_feed = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    feed_counts = [int(x) for x in sys.argv[2:]] or [50, 200, 800]
+
+    print("🏁 Бенчмарк пам'яті парсингу стрічок")
+    print("=" * 60)
+    print(f"Article (slots): ~{article_size()} байт на екземпляр")
+
+    # Профілі мов завантажуються один раз - не враховуємо їх у піку
+    detect_language(RELEVANT_ITEM[1])
+    print(f"{'стрічок':>8}{'записів':>10}{'кандидатів':>12}{'пік МБ':>10}"
+          f"{'КБ/стрічку':>12}{'записів/с':>12}")
+
+    for feed_count in feed_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            feeds = write_feeds(directory, feed_count, entries_per_feed)
+            candidates, peak, elapsed = measure(feeds, directory)
+            total = feed_count * entries_per_feed
+            print(f"{feed_count:>8}{total:>10}{candidates:>12}{peak:>10.2f}"
+                  f"{peak * 1024 / feed_count:>12.1f}{total / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Бенчмарк часу імпорту та холостого запуску main_mvp"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Холостий запуск: стрічки без нових статей (мережа не використовується)
+IDLE_RUN = """
+import parser
+parser.NewsParser.iter_all_feeds = lambda self: iter(())
+import main_mvp
+main_mvp.setup_logging = lambda: None
+main_mvp.main()
+"""
+
+# Те саме, але з жадібним імпортом і створенням клієнтів, як було раніше
+EAGER_RUN = """
+import parser
+parser.NewsParser.iter_all_feeds = lambda self: iter(())
+import bs4, langdetect
+import main_mvp
+main_mvp.setup_logging = lambda: None
+from subscriptions import SubscriptionRegistry
+main_mvp.create_clients(main_mvp.load_environment_variables(),
+                        SubscriptionRegistry.default(parser.KEYWORDS))
+main_mvp.main()
+"""
+
+SCENARIOS = {
+    'import main_mvp': "import main_mvp",
+    'idle run (lazy)': IDLE_RUN,
+    'idle run (eager)': EAGER_RUN,
+}
+
+
+def run_once(code: str) -> tuple:
+    """Запускає код в окремому процесі, повертає (секунди, пікова пам'ять МБ)"""
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'sk-bench')
+    env.setdefault('TELEGRAM_TOKEN', '0:bench')
+    env.setdefault('TELEGRAM_CHANNEL', '@bench')
+
+    wrapper = (
+        "import resource, sys\n"
+        f"exec({code!r})\n"
+        "sys.stderr.write('MAXRSS=%d\\n' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', wrapper], env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    maxrss = 0
+    for line in result.stderr.splitlines():
+        if line.startswith('MAXRSS='):
+            maxrss = int(line.split('=', 1)[1])
+    # На Linux ru_maxrss у кілобайтах
+    return elapsed, maxrss / 1024
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"🏁 Бенчмарк запуску ({repeats} повторів, медіана)")
+    print("=" * 60)
+    print(f"{'Сценарій':<22}{'час, мс':>12}{'пам. МБ':>12}")
+
+    for name, code in SCENARIOS.items():
+        times, memory = [], []
+        for _ in range(repeats):
+            elapsed, rss = run_once(code)
+            times.append(elapsed)
+            memory.append(rss)
+        print(f"{name:<22}{statistics.median(times) * 1000:>12.0f}{statistics.median(memory):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Відкидання шаблонного тексту (банери, тизери, підписи фото) перед LLM"""
+
+import hashlib
+import json
+import logging
+import pathlib
+import re
+import threading
+from datetime import datetime
+from typing import Tuple
+
+import pytz
+
+from extraction import PARAGRAPH_BREAK
+from llm_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Абзац, що трапився в стількох різних статтях домену, вважається шаблонним
+MIN_ARTICLES = 3
+
+# Довші абзаци не бувають шаблонними ні за правилами, ні за відбитками:
+# повторювана довідка про статус S - це зміст, а не банер
+MAX_BOILERPLATE_CHARS = 300
+
+# Якщо відбитки збігаються з більшою часткою тексту, це повторна публікація
+# тієї ж статті (оновлення за новою адресою), а не шаблон
+MAX_FINGERPRINT_SHARE = 0.5
+
+# Скільки відбитків зберігається на домен (спершу відкидаються поодинокі)
+MAX_FINGERPRINTS = 3000
+
+# Шаблонні абзаци de/fr/it/en: банери, тизери, підписи, лічильники
+RULES = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Cookie банери та згода
+    r'\bcookies?\b.*\b(verwenden|nutzen|akzeptieren|utilisons|accepter|utilizziamo|accetta|use|accept)\b',
+    r'\b(verwenden|nutzen|utilisons|utilizziamo|we use)\b.*\bcookies?\b',
+    # Лише абзац-посилання: "Datenschutzgesetz ..." - це зміст
+    r'^(datenschutz(erklärung|hinweise?|einstellungen)?|politique de confidentialité'
+    r'|protection des données|informativa (sulla )?privacy|privacy( policy| settings)?)\s*$',
+    # "Lesen Sie auch" та інші тизери
+    r'^(lesen sie (auch|mehr)|mehr zum thema|das könnte sie (auch )?interessieren|weitere artikel|zum thema)\b',
+    r'^(à lire aussi|a lire aussi|lire aussi|lire également|à voir aussi|sur le même sujet)\b',
+    r'^(leggi anche|potrebbe interessarti|articoli correlati)\b',
+    r'^(read (more|also)|related( articles)?|see also)\b',
+    # Розсилки та підписки
+    # Заклик підписатися, а не будь-яка згадка розсилки
+    r'^newsletter\s*$',
+    r'\bnewsletter\b.*\b(abonnieren|anmelden|bestellen|abonnez|inscri\w*|iscrivi\w*|abbona\w*|subscribe|sign up)\b',
+    r'\b(abonnieren|anmelden|bestellen|abonnez|inscri\w*|iscrivi\w*|abbona\w*|subscribe|sign up)\b.*\bnewsletter\b',
+    r'^(abonnieren sie|jetzt abonnieren|abonnez-vous|inscrivez-vous|iscriviti|abbonati|subscribe|sign up)\b',
+    # Підписи та авторство фото
+    r'\b(keystone|reuters|afp|epa|ap photo|getty images|imago|dpa|ti-press)\s*/\s*[\w .\'-]+$',
+    r'^(bild|foto|fotos|photo|image|quelle|source|fonte)\s*:',
+    r'^©',
+    # Коментарі, поширення, права
+    r'^\d+\s+(kommentare?|commentaires?|commenti|comments?)$',
+    r'^(teilen|drucken|partager|imprimer|condividi|stampa|share|print)(\s+\w+){0,3}$',
+    r'\b(alle rechte vorbehalten|tous droits réservés|tutti i diritti riservati|all rights reserved)\b',
+]]
+
+
+def fingerprint(paragraph: str) -> str:
+    """Відбиток абзацу: регістр, цифри (лічильники, дати) та пробіли не враховуються"""
+    normalized = ' '.join(re.sub(r'\d+', '0', paragraph.lower()).split())
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def matches_rule(paragraph: str) -> bool:
+    return len(paragraph) <= MAX_BOILERPLATE_CHARS and any(rule.search(paragraph) for rule in RULES)
+
+
+class BoilerplateFilter:
+    """
+    Відкидає шаблонні абзаци витягнутого тексту: за багатомовними правилами
+    та за відбитками абзаців, що повторюються в різних статтях одного домену.
+    Відбитки накопичуються між запусками.
+    """
+
+    def __init__(self, path: str = 'data/boilerplate.json'):
+        self.path = pathlib.Path(path)
+        self.today = datetime.now(pytz.UTC).date().isoformat()
+        # домен → {відбиток: [статей, дата останньої появи]}
+        self.domains = self._load()
+        self.articles = 0
+        self.paragraphs_removed = 0
+        self.tokens_removed = 0
+        self.by_rule = 0
+        self.by_fingerprint = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігає відбитки (не більше MAX_FINGERPRINTS на домен)"""
+        with self._lock:
+            for domain, prints in self.domains.items():
+                if len(prints) > MAX_FINGERPRINTS:
+                    kept = sorted(prints.items(), key=lambda item: (item[1][0] > 1, item[1][1]))
+                    self.domains[domain] = dict(kept[-MAX_FINGERPRINTS:])
+            data = json.dumps(self.domains, separators=(',', ':'))
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(data, encoding='utf-8')
+        tmp.replace(self.path)
+
+    def strip(self, domain: str, text: str) -> Tuple[str, int]:
+        """
+        Вчить відбитки абзаців статті й відкидає шаблонні абзаци
+
+        Args:
+            domain: Домен статті
+            text: Текст з абзацами, розділеними PARAGRAPH_BREAK
+
+        Returns:
+            (текст без шаблонних абзаців, оцінка відкинутих токенів)
+        """
+        paragraphs = text.split(PARAGRAPH_BREAK)
+        by_rule, repeated = set(), set()
+        with self._lock:
+            prints = self.domains.setdefault(domain, {})
+            counted = set()
+            for index, paragraph in enumerate(paragraphs):
+                if matches_rule(paragraph):
+                    by_rule.add(index)
+                    continue
+                if len(paragraph) > MAX_BOILERPLATE_CHARS:
+                    continue
+                key = fingerprint(paragraph)
+                entry = prints.setdefault(key, [0, self.today])
+                if key not in counted:
+                    counted.add(key)
+                    entry[0] += 1
+                    entry[1] = self.today
+                if entry[0] >= MIN_ARTICLES:
+                    repeated.add(index)
+
+            if sum(len(paragraphs[i]) for i in repeated) > len(text) * MAX_FINGERPRINT_SHARE:
+                repeated = set()
+            removed = [paragraphs[i] for i in sorted(by_rule | repeated)]
+            kept = [paragraph for i, paragraph in enumerate(paragraphs)
+                    if i not in by_rule and i not in repeated]
+            self.by_rule += len(by_rule)
+            self.by_fingerprint += len(repeated)
+            tokens = sum(estimate_tokens(paragraph) for paragraph in removed)
+            self.articles += 1
+            self.paragraphs_removed += len(removed)
+            self.tokens_removed += tokens
+        return PARAGRAPH_BREAK.join(kept), tokens
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'articles': self.articles,
+                'paragraphs': self.paragraphs_removed,
+                'by_rule': self.by_rule,
+                'by_fingerprint': self.by_fingerprint,
+                'tokens': self.tokens_removed,
+                'tokens_per_article': self.tokens_removed / (self.articles or 1)
+            }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Бот-команди /search та /latest з локального архіву (довге опитування getUpdates)"""
+
+import json
+import logging
+import os
+import pathlib
+import time
+from typing import List, Optional
+
+from archive import ArticleArchive
+from telegram_client import TelegramClient
+
+logger = logging.getLogger(__name__)
+
+RESULTS_LIMIT = 5
+MAX_RESULTS = 10
+
+HELP_TEXT = (
+    "🔎 /search <слова> - пошук в архіві опублікованих статей\n"
+    "🗞 /latest [кількість] - останні статті"
+)
+
+
+def format_results(records: List[dict]) -> str:
+    """Короткий список: заголовок, джерело, дата, посилання"""
+    lines = []
+    for record in records:
+        date = (record.get('published') or record.get('archived_at') or '')[:10]
+        lines.append(f"• {record['title']}\n  {record['source']}, {date}\n  {record['url']}")
+    return '\n\n'.join(lines)
+
+
+class BotCommands:
+    """Відповідає на команди в особистих повідомленнях і групах"""
+
+    def __init__(self, client: TelegramClient, archive: ArticleArchive,
+                 offset_file: str = 'data/bot_offset.json'):
+        """
+        Args:
+            client: Telegram клієнт бота
+            archive: Архів опублікованих статей
+            offset_file: Файл з номером останнього обробленого оновлення
+        """
+        self.client = client
+        self.archive = archive
+        self.offset_file = pathlib.Path(offset_file)
+        self.offset = self._load_offset()
+
+    def _load_offset(self) -> Optional[int]:
+        try:
+            return json.loads(self.offset_file.read_text(encoding='utf-8'))['offset']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def _save_offset(self):
+        self.offset_file.parent.mkdir(exist_ok=True)
+        self.offset_file.write_text(json.dumps({'offset': self.offset}), encoding='utf-8')
+
+    def handle(self, text: str) -> Optional[str]:
+        """Відповідь на команду (None - не команда бота)"""
+        command, _, argument = text.strip().partition(' ')
+        # /search@назва_бота у групах
+        command = command.split('@', 1)[0].lower()
+        argument = argument.strip()
+
+        started = time.perf_counter()
+        if command == '/search':
+            if not argument:
+                return "Вкажіть слова для пошуку: /search статус S"
+            records = self.archive.search(argument, limit=RESULTS_LIMIT)
+            reply = format_results(records) if records else f"Нічого не знайдено: {argument}"
+        elif command == '/latest':
+            limit = int(argument) if argument.isdigit() else RESULTS_LIMIT
+            records = self.archive.latest(min(max(limit, 1), MAX_RESULTS))
+            reply = format_results(records) if records else "Архів порожній"
+        elif command in ('/start', '/help'):
+            reply = HELP_TEXT
+        else:
+            return None
+
+        logger.info("Команда %s (%s): %.1f мс", command, argument,
+                    (time.perf_counter() - started) * 1000)
+        return reply
+
+    def poll_once(self, timeout: int = 25) -> int:
+        """Одне довге опитування; повертає кількість відповідей"""
+        replies = 0
+        updates = self.client.get_updates(self.offset, timeout=timeout)
+        if updates:
+            self.archive.refresh()
+        for update in updates:
+            self.offset = update['update_id'] + 1
+            message = update.get('message') or {}
+            text = message.get('text')
+            if not text or not text.startswith('/'):
+                continue
+            reply = self.handle(text)
+            if reply and self.client.send_text(message['chat']['id'], reply):
+                replies += 1
+        if self.offset is not None:
+            self._save_offset()
+        return replies
+
+    def run(self, timeout: int = 25):
+        """Опитує Bot API, доки процес не зупинять"""
+        logger.info(f"🤖 Бот слухає команди, в архіві {len(self.archive)} статей")
+        while True:
+            try:
+                self.poll_once(timeout)
+            except Exception as e:
+                logger.error(f"Помилка опитування: {e}")
+                time.sleep(5)
+
+
+def main():
+    import log_setup
+    log_setup.setup_logging('logs/bot.log')
+
+    token = os.getenv('TELEGRAM_TOKEN')
+    if not token:
+        raise ValueError("Відсутня змінна середовища TELEGRAM_TOKEN")
+    client = TelegramClient(token, os.getenv('TELEGRAM_CHANNEL', ''))
+    try:
+        BotCommands(client, ArticleArchive()).run()
+    except KeyboardInterrupt:
+        logger.info("Бот зупинено")
+
+
+if __name__ == "__main__":
+    main()
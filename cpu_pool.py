@@ -0,0 +1,154 @@
+"""Пул процесів для CPU-важкої роботи: розбір HTML, витягування тексту, мова"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from extraction import PARAGRAPH_BREAK, Extraction
+
+logger = logging.getLogger(__name__)
+
+# Елементи сторінки, що ніколи не містять тексту статті
+NOISE_TAGS = ['script', 'style', 'nav', 'header', 'footer', 'aside', 'form']
+
+
+class PageResult(NamedTuple):
+    """Компактний результат розбору сторінки (лише те, що потрібно парсеру)"""
+    text: str
+    extraction: Extraction
+    language: Optional[str]
+
+
+def parse_page(content: bytes, selectors: List[str]) -> PageResult:
+    """
+    Розбирає HTML, витягує та очищає основний текст і визначає його мову
+
+    Виконується у воркері пулу (або в поточному потоці без пулу),
+    тому не торкається спільного стану парсера.
+    """
+    from parser import clean_text, detect_language, make_soup
+    from extraction import extract_text
+
+    soup = make_soup(content)
+    for element in soup(NOISE_TAGS):
+        element.decompose()
+
+    extraction = extract_text(soup, selectors)
+    # Назад передаємо лише очищений текст (той самий рядок, без копії);
+    # абзаци зберігаються - по них працює фільтр шаблонного тексту
+    paragraphs = (clean_text(paragraph) for paragraph in extraction.text.split(PARAGRAPH_BREAK))
+    text = PARAGRAPH_BREAK.join(paragraph for paragraph in paragraphs if paragraph)
+    extraction = extraction._replace(text=text)
+
+    language = None
+    if len(text) > 100:
+        try:
+            language = detect_language(text[:2000])
+        except Exception:
+            language = None
+    return PageResult(text, extraction, language)
+
+
+def _init_worker():
+    """Завантажує важкі модулі один раз на воркер, а не на першій сторінці"""
+    import parser
+    parser.make_soup('<p></p>')
+    parser.detect_language('Der Bundesrat hat den Schutzstatus S verlängert')
+
+
+class CpuPool:
+    """
+    Пул процесів поверх ProcessPoolExecutor. Мережеві запити лишаються
+    в потоках конвеєра: потік передає у пул лише байти відповіді
+    й блокується до результату, не тримаючи GIL основного процесу.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Кількість процесів (None - за кількістю ядер; 0 - без пулу)
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.tasks = 0
+        self.wait_time = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'CpuPool':
+        """CPU_WORKERS: кількість процесів (0 - розбір у потоках конвеєра)"""
+        value = os.getenv('CPU_WORKERS')
+        if value:
+            return cls(int(value))
+        # На одному ядрі окремий процес лише додає накладні витрати
+        return cls(os.cpu_count() if (os.cpu_count() or 1) > 1 else 0)
+
+    def __bool__(self) -> bool:
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Процеси створюються при першій сторінці: холостий запуск їх не запускає.
+        # spawn, бо fork з працюючими потоками (логування, конвеєр) небезпечний
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"⚙️ Запуск пулу з {self.workers} процесів")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+            return self._executor
+
+    def parse_page(self, content: bytes, selectors: List[str]) -> PageResult:
+        """Розбирає сторінку в пулі (або в поточному потоці, якщо пул вимкнено)"""
+        started = time.perf_counter()
+        if self.workers:
+            executor = self._get_executor()
+            try:
+                result = executor.submit(parse_page, content, selectors).result()
+            except BrokenProcessPool:
+                # Воркер упав (пам'ять, сигнал) - без нового пулу всі наступні
+                # сторінки лишилися б без тексту; повторюємо один раз
+                self._discard(executor)
+                result = self._get_executor().submit(parse_page, content, selectors).result()
+        else:
+            result = parse_page(content, selectors)
+        with self._lock:
+            self.tasks += 1
+            self.wait_time += time.perf_counter() - started
+        return result
+
+    def map(self, func: Callable, items: Iterable, chunksize: int = 1) -> Iterator:
+        """
+        Виконує func над елементами в пулі (без пулу - у поточному потоці)
+
+        func має бути функцією рівня модуля: процеси стартують через spawn.
+        """
+        if not self.workers:
+            return map(func, items)
+        return self._get_executor().map(func, items, chunksize=chunksize)
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Прибирає зламаний пул (якщо інший потік ще не замінив його)"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logger.warning("⚠️ Процес пулу аварійно завершився - пул буде перезапущено")
+        executor.shutdown(wait=False)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'workers': self.workers, 'tasks': self.tasks,
+                    'avg_ms': self.wait_time / (self.tasks or 1) * 1000}
@@ -0,0 +1,235 @@
+"""Дедлайн запуску: план обробки кожної статті так, щоб вкластися у вікно"""
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import pytz
+from dateutil import parser as date_parser
+
+logger = logging.getLogger(__name__)
+
+# Режими обробки статті - від найдорожчого до найдешевшого
+FULL = 'full'                # повний текст, переклад, синопсис
+DESCRIPTION = 'description'  # без повного тексту: переклад і синопсис опису
+ORIGINAL = 'original'        # без LLM: оригінальний текст
+DEFER = 'defer'              # наступного запуску
+
+# Початкові оцінки тривалості етапів (секунди), поки немає вимірів
+DEFAULT_ESTIMATES = {
+    'fetch': 3.0,
+    FULL: 25.0,
+    DESCRIPTION: 10.0,
+    ORIGINAL: 0.5,
+    'publish': 5.0
+}
+
+# Вага нового виміру в ковзному середньому
+SMOOTHING = 0.3
+
+# Відкладені статті старші за це більше не публікуються
+DEFERRED_MAX_AGE = timedelta(hours=48)
+
+# Черга бекфілу (backfill.py): готові старі статті, які кожен запуск
+# публікує потроху (BACKFILL_PUBLISH_PER_RUN), щоб не засипати канал
+BACKFILL_QUEUE = 'data/backfill_queue.json'
+BACKFILL_PUBLISH_PER_RUN = 10
+
+
+class RunDeadline:
+    """
+    Жорстке вікно запуску з оцінкою тривалості кожного етапу.
+
+    Перед дорогою роботою перевіряється, чи встигне стаття пройти решту
+    конвеєра, з урахуванням публікацій, що вже стоять у черзі
+    (публікація послідовна). Якщо ні - обирається дешевший режим.
+    """
+
+    def __init__(self, window: float = 0, margin: float = 60,
+                 started: Optional[float] = None):
+        """
+        Args:
+            window: Тривалість вікна в секундах (0 - без дедлайну)
+            margin: Запас до жорсткої межі на збереження стану (секунди)
+            started: Початок запуску (time.monotonic)
+        """
+        self.window = window
+        self.started = time.monotonic() if started is None else started
+        self.deadline = self.started + window - margin if window else None
+        self.estimates = dict(DEFAULT_ESTIMATES)
+        self.pending_publishes = 0
+        self.shed = {DESCRIPTION: 0, ORIGINAL: 0, DEFER: 0, 'fetch': 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, publish_delay: float = 0) -> 'RunDeadline':
+        """RUN_DEADLINE_SECONDS (0 або порожньо - без дедлайну)"""
+        deadline = cls(float(os.getenv('RUN_DEADLINE_SECONDS') or 0),
+                       float(os.getenv('RUN_DEADLINE_MARGIN') or 60))
+        deadline.estimates['publish'] += publish_delay
+        return deadline
+
+    def __bool__(self) -> bool:
+        return self.deadline is not None
+
+    def remaining(self) -> Optional[float]:
+        """Секунди до дедлайну (None - без дедлайну)"""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def observe(self, stage: str, seconds: float):
+        """Уточнює оцінку тривалості етапу або режиму"""
+        with self._lock:
+            previous = self.estimates.get(stage, seconds)
+            self.estimates[stage] = previous + SMOOTHING * (seconds - previous)
+
+    def _publish_reserve(self) -> float:
+        # Ця стаття чекатиме на всі публікації, заплановані раніше
+        return (self.pending_publishes + 1) * self.estimates['publish']
+
+    def allow_fetch(self) -> bool:
+        """Чи встигне стаття з повним текстом хоча б у режимі DESCRIPTION"""
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        with self._lock:
+            needed = self.estimates['fetch'] + self.estimates[DESCRIPTION] + self._publish_reserve()
+            if remaining >= needed:
+                return True
+            self.shed['fetch'] += 1
+        return False
+
+    def plan(self) -> str:
+        """
+        Обирає найдорожчий режим, що встигає до дедлайну, і резервує
+        для статті місце в черзі публікацій (крім DEFER)
+        """
+        remaining = self.remaining()
+        with self._lock:
+            if remaining is None:
+                self.pending_publishes += 1
+                return FULL
+            reserve = self._publish_reserve()
+            for mode in (FULL, DESCRIPTION, ORIGINAL):
+                if remaining >= self.estimates[mode] + reserve:
+                    if mode != FULL:
+                        self.shed[mode] += 1
+                    self.pending_publishes += 1
+                    return mode
+            self.shed[DEFER] += 1
+            return DEFER
+
+    def can_publish(self) -> bool:
+        """Чи встигне ще одна публікація"""
+        remaining = self.remaining()
+        return remaining is None or remaining >= self.estimates['publish']
+
+    def done_publishing(self):
+        """Стаття опублікована або відкинута - звільняє місце в черзі"""
+        with self._lock:
+            self.pending_publishes = max(0, self.pending_publishes - 1)
+
+    def summary(self) -> dict:
+        remaining = self.remaining()
+        with self._lock:
+            return {
+                'window': self.window,
+                'remaining': remaining,
+                'shed': dict(self.shed),
+                'estimates': {stage: round(value, 1) for stage, value in self.estimates.items()}
+            }
+
+
+class DeferredQueue:
+    """
+    Статті, на які не вистачило часу, - для наступного запуску.
+    'articles' - ще не оброблені, 'ready' - оброблені, але не опубліковані.
+    """
+
+    def __init__(self, path: str = 'data/deferred.json'):
+        self.path = pathlib.Path(path)
+        self.articles = []
+        self.ready = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return
+        self.articles = data.get('articles', [])
+        self.ready = data.get('ready', [])
+
+    def save(self):
+        with self._lock:
+            data = {'articles': self.articles, 'ready': self.ready}
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    def __len__(self) -> int:
+        return len(self.articles) + len(self.ready)
+
+    def defer_article(self, article):
+        """Відкладає необроблену статтю"""
+        with self._lock:
+            self.articles.append({
+                'title': article.title,
+                'description': article.description,
+                'url': article.url,
+                'source': article.source,
+                'published': article.published_date.isoformat() if article.published_date else None,
+                'subscriptions': [sub.name for sub in article.subscriptions],
+                'relevance': article.relevance
+            })
+
+    def defer_delivery(self, sub_name: str, data: dict):
+        """Відкладає вже оброблену статтю (LLM робота не повторюється)"""
+        with self._lock:
+            self.ready.append({'subscription': sub_name, 'data': data})
+
+    def take_articles(self, subscriptions, article_factory) -> List:
+        """
+        Забирає відкладені статті, ще не застарілі
+
+        Args:
+            subscriptions: Реєстр підписок (за назвами відновлюються підписки статті)
+            article_factory: Конструктор Article(title, description, url, source, published)
+        """
+        with self._lock:
+            items, self.articles = self.articles, []
+        by_name = {sub.name: sub for sub in subscriptions.subscriptions}
+        now = datetime.now(pytz.UTC)
+        articles = []
+        for item in items:
+            published = date_parser.parse(item['published']) if item.get('published') else None
+            if published and now - published > DEFERRED_MAX_AGE:
+                continue
+            subs = [by_name[name] for name in item['subscriptions'] if name in by_name]
+            if not subs:
+                continue
+            article = article_factory(item['title'], item['description'], item['url'],
+                                      item['source'], published)
+            article.subscriptions = subs
+            article.is_ukraine_related = True
+            article.relevance = item.get('relevance', 0)
+            articles.append(article)
+        return articles
+
+    def take_ready(self, limit: Optional[int] = None) -> List[dict]:
+        """Забирає оброблені статті, що чекають на публікацію (не більше limit)"""
+        with self._lock:
+            if limit is None:
+                items, self.ready = self.ready, []
+            else:
+                items, self.ready = self.ready[:limit], self.ready[limit:]
+        return items
@@ -0,0 +1,245 @@
+"""Адаптивні профілі витягування тексту статей по доменах"""
+
+import json
+import logging
+import pathlib
+import re
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Відомі селектори - стартова точка до того, як профіль навчиться
+SEED_SELECTORS = {
+    'swissinfo.ch': ['.article__content', '[data-testid="article-content"]'],
+    'letemps.ch': ['.article-content', '.article__content'],
+    '20min.ch': ['.article-content', '.ArticleDetail_content'],
+    'nzz.ch': ['.articlecomponent', '.article-content']
+}
+
+GENERIC_SELECTORS = ['article', '.article', '.content', 'main']
+
+# Псевдоселектор: у цьому місці черги шукати контейнер за щільністю тексту
+LEARN_CONTAINER = ':density'
+
+# Мінімальна довжина тексту, щоб вважати витягування вдалим
+MIN_CONTENT_LENGTH = 100
+
+# Селектор відкидається, якщо промахів значно більше за влучання
+MAX_MISS_RATIO = 3
+
+# Теги-кандидати для оцінки щільності тексту
+CANDIDATE_TAGS = ['article', 'main', 'section', 'div']
+
+# Блоки, що стають окремими абзацами витягнутого тексту
+PARAGRAPH_TAGS = ['p', 'h2', 'h3', 'h4', 'li', 'blockquote', 'figcaption', 'pre']
+PARAGRAPH_BREAK = '\n\n'
+
+# Класи/id з цифрами зазвичай генеруються і змінюються між сторінками
+_UNSTABLE_NAME = re.compile(r'\d')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def domain_of(url: str) -> str:
+    """Домен без www."""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _text_length(element) -> int:
+    return len(_WHITESPACE.sub(' ', element.get_text(' ')).strip())
+
+
+def paragraph_text(element) -> str:
+    """
+    Текст елемента по абзацах (розділених PARAGRAPH_BREAK). Якщо блоки
+    покривають менше половини тексту (текст через <br> чи в голих <div>),
+    текст повертається одним абзацом.
+    """
+    blocks = [block for block in element.find_all(PARAGRAPH_TAGS)
+              if not any(parent in PARAGRAPH_TAGS for parent in _parents_within(block, element))]
+    texts = [_WHITESPACE.sub(' ', block.get_text(' ')).strip() for block in blocks]
+    texts = [text for text in texts if text]
+    whole = element.get_text(' ')
+    if sum(map(len, texts)) * 2 < len(_WHITESPACE.sub(' ', whole).strip()):
+        return whole
+    return PARAGRAPH_BREAK.join(texts)
+
+
+def _parents_within(block, container):
+    for parent in block.parents:
+        if parent is container:
+            return
+        yield parent.name
+
+
+def density_score(element) -> float:
+    """
+    Оцінка контейнера: довжина тексту прямих абзаців <p>,
+    зменшена на частку тексту посилань (меню, тизери)
+    """
+    paragraphs = element.find_all('p', recursive=False)
+    if not paragraphs:
+        return 0.0
+    text = sum(_text_length(p) for p in paragraphs)
+    if not text:
+        return 0.0
+    links = sum(_text_length(a) for p in paragraphs for a in p.find_all('a'))
+    return text * (1 - links / text)
+
+
+def selector_for(element) -> Optional[str]:
+    """Будує стабільний CSS селектор для елемента або None"""
+    element_id = element.get('id')
+    if element_id and not _UNSTABLE_NAME.search(element_id):
+        return f'#{element_id}'
+    for css_class in element.get('class') or []:
+        if not _UNSTABLE_NAME.search(css_class):
+            return f'{element.name}.{css_class}'
+    return None
+
+
+def learn_container(soup) -> Tuple[Optional[str], Optional[object]]:
+    """Контейнер з найбільшою щільністю тексту та його стабільний селектор"""
+    best, best_score = None, 0.0
+    for element in soup.find_all(CANDIDATE_TAGS):
+        score = density_score(element)
+        if score > best_score:
+            best, best_score = element, score
+    if best is None:
+        return None, None
+
+    selector = selector_for(best)
+    # Вчимо селектор, лише якщо він однозначно знаходить той самий елемент
+    if selector and soup.select_one(selector) is not best:
+        selector = None
+    return selector, best
+
+
+class Extraction(NamedTuple):
+    """Результат extract_text (компактний, передається між процесами)"""
+    text: str
+    selector: Optional[str]
+    outcomes: List[Tuple[str, bool]]
+    learned: bool
+    attempts: int
+
+
+def extract_text(soup, selectors: List[str]) -> Extraction:
+    """
+    Пробує селектори по черзі, а якщо жоден не дав тексту - шукає
+    контейнер за щільністю (або раніше, де в черзі стоїть LEARN_CONTAINER).
+    Профілі не змінюються, тож функція може виконуватись в окремому
+    процесі; результат застосовує ExtractionProfiles.apply.
+    """
+    outcomes = []
+    attempts = 0
+    fallback = None
+    if LEARN_CONTAINER not in selectors:
+        selectors = selectors + [LEARN_CONTAINER]
+    for selector in selectors:
+        attempts += 1
+        if selector == LEARN_CONTAINER:
+            fallback = ""
+            learned, element = learn_container(soup)
+            if element is not None:
+                fallback = paragraph_text(element)
+                if learned and len(fallback.strip()) >= MIN_CONTENT_LENGTH:
+                    outcomes.append((learned, True))
+                    return Extraction(fallback, learned, outcomes, True, attempts)
+            continue
+        element = soup.select_one(selector)
+        if element is None:
+            continue
+        candidate = paragraph_text(element)
+        if len(candidate.strip()) >= MIN_CONTENT_LENGTH:
+            outcomes.append((selector, True))
+            return Extraction(candidate, selector, outcomes, False, attempts)
+        outcomes.append((selector, False))
+    return Extraction(fallback, None, outcomes, False, attempts)
+
+
+class ExtractionProfiles:
+    """
+    Запам'ятовує, який селектор дав добрий текст для кожного домену,
+    і пробує його першим. Нові домени вивчаються за щільністю тексту.
+    """
+
+    def __init__(self, path: str = 'data/extraction_profiles.json'):
+        self.path = pathlib.Path(path)
+        self.profiles = self._load()
+        self.attempts = 0
+        self.extractions = 0
+        self.learned = 0
+        self.extracted_chars = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігає профілі на диск"""
+        with self._lock:
+            data = json.dumps(self.profiles, ensure_ascii=False, indent=1)
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.write_text(data, encoding='utf-8')
+
+    def candidates(self, domain: str) -> List[str]:
+        """
+        Селектори у порядку спроб: вивчені → відомі → загальні. Для домену
+        без профілю спершу вчимося за щільністю, бо загальні селектори
+        майже завжди щось знаходять і навчання інакше не запускалося б.
+        """
+        with self._lock:
+            learned = self.profiles.get(domain, {})
+            ranked = sorted(
+                (sel for sel, s in learned.items()
+                 if s['misses'] <= MAX_MISS_RATIO * s['hits']),
+                key=lambda sel: learned[sel]['hits'] - learned[sel]['misses'],
+                reverse=True
+            )
+        seeds = next((sels for key, sels in SEED_SELECTORS.items()
+                      if domain == key or domain.endswith('.' + key)), [])
+        ordered = [] if ranked or seeds else [LEARN_CONTAINER]
+        for selector in ranked + seeds + GENERIC_SELECTORS:
+            if selector not in ordered:
+                ordered.append(selector)
+        return ordered
+
+    def record(self, domain: str, selector: str, success: bool):
+        """Фіксує результат спроби селектора"""
+        with self._lock:
+            stats = self.profiles.setdefault(domain, {}).setdefault(
+                selector, {'hits': 0, 'misses': 0})
+            stats['hits' if success else 'misses'] += 1
+
+    def apply(self, domain: str, result: Extraction):
+        """Оновлює профіль домену результатом extract_text (зокрема з іншого процесу)"""
+        for selector, success in result.outcomes:
+            self.record(domain, selector, success)
+        if result.learned:
+            logger.info(f"Вивчено селектор {result.selector} для {domain}")
+        with self._lock:
+            self.attempts += result.attempts
+            self.learned += result.learned
+            self.extractions += 1
+            self.extracted_chars += len(result.text)
+
+    def summary(self) -> dict:
+        """Статистика витягування за запуск"""
+        with self._lock:
+            count = self.extractions or 1
+            return {
+                'extractions': self.extractions,
+                'attempts_per_article': self.attempts / count,
+                'avg_chars': self.extracted_chars / count,
+                'learned': self.learned,
+                'domains': len(self.profiles)
+            }
@@ -0,0 +1,113 @@
+"""Політика завантаження повного тексту: качаємо лише те, що буде використано"""
+
+import logging
+import threading
+from typing import Callable, Optional, Tuple
+
+from host_health import HostHealthRegistry
+from llm_budget import TokenBudget, estimate_article_tokens
+
+logger = logging.getLogger(__name__)
+
+# Опис такої довжини вже містить текст статті (частина стрічок дає його повністю)
+FULL_DESCRIPTION = 1500
+# Опис, якого досить для синопсису, якщо збіг ключових слів слабкий
+MIN_DESCRIPTION = 500
+# Сила збігу (кількість шаблонів), з якої стаття варта повного тексту завжди
+STRONG_RELEVANCE = 2
+# Очікувана вартість перекладу повного тексту (~3000 символів, з відповіддю)
+FULL_TEXT_TOKENS = 2400
+
+
+class FetchPolicy:
+    """
+    Вирішує для кожної статті, чи варто завантажувати повний текст,
+    і рахує пропущені, корисні та марні завантаження
+    """
+
+    def __init__(self, host_health: HostHealthRegistry,
+                 budget: Optional[TokenBudget] = None,
+                 full_description: int = FULL_DESCRIPTION,
+                 min_description: int = MIN_DESCRIPTION,
+                 strong_relevance: int = STRONG_RELEVANCE):
+        """
+        Args:
+            host_health: Реєстр здоров'я хостів парсера
+            budget: Бюджет токенів (None - без обмежень)
+            full_description: Довжина опису, з якої текст не завантажується
+            min_description: Довжина опису, досить для слабко релевантних статей
+            strong_relevance: Сила збігу, з якої текст завантажується завжди
+        """
+        self.host_health = host_health
+        self.budget = budget
+        self.full_description = full_description
+        self.min_description = min_description
+        self.strong_relevance = strong_relevance
+
+        self.skipped = {}
+        self.fetched = 0
+        self.empty = 0
+        self.useful = 0
+        self.wasted = 0
+        self._lock = threading.Lock()
+
+    def decide(self, article) -> Tuple[bool, str]:
+        """Повертає (завантажувати, причина)"""
+        description = article.description or ''
+        relevance = getattr(article, 'relevance', 0) or 0
+
+        if len(description) >= self.full_description:
+            return False, 'description'
+        if len(description) >= self.min_description and relevance < self.strong_relevance:
+            return False, 'description'
+
+        if self.budget is not None and self.budget.limited:
+            subs = article.subscriptions
+            translate = any(sub.translate for sub in subs)
+            summarize = any(sub.summarize for sub in subs)
+            base = estimate_article_tokens(article.title, description, None, translate, summarize)
+            extra = FULL_TEXT_TOKENS if translate else 0
+            # Якщо з текстом стаття вже не вміститься в бюджет, а без нього
+            # вміщується - текст лише перевів би її в оригінальну мову
+            if self.budget.can_afford(base) and not self.budget.can_afford(base + extra):
+                return False, 'budget'
+
+        if self.host_health.is_open(article.url):
+            return False, 'host'
+        return True, 'fetch'
+
+    def fetch(self, article, fetch_full_text: Callable) -> bool:
+        """Завантажує повний текст, якщо це варто робити; True - текст отримано"""
+        should_fetch, reason = self.decide(article)
+        if not should_fetch:
+            with self._lock:
+                self.skipped[reason] = self.skipped.get(reason, 0) + 1
+            logger.info("Пропускаємо повний текст (%s): %s", reason, article.url)
+            return False
+
+        text = fetch_full_text(article)
+        with self._lock:
+            self.fetched += 1
+            if not text:
+                self.empty += 1
+        return bool(text)
+
+    def record_outcome(self, article, used: bool):
+        """Чи знадобився завантажений текст (стаття пройшла обробку)"""
+        if not article.full_text:
+            return
+        with self._lock:
+            if used:
+                self.useful += 1
+            else:
+                self.wasted += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'fetched': self.fetched,
+                'empty': self.empty,
+                'useful': self.useful,
+                'wasted': self.wasted,
+                'skipped': dict(self.skipped)
+            }
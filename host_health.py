@@ -0,0 +1,208 @@
+"""Реєстр здоров'я хостів з автоматичним вимикачем (circuit breaker)"""
+
+import json
+import logging
+import pathlib
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Скільки останніх вимірів затримки зберігати для кожного хоста
+LATENCY_SAMPLES = 50
+
+
+class HostHealth:
+    """Стан одного хоста"""
+
+    __slots__ = ('failure_streak', 'total_failures', 'total_successes',
+                 'latencies', 'open_until', 'last_error')
+
+    def __init__(self):
+        self.failure_streak = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.latencies = []
+        self.open_until = 0.0
+        self.last_error = None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Повертає перцентиль затримки (0-100) або None, якщо даних немає"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def to_dict(self) -> dict:
+        return {
+            'failure_streak': self.failure_streak,
+            'total_failures': self.total_failures,
+            'total_successes': self.total_successes,
+            'latencies': [round(x, 3) for x in self.latencies],
+            'open_until': self.open_until,
+            'last_error': self.last_error
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'HostHealth':
+        health = cls()
+        health.failure_streak = data.get('failure_streak', 0)
+        health.total_failures = data.get('total_failures', 0)
+        health.total_successes = data.get('total_successes', 0)
+        health.latencies = list(data.get('latencies', []))[-LATENCY_SAMPLES:]
+        health.open_until = data.get('open_until', 0.0)
+        health.last_error = data.get('last_error')
+        return health
+
+
+class HostHealthRegistry:
+    """
+    Відстежує затримки та серії помилок по хостах між запусками.
+    Після кількох помилок поспіль хост "відкривається" (пропускається),
+    а повторна перевірка відбувається за експоненційним графіком.
+    """
+
+    def __init__(self, path: str = 'data/host_health.json',
+                 failure_threshold: int = 3, base_backoff: float = 900,
+                 max_backoff: float = 86400, min_timeout: float = 3):
+        """
+        Args:
+            path: Файл для збереження стану між запусками
+            failure_threshold: Кількість помилок поспіль до відкриття вимикача
+            base_backoff: Початкова пауза перед повторною перевіркою (секунди)
+            max_backoff: Максимальна пауза (секунди)
+            min_timeout: Мінімальний таймаут для проблемних хостів (секунди)
+        """
+        self.path = pathlib.Path(path)
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_timeout = min_timeout
+        self.hosts = self._load()
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        """Завантажує стан хостів з диска"""
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            return {host: HostHealth.from_dict(item) for host, item in data.items()}
+        except (json.JSONDecodeError, AttributeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігає стан хостів на диск"""
+        with self._lock:
+            data = {host: health.to_dict() for host, health in self.hosts.items()}
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """Виділяє хост з URL"""
+        return urlparse(url).netloc.lower()
+
+    def _get(self, host: str) -> HostHealth:
+        health = self.hosts.get(host)
+        if health is None:
+            health = self.hosts[host] = HostHealth()
+        return health
+
+    def allow(self, url: str) -> bool:
+        """
+        Чи можна зараз звертатися до хоста
+
+        Якщо пауза відкритого вимикача минула, дозволяє один пробний запит
+        і відсуває наступну перевірку, щоб паралельні воркери не дублювали її.
+        """
+        host = self.host_of(url)
+        now = time.time()
+        with self._lock:
+            health = self.hosts.get(host)
+            if health is None or health.failure_streak < self.failure_threshold:
+                return True
+            if now >= health.open_until:
+                health.open_until = now + self._backoff(health.failure_streak)
+                logger.info("Пробний запит до нестабільного хоста: %s", host)
+                return True
+            self.skipped += 1
+        logger.info("Пропускаємо %s: %d помилок поспіль", host, health.failure_streak)
+        return False
+
+    def is_open(self, url: str) -> bool:
+        """Чи вимикач хоста зараз відкритий (без пробного запиту)"""
+        host = self.host_of(url)
+        with self._lock:
+            health = self.hosts.get(host)
+            return (health is not None and health.failure_streak >= self.failure_threshold
+                    and time.time() < health.open_until)
+
+    def timeout_for(self, url: str, default: float) -> float:
+        """Повертає таймаут з урахуванням історії хоста"""
+        host = self.host_of(url)
+        with self._lock:
+            health = self.hosts.get(host)
+            if health is None:
+                return default
+            p95 = health.percentile(95)
+            streak = health.failure_streak
+
+        timeout = default
+        if p95 is not None:
+            # Здоровому хосту даємо запас утричі більший за p95
+            timeout = min(default, max(self.min_timeout, p95 * 3))
+        if streak:
+            timeout = max(self.min_timeout, timeout / (streak + 1))
+        return timeout
+
+    def _backoff(self, streak: int) -> float:
+        power = max(0, streak - self.failure_threshold)
+        return min(self.max_backoff, self.base_backoff * (2 ** power))
+
+    def record_success(self, url: str, latency: float):
+        """Фіксує успішний запит"""
+        host = self.host_of(url)
+        with self._lock:
+            health = self._get(host)
+            if health.failure_streak >= self.failure_threshold:
+                logger.info(f"Хост {host} відновився")
+            health.failure_streak = 0
+            health.open_until = 0.0
+            health.total_successes += 1
+            health.latencies.append(latency)
+            del health.latencies[:-LATENCY_SAMPLES]
+
+    def record_failure(self, url: str, error: str):
+        """Фіксує невдалий запит і за потреби відкриває вимикач"""
+        host = self.host_of(url)
+        with self._lock:
+            health = self._get(host)
+            health.failure_streak += 1
+            health.total_failures += 1
+            health.last_error = error[:200]
+            if health.failure_streak >= self.failure_threshold:
+                health.open_until = time.time() + self._backoff(health.failure_streak)
+                logger.warning(
+                    f"Вимикач для {host} відкрито після {health.failure_streak} "
+                    f"помилок поспіль: {health.last_error}"
+                )
+
+    def summary(self) -> dict:
+        """Короткий звіт: пропущені запити та нестабільні хости"""
+        with self._lock:
+            unhealthy = {
+                host: health.failure_streak for host, health in self.hosts.items()
+                if health.failure_streak >= self.failure_threshold
+            }
+        return {'skipped': self.skipped, 'unhealthy': unhealthy}
+
+
+def is_host_failure(status_code: int) -> bool:
+    """Чи свідчить HTTP статус про проблему з хостом (а не з конкретною сторінкою)"""
+    return status_code >= 500 or status_code in (403, 429)
@@ -0,0 +1,152 @@
+"""Спільний HTTP транспорт: пул з'єднань, стиснення, ліміт розміру відповіді"""
+
+import logging
+import threading
+import weakref
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Максимальний розмір тіла відповіді (байти після розпакування)
+MAX_RESPONSE_BYTES = 5 * 1024 * 1024
+
+DEFAULT_TIMEOUT = 15
+
+
+def _accept_encoding() -> str:
+    """brotli додаємо лише якщо urllib3 зможе його розпакувати"""
+    try:
+        import brotli  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return 'gzip, deflate, br'
+        except ImportError:
+            return 'gzip, deflate'
+
+
+class ResponseTooLarge(requests.RequestException):
+    """Відповідь перевищує MAX_RESPONSE_BYTES (для стану хостів - звичайна помилка запиту)"""
+
+
+class HttpTransport:
+    """HTTP транспорт, спільний для стрічок, сторінок статей і Telegram"""
+
+    def __init__(self, pool_connections: int = 16, pool_maxsize: int = 8,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_bytes: int = MAX_RESPONSE_BYTES):
+        """
+        Args:
+            pool_connections: Кількість хостів, для яких тримаються пули
+            pool_maxsize: Максимум з'єднань в пулі одного хоста
+            timeout: Таймаут за замовчуванням (секунди)
+            max_bytes: Максимальний розмір тіла відповіді
+        """
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': _accept_encoding()
+        })
+        self.adapter = HTTPAdapter(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self.requests = 0
+        self.connections = 0
+        self.reused = 0
+        self.wire_bytes = 0
+        self.body_bytes = 0
+        self._lock = threading.Lock()
+        # З'єднання urllib3, через які вже йшли запити (пули, витіснені
+        # PoolManager, зникають звідси разом зі своїми з'єднаннями)
+        self._seen_connections = weakref.WeakSet()
+
+    def _count_connection(self, response: requests.Response):
+        connection = getattr(response.raw, 'connection', None)
+        if connection is None:
+            return
+        with self._lock:
+            if connection in self._seen_connections:
+                self.reused += 1
+            else:
+                self._seen_connections.add(connection)
+                self.connections += 1
+
+    def _read(self, response: requests.Response) -> requests.Response:
+        """Читає тіло відповіді з обмеженням розміру"""
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            response.close()
+            raise ResponseTooLarge(f"{response.url}: {declared} байт")
+        self._count_connection(response)
+
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ResponseTooLarge(f"{response.url}: більше {self.max_bytes} байт")
+                chunks.append(chunk)
+        finally:
+            # tell() повертає кількість байт, прочитаних з мережі (до розпакування)
+            wire = response.raw.tell() if hasattr(response.raw, 'tell') else size
+            response.close()
+            with self._lock:
+                self.requests += 1
+                self.wire_bytes += wire
+                self.body_bytes += size
+
+        response._content = b''.join(chunks)
+        return response
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """GET запит; тіло вже прочитане в response.content"""
+        response = self.session.get(url, timeout=timeout or self.timeout,
+                                    stream=True, **kwargs)
+        return self._read(response)
+
+    def post(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """POST запит; тіло вже прочитане в response.content"""
+        response = self.session.post(url, timeout=timeout or self.timeout,
+                                     stream=True, **kwargs)
+        return self._read(response)
+
+    def put(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """PUT запит; тіло вже прочитане в response.content"""
+        response = self.session.put(url, timeout=timeout or self.timeout,
+                                    stream=True, **kwargs)
+        return self._read(response)
+
+    def stats(self) -> dict:
+        """Статистика: запити, нові з'єднання, повторно використані, байти"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'connections': self.connections,
+                'reused': self.reused,
+                'wire_bytes': self.wire_bytes,
+                'body_bytes': self.body_bytes
+            }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport() -> HttpTransport:
+    """Повертає спільний для всього процесу транспорт"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpTransport()
+        return _shared
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Визначення мови пакетом текстів за профілями символьних n-грам
+
+Лише мови наших джерел (de, fr, it, en, uk, rm): наївний Баєс за 1-3
+грамами слів, оцінки всього пакета рахуються матричними операціями
+NumPy. Результат детермінований, на коротких заголовках точніший за
+langdetect і в десятки разів швидший.
+
+    python langid.py --build     # перебудувати langid_data/profiles.json
+"""
+
+import argparse
+import json
+import math
+import pathlib
+import re
+import threading
+from collections import Counter
+from typing import List, Optional, Sequence
+
+DATA_DIR = pathlib.Path(__file__).resolve().parent / 'langid_data'
+PROFILES = DATA_DIR / 'profiles.json'
+
+LANGUAGES = ('de', 'fr', 'it', 'en', 'uk', 'rm')
+UNKNOWN = 'unknown'
+
+# Ймовірність n-грами, якої немає у профілі мови (профілі обрізані
+# приблизно на 1e-4, тож відсутня n-грама трохи рідша за найрідшу)
+FLOOR_PROBABILITY = 2e-5
+
+# Профіль з власного корпусу (мов без профілю langdetect): n-грами,
+# що трапилися хоча б стільки разів
+MIN_CORPUS_COUNT = 2
+
+# Довші тексти обрізаються - мова зрозуміла задовго до кінця статті
+MAX_TEXT_CHARS = 1000
+
+# Кодова точка символу займає 20 біт ключа n-грами, порядок n - старші біти
+_CHAR_BITS = 20
+_CHAR_MASK = (1 << _CHAR_BITS) - 1
+_NON_LETTERS = re.compile(r'[\W\d_]+')
+
+
+def normalize(text: str) -> str:
+    """Нижній регістр, усе, що не літера, - пробіл; по пробілу з країв"""
+    return f" {_NON_LETTERS.sub(' ', text.lower()).strip()} "
+
+
+def ngrams(text: str) -> Counter:
+    """1-3 грами в межах слів (з пробілами на межах, як у профілях langdetect)"""
+    counts = Counter()
+    for word in normalize(text).split():
+        padded = f' {word} '
+        for n in (1, 2, 3):
+            for start in range(len(padded) - n + 1):
+                gram = padded[start:start + n]
+                if gram != ' ' and '  ' not in gram:
+                    counts[gram] += 1
+    return counts
+
+
+def _gram_key(gram: str) -> int:
+    key = len(gram)
+    for char in gram:
+        key = (key << _CHAR_BITS) | min(ord(char), _CHAR_MASK)
+    return key << (_CHAR_BITS * (3 - len(gram)))
+
+
+class LanguageIdentifier:
+    """
+    Матриця логарифмів ймовірностей (n-грама × мова) та пакетна оцінка
+
+    Тексти пакета склеюються в один масив кодових точок; ключі всіх n-грам
+    шукаються у відсортованому словнику одним searchsorted, а суми по
+    текстах - через bincount.
+    """
+
+    def __init__(self, profiles_path: pathlib.Path = PROFILES):
+        import numpy as np
+
+        data = json.loads(pathlib.Path(profiles_path).read_text(encoding='utf-8'))
+        self.languages = tuple(data['languages'])
+        grams = sorted({gram for profile in data['profiles'].values() for gram in profile['freq']},
+                       key=_gram_key)
+        self.vocabulary = np.array([_gram_key(gram) for gram in grams], dtype=np.uint64)
+        index = {gram: i for i, gram in enumerate(grams)}
+        self.weights = np.full((len(grams), len(self.languages)), math.log(FLOOR_PROBABILITY))
+        for column, language in enumerate(self.languages):
+            profile = data['profiles'][language]
+            for gram, count in profile['freq'].items():
+                total = profile['n_words'][len(gram) - 1]
+                self.weights[index[gram], column] = math.log(count / total)
+
+    def scores(self, texts: Sequence[str]):
+        """
+        Логарифмічні правдоподібності (текст × мова) та кількість
+        знайдених у словнику n-грам кожного тексту
+        """
+        import numpy as np
+
+        padded = [normalize(text[:MAX_TEXT_CHARS]) for text in texts]
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+        chars = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        np.minimum(chars, _CHAR_MASK, out=chars)
+        owner = np.repeat(np.arange(len(padded)), lengths)
+
+        # Ключі n-грам, що починаються в кожній позиції; n-грами через межу
+        # текстів містять два пробіли поспіль і в словник не потрапляють
+        unigrams = (1 << 3 * _CHAR_BITS) | (chars << 2 * _CHAR_BITS)
+        bigrams = (2 << 3 * _CHAR_BITS) | (chars[:-1] << 2 * _CHAR_BITS) | (chars[1:] << _CHAR_BITS)
+        trigrams = ((3 << 3 * _CHAR_BITS) | (chars[:-2] << 2 * _CHAR_BITS)
+                    | (chars[1:-1] << _CHAR_BITS) | chars[2:])
+        keys = np.concatenate([unigrams, bigrams, trigrams])
+        owners = np.concatenate([owner, owner[:-1], owner[:-2]])
+
+        position = np.searchsorted(self.vocabulary, keys)
+        np.minimum(position, len(self.vocabulary) - 1, out=position)
+        found = self.vocabulary[position] == keys
+        position, owners = position[found], owners[found]
+
+        weights = self.weights[position]
+        totals = np.stack([np.bincount(owners, weights=weights[:, column], minlength=len(padded))
+                           for column in range(len(self.languages))], axis=1)
+        return totals, np.bincount(owners, minlength=len(padded))
+
+    def identify_batch(self, texts: Sequence[str]) -> List[str]:
+        """Мова кожного тексту пакета ('unknown' - жодної знайомої n-грами)"""
+        if not texts:
+            return []
+        totals, hits = self.scores(texts)
+        best = totals.argmax(axis=1)
+        return [self.languages[column] if count else UNKNOWN
+                for column, count in zip(best.tolist(), hits.tolist())]
+
+
+_identifier: Optional[LanguageIdentifier] = None
+_identifier_lock = threading.Lock()
+
+
+def shared_identifier() -> LanguageIdentifier:
+    """Один ідентифікатор на процес (профілі та NumPy завантажуються при першому виклику)"""
+    global _identifier
+    with _identifier_lock:
+        if _identifier is None:
+            _identifier = LanguageIdentifier()
+        return _identifier
+
+
+def identify_batch(texts: Sequence[str]) -> List[str]:
+    return shared_identifier().identify_batch(texts)
+
+
+def identify(text: str) -> str:
+    return shared_identifier().identify_batch([text])[0]
+
+
+def build_profiles(output: pathlib.Path = PROFILES):
+    """
+    Збирає профілі: de/fr/it/en/uk - з профілів langdetect (регістр
+    об'єднується), мови без них - з корпусу langid_data/<мова>.txt
+    """
+    import langdetect
+
+    source = pathlib.Path(langdetect.__file__).parent / 'profiles'
+    profiles = {}
+    for language in LANGUAGES:
+        corpus = DATA_DIR / f'{language}.txt'
+        if corpus.exists():
+            counts = ngrams(corpus.read_text(encoding='utf-8'))
+            freq = {gram: count for gram, count in counts.items() if count >= MIN_CORPUS_COUNT}
+        else:
+            freq = Counter()
+            for gram, count in json.loads((source / language).read_text(encoding='utf-8'))['freq'].items():
+                gram = gram.lower()
+                if gram.strip() and not _NON_LETTERS.search(gram.replace(' ', '')):
+                    freq[gram] += count
+            freq = dict(freq)
+        n_words = [sum(count for gram, count in freq.items() if len(gram) == n) for n in (1, 2, 3)]
+        profiles[language] = {'n_words': n_words, 'freq': dict(sorted(freq.items()))}
+        print(f"{language}: {len(freq)} n-грам ({'корпус' if corpus.exists() else 'langdetect'})")
+
+    output.write_text(json.dumps({'languages': list(LANGUAGES), 'profiles': profiles},
+                                 ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    print(f"💾 Профілі записано у {output}")
+
+
+def main():
+    arguments = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arguments.add_argument('--build', action='store_true', help="перебудувати профілі")
+    arguments.add_argument('texts', nargs='*', help="тексти для визначення мови")
+    options = arguments.parse_args()
+    if options.build:
+        build_profiles()
+    for text, language in zip(options.texts, identify_batch(options.texts)):
+        print(f"{language}\t{text}")
+
+
+if __name__ == "__main__":
+    main()
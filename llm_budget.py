@@ -0,0 +1,208 @@
+"""Облік токенів OpenAI та бюджет на запуск і на добу"""
+
+import json
+import logging
+import math
+import os
+import pathlib
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Службові токени на повідомлення чату (роль, розділювачі)
+MESSAGE_OVERHEAD = 8
+
+# Повний текст до цієї довжини резюмується одним викликом,
+# довший - по частинах (Summarizer, map-reduce)
+SUMMARY_WINDOW_CHARS = 2000
+SUMMARY_CHUNK_TOKENS = 800
+SUMMARY_MAX_CHUNKS = 8
+
+
+class BudgetExceeded(Exception):
+    """Виклик LLM перевищив би бюджет токенів"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Локальна оцінка кількості токенів без токенізатора:
+    латиниця ~4 символи на токен, кирилиця та інші не-ASCII ~2
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return math.ceil(ascii_chars / 4 + non_ascii / 2)
+
+
+def estimate_article_tokens(title: str, description: str, full_text: Optional[str],
+                            translate: bool, summarize: bool) -> int:
+    """Орієнтовна вартість обробки статті (промпти + відповіді)"""
+    source = estimate_tokens(title) + estimate_tokens(description) + estimate_tokens(full_text or '')
+    total = 0
+    if translate:
+        # Промпт + переклад приблизно такої ж довжини (українська "дорожча")
+        total += source * 3 + 3 * (150 + MESSAGE_OVERHEAD)
+    if summarize:
+        if full_text and len(full_text) > SUMMARY_WINDOW_CHARS:
+            # Кожна частина: промпт + факти (~200), потім синопсис з фактів
+            text_tokens = estimate_tokens(full_text) * 2
+            chunks = min(math.ceil(text_tokens / SUMMARY_CHUNK_TOKENS), SUMMARY_MAX_CHUNKS)
+            total += text_tokens + chunks * (150 + 200) + chunks * 200 + 500 + 250
+        else:
+            # Синопсис бачить не більше ~2000 символів тексту
+            total += min(source * 2, 1200) + 500 + 250
+    return total
+
+
+class TokenBudget:
+    """
+    Бюджет токенів: ліміт на запуск і на добу (0 - без ліміту).
+    Перед викликом резервується оцінка, після - фіксується фактичне usage.
+    """
+
+    def __init__(self, per_run: int = 0, per_day: int = 0,
+                 path: str = 'data/llm_usage.json'):
+        self.per_run = per_run
+        self.per_day = per_day
+        self.path = pathlib.Path(path)
+        self.today = datetime.now(pytz.UTC).date().isoformat()
+        self.history = self._load()
+        self.day_used_before = self.history.get(self.today, 0)
+
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+        self.denied = 0
+        self.fallbacks = 0
+        self.reserved = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'TokenBudget':
+        """LLM_RUN_TOKEN_BUDGET та LLM_DAILY_TOKEN_BUDGET (0 або порожньо - без ліміту)"""
+        return cls(per_run=int(os.getenv('LLM_RUN_TOKEN_BUDGET') or 0),
+                   per_day=int(os.getenv('LLM_DAILY_TOKEN_BUDGET') or 0))
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігає добове використання (історія за останні 31 день)"""
+        with self._lock:
+            self.history[self.today] = self.day_used_before + self.used
+            recent = dict(sorted(self.history.items())[-31:])
+        self.path.parent.mkdir(exist_ok=True)
+        self.path.write_text(json.dumps(recent, indent=1), encoding='utf-8')
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.per_run or self.per_day)
+
+    @property
+    def used(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def remaining(self) -> Optional[int]:
+        """Залишок з урахуванням резервувань (None - без ліміту)"""
+        with self._lock:
+            return self._remaining()
+
+    def _remaining(self) -> Optional[int]:
+        limits = []
+        committed = self.used + self.reserved
+        if self.per_run:
+            limits.append(self.per_run - committed)
+        if self.per_day:
+            limits.append(self.per_day - self.day_used_before - committed)
+        return min(limits) if limits else None
+
+    def can_afford(self, tokens: int) -> bool:
+        remaining = self.remaining()
+        return remaining is None or tokens <= remaining
+
+    def reserve(self, tokens: int) -> int:
+        """Резервує токени під виклик або кидає BudgetExceeded"""
+        with self._lock:
+            remaining = self._remaining()
+            if remaining is not None and tokens > remaining:
+                self.denied += 1
+                raise BudgetExceeded(f"потрібно ~{tokens} токенів, залишилось {remaining}")
+            self.reserved += tokens
+        return tokens
+
+    def settle(self, reservation: int, usage=None):
+        """Знімає резерв і фіксує фактичне використання з response.usage"""
+        with self._lock:
+            self.reserved -= reservation
+            if usage is not None:
+                self.prompt_tokens += getattr(usage, 'prompt_tokens', 0) or 0
+                self.completion_tokens += getattr(usage, 'completion_tokens', 0) or 0
+                self.calls += 1
+
+    def note_fallback(self):
+        """Стаття опублікована без LLM обробки через бюджет"""
+        with self._lock:
+            self.fallbacks += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'fallbacks': self.fallbacks,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+                'denied': self.denied,
+                'day_total': self.day_used_before + self.used
+            }
+
+
+def chat_completion(client, budget: Optional[TokenBudget], prompt: str,
+                    max_tokens: int, temperature: float, model: str = "gpt-3.5-turbo"):
+    """Виклик chat.completions з резервуванням і обліком токенів"""
+    reservation = 0
+    if budget is not None:
+        # Відповідь рідко довша за промпт (переклад) і не довша за max_tokens
+        prompt_tokens = estimate_tokens(prompt) + MESSAGE_OVERHEAD
+        reservation = budget.reserve(prompt_tokens + min(max_tokens, prompt_tokens + 50))
+    usage = None
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        usage = getattr(response, 'usage', None)
+        return response
+    finally:
+        if budget is not None:
+            budget.settle(reservation, usage)
+
+
+def article_priority(article, now: Optional[datetime] = None) -> float:
+    """Пріоритет: сила збігу ключових слів, що згасає з віком статті"""
+    now = now or datetime.now(pytz.UTC)
+    age_hours = 0.0
+    if article.published_date:
+        age_hours = max(0.0, (now - article.published_date).total_seconds() / 3600)
+    strength = getattr(article, 'relevance', 0) or 1
+    return strength / (1 + age_hours / 12)
+
+
+def rank_articles(articles: List) -> List:
+    """Сортує статті за пріоритетом (найважливіші першими)"""
+    now = datetime.now(pytz.UTC)
+    return sorted(articles, key=lambda a: article_priority(a, now), reverse=True)
@@ -0,0 +1,169 @@
+"""Неблокуюче логування: черга, ротація за розміром і часом, JSON формат"""
+
+import atexit
+import contextlib
+import contextvars
+import copy
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# Ідентифікатор статті, що зараз обробляється в цьому потоці
+_article_id = contextvars.ContextVar('article_id', default=None)
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(article_id)s] %(message)s'
+
+_listener = None
+
+
+def _stop_listener():
+    """Дописує чергу і зупиняє потік логування"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def correlation_id(url: str) -> str:
+    """Короткий стабільний ідентифікатор статті за її URL"""
+    return hashlib.sha1(url.encode()).hexdigest()[:8]
+
+
+@contextlib.contextmanager
+def article_context(article_id: Optional[str]):
+    """Усі записи логу всередині блоку отримують article_id"""
+    token = _article_id.set(article_id)
+    try:
+        yield
+    finally:
+        _article_id.reset(token)
+
+
+class CorrelationFilter(logging.Filter):
+    """Додає article_id до запису (виконується в потоці, що логує)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.article_id = _article_id.get() or '-'
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Один JSON об'єкт на рядок"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        article_id = getattr(record, 'article_id', '-')
+        if article_id != '-':
+            data['article_id'] = article_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class TracebackQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler, що не вклеює traceback у повідомлення: стандартний
+    prepare() форматує його в msg і очищає exc_info, тож JSON формат
+    втрачав поле exc. Тут traceback лишається окремо в exc_text.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.message = record.msg
+        record.args = None
+        if record.exc_info:
+            # Сам traceback з фреймами в чергу не передаємо - лише текст
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Ротація, коли файл перевищив max_bytes або став старшим за interval секунд"""
+
+    def __init__(self, filename: str, max_bytes: int, interval: float,
+                 backup_count: int, encoding: str = 'utf-8'):
+        super().__init__(filename, maxBytes=max_bytes,
+                         backupCount=backup_count, encoding=encoding)
+        self.interval = interval
+        try:
+            self.opened_at = os.path.getmtime(filename) if os.path.getsize(filename) else time.time()
+        except OSError:
+            self.opened_at = time.time()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() - self.opened_at >= self.interval:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+
+def setup_logging(log_file: str = 'logs/app.log', level: int = logging.INFO,
+                  json_format: Optional[bool] = None,
+                  max_bytes: int = 10 * 1024 * 1024, interval: float = 86400,
+                  backup_count: int = 7) -> logging.handlers.QueueListener:
+    """
+    Налаштовує логування через чергу: потоки пайплайну лише кладуть
+    записи в чергу, а запис у файл і консоль робить окремий потік
+
+    Args:
+        log_file: Шлях до файлу логу
+        level: Рівень логування
+        json_format: JSON рядки замість тексту (за замовчуванням LOG_FORMAT=json)
+        max_bytes: Розмір файлу, після якого відбувається ротація
+        interval: Вік файлу (секунди), після якого відбувається ротація
+        backup_count: Скільки старих файлів зберігати
+
+    Returns:
+        QueueListener (зупиняється автоматично при виході)
+    """
+    global _listener
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', '').lower() == 'json'
+
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+
+    file_handler = SizeAndTimeRotatingFileHandler(log_file, max_bytes, interval, backup_count)
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    _stop_listener()
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = TracebackQueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
@@ -4,15 +4,35 @@
 """
 
 import os
+import itertools
 import logging
+import time
 from datetime import datetime
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
 
 # Імпорти наших модулів
-from parser import NewsParser, Article
-from translate import Translator
-from summary import Summarizer
-from telegram_client import TelegramClient
+# Важкі модулі (openai, Telegram клієнт) імпортуються лише тоді,
+# коли є що обробляти - холостий запуск їх не завантажує
+from parser import NewsParser, Article, KEYWORDS
+from subscriptions import SubscriptionRegistry
+from llm_budget import BudgetExceeded, TokenBudget, estimate_article_tokens, rank_articles
+from fetch_policy import FetchPolicy
+from archive import ArticleArchive
+from analytics import (ArticleHistory, DEFERRED, DROPPED_CLASSIFY, DROPPED_PROCESS,
+                       DROPPED_PUBLISH, FAILED, PENDING, PUBLISHED)
+from cpu_pool import CpuPool
+from state_backend import SeenStore, shared_backend
+from deadline import (RunDeadline, DeferredQueue, BACKFILL_PUBLISH_PER_RUN, BACKFILL_QUEUE,
+                      FULL, DESCRIPTION, ORIGINAL, DEFER)
+from pipeline import Pipeline, Stage
+from profiling import StageProfiler
+import log_setup
+
+if TYPE_CHECKING:
+    from translate import Translator
+    from translation_memory import TranslationMemory
+    from summary import Summarizer
+    from telegram_client import TelegramClient
 
 # Конфігурація функцій (легко ввімкнути/вимкнути)
 # Для ввімкнення OpenAI функцій:
@@ -23,21 +43,16 @@ USE_GPT_CLASSIFICATION = False  # Встановіть True коли є OpenAI 
 USE_TRANSLATION = True          # ✅ Ввімкнено після поповнення OpenAI
 USE_SUMMARIZATION = True        # ✅ Ввімкнено після поповнення OpenAI
 
+# Конфігурація конвеєра
+FETCH_WORKERS = 4      # Паралельні завантаження повного тексту
+PROCESS_WORKERS = 3    # Паралельні виклики OpenAI
+QUEUE_SIZE = 10        # Максимальна глибина черги між етапами
+PUBLISH_DELAY = 3      # Затримка між публікаціями (секунди)
+
 
 def setup_logging():
-    """Налаштування логування у консоль + файл"""
-    # Створюємо директорію для логів
-    os.makedirs("logs", exist_ok=True)
-    
-    # Налаштування логування
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/app.log', encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    """Налаштування логування у консоль + файл (через чергу, з ротацією)"""
+    log_setup.setup_logging('logs/app.log')
 
 
 def load_environment_variables() -> dict:
@@ -55,8 +70,115 @@ def load_environment_variables() -> dict:
     return config
 
 
-def process_article(article: Article, translator: Translator, 
-                   summarizer: Summarizer) -> dict:
+def create_clients(config: dict, subscriptions: SubscriptionRegistry,
+                   budget: Optional[TokenBudget] = None) -> tuple:
+    """
+    Створює OpenAI та Telegram клієнтів (з відкладеним імпортом модулів)
+    
+    Args:
+        config: Змінні середовища з load_environment_variables
+        subscriptions: Реєстр підписок (по одному Telegram клієнту на підписку)
+        budget: Спільний бюджет токенів для перекладача та резюматора
+        
+    Returns:
+        Кортеж (translator, summarizer, {назва підписки: telegram_client})
+    """
+    from translate import Translator
+    from translation_memory import TranslationMemory
+    from summary import Summarizer
+    from telegram_client import TelegramClient
+
+    translator = Translator(config['openai_api_key'], budget, TranslationMemory())
+    summarizer = Summarizer(config['openai_api_key'], budget)
+    state = shared_backend()
+    telegram_clients = {
+        sub.name: TelegramClient(
+            config['telegram_token'], sub.channel,
+            seen=SeenStore(state, sub.seen_namespace, legacy_path=sub.seen_file)
+        )
+        for sub in subscriptions.subscriptions
+    }
+    return translator, summarizer, telegram_clients
+
+
+def classify_article(article: Article, translator: 'Translator',
+                     enabled: bool = USE_GPT_CLASSIFICATION) -> bool:
+    """GPT класифікація (якщо ввімкнено); True - стаття про Україну"""
+    logger = logging.getLogger(__name__)
+
+    if not enabled:
+        logger.info(f"Пропускаємо GPT класифікацію (вимкнено) для: {article.title}")
+        return True
+
+    text_for_classification = f"{article.title}\n{article.description}"
+    if article.full_text:
+        text_for_classification += f"\n{article.full_text[:500]}"
+
+    classification = translator.classify_ukraine_related(text_for_classification)
+
+    if classification != "Ukraine-related":
+        logger.info(f"Стаття не про Україну за GPT класифікацією: {article.title}")
+        return False
+
+    logger.info(f"✅ GPT підтвердив: стаття про Україну - {article.title}")
+    return True
+
+
+def translate_article(article: Article, translator: 'Translator',
+                      headline: Optional[tuple] = None) -> Optional[tuple]:
+    """
+    Перекладає заголовок, опис і повний текст; None, якщо заголовок не перекладено
+
+    Args:
+        headline: Вже перекладені (заголовок, опис) - перекладається лише повний текст
+    """
+    logger = logging.getLogger(__name__)
+    logger.info(f"Перекладаємо з мови: {article.language}")
+
+    if headline:
+        title_ua, description_ua = headline
+    else:
+        title_ua = translator.translate_to_ukrainian(article.title, article.language)
+        description_ua = translator.translate_to_ukrainian(article.description, article.language)
+
+    full_text_ua = None
+    if article.full_text:
+        full_text_ua = translator.translate_to_ukrainian(article.full_text, article.language)
+        if not full_text_ua:
+            logger.warning(f"Не вдалося перекласти повний текст, публікуємо опис: {article.title}")
+
+    if not title_ua:
+        logger.error(f"Не вдалося перекласти заголовок: {article.title}")
+        return None
+    return title_ua, description_ua, full_text_ua
+
+
+def summarize_article(summarizer: 'Summarizer', title: str, description: str,
+                      full_text: Optional[str], source_text: Optional[str] = None) -> str:
+    """
+    Створює синопсис; у разі невдачі повертає опис
+
+    Args:
+        source_text: Повний текст оригіналу - довгі статті резюмуються з нього
+    """
+    logger = logging.getLogger(__name__)
+
+    text_for_summary = full_text or description or ""
+    summary = summarizer.create_summary_from_parts(title, description, text_for_summary,
+                                                   source_text=source_text)
+
+    if not summary:
+        logger.warning(f"Не вдалося створити синопсис для: {title}")
+        return description or "Короткий опис недоступний"
+
+    logger.info("✅ Синопсис створено")
+    return summary
+
+
+def process_article(article: Article, translator: 'Translator',
+                   summarizer: 'Summarizer', translate: Optional[bool] = None,
+                   summarize: Optional[bool] = None,
+                   cache: Optional[dict] = None) -> dict:
     """
     Обробляє одну статтю: класифікація → переклад → резюме
     
@@ -64,61 +186,78 @@ def process_article(article: Article, translator: Translator,
         article: Стаття для обробки
         translator: Перекладач
         summarizer: Резюматор
+        translate: Перекладати (None - USE_TRANSLATION)
+        summarize: Створювати синопсис (None - USE_SUMMARIZATION)
+        cache: Проміжні результати статті, спільні для кількох підписок
         
     Returns:
         Словник з обробленими даними
     """
     logger = logging.getLogger(__name__)
-    
-    logger.info(f"Обробляємо статтю: {article.title}")
-    
-    if USE_GPT_CLASSIFICATION:
-        text_for_classification = f"{article.title}\n{article.description}"
-        if article.full_text:
-            text_for_classification += f"\n{article.full_text[:500]}"
+    translate = USE_TRANSLATION if translate is None else translate
+    summarize = USE_SUMMARIZATION if summarize is None else summarize
+    cache = {} if cache is None else cache
+    # Без перекладача (бекфіл без LLM) бюджет не ведеться
+    budget = translator.budget if translator is not None else None
 
-        classification = translator.classify_ukraine_related(text_for_classification)
+    # Бюджет токенів: якщо обробка статті не вміщується - публікуємо оригінал
+    if budget is not None and 'llm' not in cache:
+        estimate = estimate_article_tokens(article.title, article.description,
+                                           article.full_text, translate, summarize)
+        cache['llm'] = budget.can_afford(estimate)
+        if not cache['llm']:
+            logger.warning(f"💸 Бюджет токенів вичерпано (~{estimate} потрібно), "
+                           f"публікуємо оригінал: {article.title}")
+            budget.note_fallback()
+    if cache.get('llm') is False:
+        translate = summarize = False
 
-        if classification != "Ukraine-related":
-            logger.info(f"Стаття не про Україну за GPT класифікацією: {article.title}")
+    try:
+        if 'classified' not in cache:
+            logger.info(f"Обробляємо статтю: {article.title}")
+            cache['classified'] = classify_article(
+                article, translator,
+                enabled=USE_GPT_CLASSIFICATION and cache.get('llm') is not False
+            )
+        if not cache['classified']:
             return None
+        return _prepare_output(article, translator, summarizer, translate, summarize, cache)
+    except BudgetExceeded as e:
+        if cache.get('llm') is False:
+            raise
+        logger.warning(f"💸 {e} - публікуємо оригінал: {article.title}")
+        cache['llm'] = False
+        budget.note_fallback()
+        return process_article(article, translator, summarizer, translate, summarize, cache)
 
-        logger.info(f"✅ GPT підтвердив: стаття про Україну - {article.title}")
-    else:
-        logger.info(f"Пропускаємо GPT класифікацію (вимкнено) для: {article.title}")
+
+def _prepare_output(article: Article, translator: 'Translator', summarizer: 'Summarizer',
+                    translate: bool, summarize: bool, cache: dict) -> Optional[dict]:
+    """Переклад і синопсис з повторним використанням результатів з кешу"""
+    logger = logging.getLogger(__name__)
     
     # Крок 2: Переклад українською (якщо ввімкнено)
-    if USE_TRANSLATION:
-        logger.info(f"Перекладаємо з мови: {article.language}")
-
-        title_ua = translator.translate_to_ukrainian(article.title, article.language)
-        description_ua = translator.translate_to_ukrainian(article.description, article.language)
-
-        full_text_ua = None
-        if article.full_text:
-            full_text_ua = translator.translate_to_ukrainian(article.full_text, article.language)
-
-        if not title_ua:
-            logger.error(f"Не вдалося перекласти заголовок: {article.title}")
-            return None
-    else:
-        logger.info(f"Використовуємо оригінальний текст ({article.language})")
-        title_ua = article.title
-        description_ua = article.description
-        full_text_ua = article.full_text
+    texts_key = ('texts', translate)
+    if texts_key not in cache:
+        if translate:
+            cache[texts_key] = translate_article(article, translator, cache.get('headline'))
+        else:
+            logger.info(f"Використовуємо оригінальний текст ({article.language})")
+            cache[texts_key] = (article.title, article.description, article.full_text)
+    if cache[texts_key] is None:
+        return None
+    title_ua, description_ua, full_text_ua = cache[texts_key]
 
     # Крок 3: Створення синопсису (якщо ввімкнено)
-    if USE_SUMMARIZATION:
-        text_for_summary = full_text_ua or description_ua or ""
-        summary_ua = summarizer.create_summary_from_parts(
-            title_ua, description_ua, text_for_summary
-        )
-
-        if not summary_ua:
-            logger.warning(f"Не вдалося створити синопсис для: {title_ua}")
-            summary_ua = description_ua or "Короткий опис недоступний"
-        else:
-            logger.info("✅ Синопсис створено")
+    if summarize:
+        summary_key = ('summary', translate)
+        if summary_key not in cache:
+            # Довгий текст резюмується з оригіналу: переклад обмежений max_tokens
+            cache[summary_key] = summarize_article(
+                summarizer, title_ua, description_ua, full_text_ua,
+                source_text=article.full_text
+            )
+        summary_ua = cache[summary_key]
     else:
         logger.info("Використовуємо оригінальний опис (резюмування вимкнено)")
         summary_ua = description_ua or "Короткий опис недоступний"
@@ -129,10 +268,362 @@ def process_article(article: Article, translator: Translator,
         'full_text': full_text_ua or description_ua,
         'url': article.url,
         'source': article.source,
-        'original_language': article.language
+        'original_language': article.language,
+        'original_title': article.title,
+        'original_description': article.description,
+        'published': article.published_date.isoformat() if article.published_date else None
     }
 
 
+def process_for_subscriptions(article: Article, translator: 'Translator',
+                              summarizer: 'Summarizer',
+                              classified: bool = False,
+                              llm: bool = True,
+                              cache: Optional[dict] = None) -> Optional[List[tuple]]:
+    """
+    Обробляє статтю для всіх підписок, що її відібрали. Класифікація,
+    переклад і синопсис виконуються один раз для кожного варіанту виводу.
+    
+    Args:
+        classified: Стаття вже пройшла класифікацію на окремому етапі
+        llm: False - без викликів OpenAI (оригінальний текст)
+        cache: Готові проміжні результати ('headline' - пакетний переклад
+            заголовка й опису в бекфілі)
+    
+    Returns:
+        Список (підписка, дані для публікації) або None
+    """
+    cache = {} if cache is None else cache
+    if classified:
+        cache['classified'] = True
+    if not llm:
+        cache['llm'] = False
+    deliveries = []
+    for sub in article.subscriptions:
+        data = process_article(article, translator, summarizer,
+                               translate=sub.translate, summarize=sub.summarize,
+                               cache=cache)
+        if data:
+            deliveries.append((sub, data))
+    return deliveries or None
+
+
+def publish_deliveries(deliveries: List[tuple], send_message, archive: Optional[ArticleArchive] = None,
+                       deadline: Optional[RunDeadline] = None,
+                       deferred: Optional[DeferredQueue] = None) -> int:
+    """
+    Публікує (підписка, дані) по черзі з затримкою між повідомленнями
+    
+    Returns:
+        Кількість опублікованих повідомлень
+    """
+    logger = logging.getLogger(__name__)
+    published = 0
+    for sub, article_data in deliveries:
+        if deadline and not deadline.can_publish():
+            # LLM робота вже оплачена - наступний запуск лише опублікує
+            logger.warning(f"⏱️ Публікацію відкладено: {article_data['title']}")
+            deferred.defer_delivery(sub.name, article_data)
+            continue
+
+        started = time.monotonic()
+        message_id = send_message(sub, article_data)
+        
+        if message_id:
+            published += 1
+            logger.info(f"✅ Опубліковано в {sub.name}: {article_data['title']} (ID: {message_id})")
+            if archive is not None:
+                archive.add(article_data)
+        else:
+            logger.warning(f"⚠️ Не опубліковано в {sub.name}: {article_data['title']}")
+        
+        # Затримка між публікаціями
+        time.sleep(PUBLISH_DELAY)
+        if deadline:
+            deadline.observe('publish', time.monotonic() - started)
+    return published
+
+
+def publish_ready(items: List[dict], subscriptions: SubscriptionRegistry, send_message,
+                  archive: Optional[ArticleArchive] = None,
+                  deadline: Optional[RunDeadline] = None,
+                  deferred: Optional[DeferredQueue] = None,
+                  history: Optional[ArticleHistory] = None) -> int:
+    """
+    Публікує вже оброблені статті з черги ({'subscription', 'data'})
+
+    Returns:
+        Кількість опублікованих повідомлень
+    """
+    by_name = {sub.name: sub for sub in subscriptions.subscriptions}
+    published = 0
+    for item in items:
+        sub = by_name.get(item['subscription'])
+        if sub is None:
+            continue
+        sent = publish_deliveries([(sub, item['data'])], send_message, archive, deadline, deferred)
+        published += sent
+        if history is not None:
+            if sent:
+                outcome = PUBLISHED
+            elif deadline and not deadline.can_publish():
+                outcome = DEFERRED
+            else:
+                outcome = DROPPED_PUBLISH
+            history.record_delivery(item['data'], outcome, time.time() if sent else None)
+    return published
+
+
+def build_pipeline(parser: NewsParser, translator: 'Translator',
+                   summarizer: 'Summarizer', telegram_clients: dict,
+                   profiler: Optional[StageProfiler] = None,
+                   policy: Optional[FetchPolicy] = None,
+                   classify_first: bool = USE_GPT_CLASSIFICATION,
+                   archive: Optional[ArticleArchive] = None,
+                   deadline: Optional[RunDeadline] = None,
+                   deferred: Optional[DeferredQueue] = None,
+                   history: Optional[ArticleHistory] = None) -> Pipeline:
+    """
+    Будує конвеєр: [класифікація →] повний текст → обробка → публікація
+    
+    Args:
+        parser: Парсер новин
+        translator: Перекладач
+        summarizer: Резюматор
+        telegram_clients: Telegram клієнти за назвами підписок
+        profiler: Профайлер етапів (None - профілювання вимкнено)
+        policy: Політика завантаження повного тексту (None - завантажувати завжди)
+        classify_first: Класифікувати до завантаження тексту, щоб не качати
+                        відхилені статті
+        archive: Архів опублікованих статей для пошуку ботом
+        deadline: Дедлайн запуску (None - без обмеження часу)
+        deferred: Черга статей, відкладених на наступний запуск
+        history: Історія статей для аналітики (None - не записувати)
+        
+    Returns:
+        Налаштований пайплайн
+    """
+    logger = logging.getLogger(__name__)
+
+    fetch_full_text = parser.fetch_full_text
+    process = process_for_subscriptions
+
+    def send_message(sub, article_data: dict) -> Optional[int]:
+        return telegram_clients[sub.name].send_message(
+            title=article_data['title'],
+            summary=article_data['summary'],
+            full_text=article_data['full_text'],
+            url=article_data['url'],
+            source=article_data['source']
+        )
+
+    if profiler:
+        fetch_full_text = profiler.wrap('get_articles_with_full_text', fetch_full_text)
+        send_message = profiler.wrap('send_message', send_message)
+        process = profiler.wrap('process_article', process)
+
+    def classify_stage(article: Article) -> Optional[Article]:
+        try:
+            accepted = classify_article(article, translator)
+        except BudgetExceeded as e:
+            # Без бюджету класифікація вимкнена - як і в process_article
+            logger.warning(f"💸 {e} - пропускаємо класифікацію: {article.title}")
+            accepted = True
+        if not accepted and history is not None:
+            history.record(article, DROPPED_CLASSIFY)
+        return article if accepted else None
+
+    def fetch_stage(article: Article) -> Article:
+        if deadline and not deadline.allow_fetch():
+            logger.info(f"⏱️ Бракує часу на повний текст: {article.title}")
+            return article
+        started = time.monotonic()
+        if policy:
+            policy.fetch(article, fetch_full_text)
+        else:
+            fetch_full_text(article)
+        if deadline and article.full_text:
+            deadline.observe('fetch', time.monotonic() - started)
+        return article
+
+    def process_stage(article: Article) -> list:
+        mode = deadline.plan() if deadline else FULL
+        if mode == DEFER:
+            logger.info(f"⏱️ Не встигаємо - відкладено на наступний запуск: {article.title}")
+            deferred.defer_article(article)
+            if history is not None:
+                history.record(article, DEFERRED)
+            return None
+        if mode == DESCRIPTION:
+            logger.info(f"⏱️ Бракує часу - синопсис з опису: {article.title}")
+            article.full_text = None
+        elif mode == ORIGINAL:
+            logger.info(f"⏱️ Бракує часу - публікуємо оригінал: {article.title}")
+
+        started = time.monotonic()
+        try:
+            deliveries = process(article, translator, summarizer, classify_first,
+                                 mode != ORIGINAL)
+        except Exception:
+            if deadline:
+                deadline.done_publishing()
+            if history is not None:
+                history.record(article, FAILED)
+            raise
+        if deadline:
+            deadline.observe(mode, time.monotonic() - started)
+            if not deliveries:
+                deadline.done_publishing()
+        if policy:
+            policy.record_outcome(article, bool(deliveries))
+        if history is not None:
+            history.record(article, PENDING if deliveries else DROPPED_PROCESS)
+        return deliveries
+
+    def publish_stage(deliveries: list) -> int:
+        published = publish_deliveries(deliveries, send_message, archive, deadline, deferred)
+        if deadline:
+            deadline.done_publishing()
+        if history is not None:
+            if published:
+                outcome = PUBLISHED
+            elif deadline and not deadline.can_publish():
+                outcome = DEFERRED
+            else:
+                outcome = DROPPED_PUBLISH
+            history.resolve(deliveries[0][1]['url'], outcome, time.time() if published else None)
+        return published or None
+
+    def describe(item) -> str:
+        if isinstance(item, list):
+            return item[0][1]['title']
+        return item.title
+
+    def traced(func):
+        # Кожен запис логу етапу позначається ідентифікатором статті
+        def run(item):
+            url = item[0][1]['url'] if isinstance(item, list) else item.url
+            with log_setup.article_context(log_setup.correlation_id(url)):
+                return func(item)
+        return run
+
+    stages = [
+        Stage('fetch', traced(fetch_stage), workers=FETCH_WORKERS, queue_size=QUEUE_SIZE),
+        Stage('process', traced(process_stage), workers=PROCESS_WORKERS, queue_size=QUEUE_SIZE),
+        Stage('publish', traced(publish_stage), workers=1, queue_size=QUEUE_SIZE)
+    ]
+    if classify_first:
+        stages.insert(0, Stage('classify', traced(classify_stage),
+                               workers=PROCESS_WORKERS, queue_size=QUEUE_SIZE))
+    return Pipeline(stages, describe=describe)
+
+
+def log_pipeline_stats(stats: dict, found_count: int, parser: NewsParser):
+    """Виводить статистику конвеєра"""
+    logger = logging.getLogger(__name__)
+    stages = stats['stages']
+
+    logger.info(f"📊 Статистика:")
+    logger.info(f"   - Знайдено статей про Україну: {found_count}")
+    logger.info(f"   - Переглянуто нових записів стрічок: {parser.recent_entries}, "
+                f"пропущено за позначками: {parser.watermark_skipped}")
+    logger.info(f"   - Успішно оброблено: {stages['process']['processed']}")
+    logger.info(f"   - Опубліковано в Telegram: {stages['publish']['processed']}")
+    logger.info(f"   - Підписок: {len(parser.subscriptions.subscriptions)}, "
+                f"унікальних шаблонів: {len(parser.subscriptions.patterns)}")
+    logger.info(f"   - Загальний час: {stats['wall_time']:.1f} с")
+    if stats['time_to_first_output'] is not None:
+        logger.info(f"   - Час до першої публікації: {stats['time_to_first_output']:.1f} с")
+
+    health = parser.host_health.summary()
+    logger.info(f"   - Пропущено запитів до нестабільних хостів: {health['skipped']}")
+    if health['unhealthy']:
+        logger.info(f"   - Нестабільні хости: {health['unhealthy']}")
+
+    extraction = parser.extraction.summary()
+    logger.info(
+        f"   - Витягування тексту: спроб селекторів на статтю "
+        f"{extraction['attempts_per_article']:.1f}, в середньому "
+        f"{extraction['avg_chars']:.0f} символів, вивчено нових селекторів {extraction['learned']}"
+    )
+
+    boilerplate = parser.boilerplate.summary()
+    if boilerplate['articles']:
+        logger.info(
+            f"   - Шаблонний текст: відкинуто абзаців {boilerplate['paragraphs']} "
+            f"(за правилами {boilerplate['by_rule']}, повторюваних {boilerplate['by_fingerprint']}), "
+            f"~{boilerplate['tokens']} токенів, {boilerplate['tokens_per_article']:.0f} на статтю"
+        )
+
+    cpu = parser.cpu_pool.stats()
+    if cpu['tasks']:
+        logger.info(f"   - Розбір сторінок: процесів {cpu['workers']}, сторінок {cpu['tasks']}, "
+                    f"в середньому {cpu['avg_ms']:.0f} мс")
+
+    http = parser.transport.stats()
+    logger.info(
+        f"   - HTTP: запитів {http['requests']}, нових з'єднань {http['connections']}, "
+        f"повторно використано {http['reused']}, отримано {http['wire_bytes'] / 1024:.0f} КБ "
+        f"({http['body_bytes'] / 1024:.0f} КБ після розпакування)"
+    )
+
+    for name, stage in stages.items():
+        logger.info(
+            f"   - Етап {name}: воркерів {stage['workers']}, "
+            f"успішно {stage['processed']}, відкинуто {stage['dropped']}, "
+            f"помилок {stage['failed']}, макс. черга {stage['max_queue_depth']}, "
+            f"завантаження {stage['utilization']:.0%}"
+        )
+
+
+def log_fetch_stats(policy: FetchPolicy):
+    """Виводить статистику завантаження повного тексту"""
+    logger = logging.getLogger(__name__)
+    fetch = policy.summary()
+    skipped = ', '.join(f"{reason} {count}" for reason, count in fetch['skipped'].items()) or '0'
+    logger.info(
+        f"   - Повний текст: завантажено {fetch['fetched']} (порожніх {fetch['empty']}), "
+        f"корисних {fetch['useful']}, марних {fetch['wasted']}, пропущено: {skipped}"
+    )
+
+
+def log_deadline_stats(deadline: RunDeadline, deferred: DeferredQueue):
+    """Виводить, скільки роботи скинуто, щоб вкластися у вікно запуску"""
+    logger = logging.getLogger(__name__)
+    report = deadline.summary()
+    shed = report['shed']
+    logger.info(
+        f"   - Дедлайн: вікно {report['window']:.0f} с, залишилось {report['remaining']:.0f} с; "
+        f"без повного тексту {shed['fetch']}, синопсис з опису {shed[DESCRIPTION]}, "
+        f"оригінал без LLM {shed[ORIGINAL]}, відкладено {shed[DEFER]} "
+        f"(у черзі на наступний запуск {len(deferred)})"
+    )
+
+
+def log_budget_stats(budget: TokenBudget):
+    """Виводить використання токенів OpenAI"""
+    logger = logging.getLogger(__name__)
+    usage = budget.summary()
+    logger.info(
+        f"   - OpenAI: викликів {usage['calls']}, токенів {usage['prompt_tokens']} + "
+        f"{usage['completion_tokens']}, за добу {usage['day_total']}"
+    )
+    if usage['denied'] or usage['fallbacks']:
+        logger.info(f"   - Бюджет: відхилено викликів {usage['denied']}, "
+                    f"статей з оригінальним текстом {usage['fallbacks']}")
+
+
+def log_translation_memory_stats(memory: 'TranslationMemory'):
+    """Виводить, скільки речень взято з пам'яті перекладів"""
+    logger = logging.getLogger(__name__)
+    report = memory.summary()
+    logger.info(
+        f"   - Пам'ять перекладів: речень {report['segments']}, з пам'яті {report['exact']} "
+        f"+ {report['fuzzy']} нечітких ({report['hit_rate']:.0%}), "
+        f"заощаджено ~{report['tokens_saved']} токенів, у пам'яті {report['entries']}"
+    )
+
+
 def main():
     """Основна функція пайплайну"""
     # Налаштування логування
@@ -147,95 +638,125 @@ def main():
     logger.info(f"   - Переклад: {'✅ Ввімкнено' if USE_TRANSLATION else '❌ Вимкнено'}")
     logger.info(f"   - Резюмування: {'✅ Ввімкнено' if USE_SUMMARIZATION else '❌ Вимкнено'}")
 
+    # Профілювання етапів: PROFILE_STAGES=1 або --profile
+    profiler = StageProfiler.from_env()
+    if profiler:
+        profiler.start()
+
+    # Розбір HTML у пулі процесів (CPU_WORKERS, процеси стартують лише за потреби)
+    cpu_pool = CpuPool.from_env()
+
+    # Вікно запуску (RUN_DEADLINE_SECONDS) рахується від самого старту
+    deadline = RunDeadline.from_env(PUBLISH_DELAY)
+    run_started = time.time()
+
     try:
         # Завантаження конфігурації
         config = load_environment_variables()
         logger.info("✅ Змінні середовища завантажено")
         
-        # Ініціалізація компонентів
-        parser = NewsParser()
-        translator = Translator(config['openai_api_key'])
-        summarizer = Summarizer(config['openai_api_key'])
-        telegram_client = TelegramClient(
-            config['telegram_token'], 
-            config['telegram_channel']
+        # КРОК 1: Парсинг RSS-стрічок (до створення OpenAI/Telegram клієнтів)
+        subscriptions = SubscriptionRegistry.load(
+            KEYWORDS, channel=config['telegram_channel'],
+            translate=USE_TRANSLATION, summarize=USE_SUMMARIZATION
         )
-        
-        logger.info("✅ Компоненти ініціалізовано")
-        
-        # Тест Telegram з'єднання
-        if not telegram_client.test_connection():
-            raise Exception("Не вдалося підключитися до Telegram")
-        
-        # КРОК 1: Парсинг RSS-стрічок
+        parser = NewsParser(subscriptions=subscriptions, cpu_pool=cpu_pool)
         logger.info("📡 Парсинг RSS-стрічок...")
-        ukraine_articles = parser.parse_all_feeds()
+        discovered = parser.iter_all_feeds()
+        if profiler:
+            discovered = profiler.wrap_iter('parse_all_feeds', discovered)
+        first_article = next(discovered, None)
+
+        # Статті, відкладені минулим запуском через брак часу
+        deferred = DeferredQueue()
+        deferred_articles = deferred.take_articles(subscriptions, Article)
+        ready = deferred.take_ready()
+        # Старі статті з бекфілу - потроху за кожен запуск (в історію
+        # запусків не входять: жоден запуск їх не знаходив)
+        backfill_queue = DeferredQueue(BACKFILL_QUEUE)
+        backfilled = backfill_queue.take_ready(
+            int(os.getenv('BACKFILL_PUBLISH_PER_RUN', str(BACKFILL_PUBLISH_PER_RUN))))
         
-        if not ukraine_articles:
+        if first_article is None and not deferred_articles and not ready and not backfilled:
             logger.info("📭 Нових статей про Україну не знайдено")
             return
         
-        logger.info(f"📰 Знайдено {len(ukraine_articles)} статей про Україну")
-        
-        # КРОК 2: Завантаження повного тексту
-        logger.info("📄 Завантаження повного тексту...")
-        articles_with_text = parser.get_articles_with_full_text(ukraine_articles)
+        if first_article is not None:
+            logger.info(f"📰 Знайдено першу статтю про Україну: {first_article.title}")
+        if deferred_articles or ready:
+            logger.info(f"⏱️ З минулого запуску: {len(deferred_articles)} статей, "
+                        f"{len(ready)} готових до публікації")
+        if backfilled:
+            logger.info(f"🗂️ З черги бекфілу: {len(backfilled)} статей")
         
-        # КРОК 3-5: Обробка статей (класифікація → переклад → резюме)
-        logger.info("🔄 Обробка статей...")
-        processed_articles = []
-        
-        for article in articles_with_text:
-            try:
-                processed_data = process_article(article, translator, summarizer)
-                if processed_data:
-                    processed_articles.append(processed_data)
-            except Exception as e:
-                logger.error(f"Помилка обробки статті {article.title}: {e}")
-        
-        if not processed_articles:
-            logger.info("📭 Немає статей для публікації після обробки")
-            return
+        # Решта стрічок парситься паралельно з обробкою вже знайдених статей
+        found = {'count': 0}
+        candidates = itertools.chain(deferred_articles,
+                                     [first_article] if first_article else [], discovered)
+
+        # З лімітом токенів спершу збираємо всіх кандидатів і обробляємо
+        # найважливіші першими - решта отримає оригінальний текст
+        budget = TokenBudget.from_env()
+        if budget.limited:
+            candidates = rank_articles(list(candidates))
+            logger.info(f"💰 Бюджет токенів: залишилось {budget.remaining()}, "
+                        f"статті впорядковано за пріоритетом")
+
+        def ukraine_articles():
+            for article in candidates:
+                found['count'] += 1
+                yield article
         
-        logger.info(f"✅ Оброблено {len(processed_articles)} статей")
+        # Ініціалізація компонентів - тільки коли є робота
+        translator, summarizer, telegram_clients = create_clients(config, subscriptions, budget)
+        logger.info("✅ Компоненти ініціалізовано")
         
-        # КРОК 6: Публікація в Telegram
-        logger.info("📱 Публікація в Telegram...")
-        published_count = 0
+        # Тест Telegram з'єднання (бот спільний для всіх каналів)
+        if not next(iter(telegram_clients.values())).test_connection():
+            raise Exception("Не вдалося підключитися до Telegram")
         
-        for article_data in processed_articles:
-            try:
-                message_id = telegram_client.send_message(
-                    title=article_data['title'],
-                    summary=article_data['summary'],
-                    full_text=article_data['full_text'],
-                    url=article_data['url'],
-                    source=article_data['source']
-                )
-                
-                if message_id:
-                    published_count += 1
-                    logger.info(f"✅ Опубліковано: {article_data['title']} (ID: {message_id})")
-                else:
-                    logger.warning(f"⚠️ Не опубліковано: {article_data['title']}")
-                
-                # Затримка між публікаціями
-                import time
-                time.sleep(3)
-                
-            except Exception as e:
-                logger.error(f"Помилка публікації {article_data['title']}: {e}")
+        # КРОК 2-6: Конвеєр (повний текст → обробка → публікація)
+        # Кожна стаття публікується одразу, як тільки готова
+        logger.info("🔄 Запуск конвеєра обробки...")
+        policy = FetchPolicy(parser.host_health, budget)
+        archive = ArticleArchive()
+        history = ArticleHistory(run_started=run_started)
+
+        def send_ready(sub, data):
+            return telegram_clients[sub.name].send_message(
+                data['title'], data['summary'], data['full_text'], data['url'], data['source'])
+
+        publish_ready(ready, subscriptions, send_ready, archive, deadline, deferred, history)
+        publish_ready(backfilled, subscriptions, send_ready, archive, deadline, deferred)
+
+        pipeline = build_pipeline(parser, translator, summarizer, telegram_clients,
+                                  profiler, policy, archive=archive,
+                                  deadline=deadline, deferred=deferred, history=history)
+        stats = pipeline.run(ukraine_articles())
+        parser.save_state()
+        budget.save()
+        translator.memory.save()
+        archive.save()
+        deferred.save()
+        backfill_queue.save()
+        history.save()
         
         # Підсумок
         logger.info("🎉 Пайплайн завершено")
-        logger.info(f"📊 Статистика:")
-        logger.info(f"   - Знайдено статей про Україну: {len(ukraine_articles)}")
-        logger.info(f"   - Успішно оброблено: {len(processed_articles)}")
-        logger.info(f"   - Опубліковано в Telegram: {published_count}")
+        log_pipeline_stats(stats, found['count'], parser)
+        log_fetch_stats(policy)
+        if deadline:
+            log_deadline_stats(deadline, deferred)
+        log_budget_stats(budget)
+        log_translation_memory_stats(translator.memory)
         
     except Exception as e:
         logger.error(f"❌ Критична помилка: {e}")
         raise
+    finally:
+        cpu_pool.shutdown()
+        if profiler:
+            profiler.stop()
 
 
 if __name__ == "__main__":
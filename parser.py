@@ -2,19 +2,30 @@
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from dateutil import parser as date_parser
 import pytz
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 import logging
-from langdetect import detect, DetectorFactory
+import calendar
+import html
 import re
-import hashlib
 import json
 import pathlib
+import time
+
+from urllib.parse import urlparse
+
+from host_health import HostHealthRegistry, is_host_failure
+from http_client import HttpTransport, shared_transport
+from extraction import ExtractionProfiles, domain_of
+from boilerplate import BoilerplateFilter
+from subscriptions import SubscriptionRegistry
+from stream_feed import StreamedFeed, iter_entries
+from cpu_pool import CpuPool
+from langid import identify
+from state_backend import SeenStore, StateBackend, shared_backend
 
-DetectorFactory.seed = 0
 logger = logging.getLogger(__name__)
 
 LIST_RSS = {
@@ -27,6 +38,17 @@ LIST_RSS = {
     'watson': 'https://www.watson.ch/rss'
 }
 
+# Таймаути для здорового хоста (секунди)
+FETCH_TIMEOUT = 15
+FEED_TIMEOUT = 15
+
+# Стрічки, більші за цей розмір (байти), розбираються потоково (0 - завжди)
+STREAM_FEED_BYTES = 256 * 1024
+
+# Потокову стрічку не видно наперед: розбір зупиняється лише після
+# стількох записів поспіль, старіших за позначку
+WATERMARK_STOP_RUN = 5
+
 # Ключові слова з регулярними виразами
 KEYWORDS = {
     'uk': [
@@ -50,33 +72,70 @@ KEYWORDS = {
     ]
 }
 
+# Профілі мов і BeautifulSoup завантажуються лише при першому використанні
+def detect_language(text: str) -> str:
+    """Визначає мову тексту серед мов джерел (langid, відкладене завантаження профілів)"""
+    return identify(text)
+
+
+def make_soup(markup):
+    """Створює BeautifulSoup (відкладений імпорт bs4)"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(markup, 'html.parser')
+
+
+def clean_text(text: str) -> str:
+    """Очищає текст від HTML тегів і зайвих пробілів"""
+    if not text:
+        return ""
+    if '<' not in text:
+        # Без розмітки HTML парсер не потрібен
+        clean = html.unescape(text)
+    else:
+        clean = make_soup(text).get_text()
+    return re.sub(r'\s+', ' ', clean).strip()
+
+
+def entry_timestamp(entry) -> Optional[float]:
+    """Час запису (UTC, секунди) з уже розібраних feedparser полів"""
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    return calendar.timegm(parsed) if parsed else None
+
 
 class Article:
     """Модель новинної статті"""
+
+    # Без __dict__ на кожен екземпляр - компактніше при тисячах статей
+    __slots__ = ('title', 'description', 'url', 'source', 'published_date',
+                 'language', 'full_text', 'is_ukraine_related', 'subscriptions',
+                 'relevance')
     
     def __init__(self, title: str, description: str, url: str, 
-                 source: str, published_date: datetime):
+                 source: str, published_date: datetime, language: Optional[str] = None):
         self.title = title
         self.description = description
         self.url = url
         self.source = source
         self.published_date = published_date
-        self.language = None
+        self.language = language
         self.full_text = None
         self.is_ukraine_related = False
+        self.subscriptions = []
+        self.relevance = 0
         
-        # Автоматично визначаємо мову
-        self._detect_language()
+        # Автоматично визначаємо мову (якщо її не визначено пакетом заздалегідь)
+        if language is None:
+            self._detect_language()
     
     def _detect_language(self):
-        """Визначає мову статті через langdetect"""
+        """Визначає мову статті за заголовком і описом"""
         try:
             text_for_detection = f"{self.title} {self.description}"
             if len(text_for_detection.strip()) > 10:
-                self.language = detect(text_for_detection)
-                logger.debug(f"Визначено мову: {self.language} для {self.title[:50]}...")
+                self.language = detect_language(text_for_detection)
+                logger.debug("Визначено мову: %s для %.50s...", self.language, self.title)
         except Exception as e:
-            logger.warning(f"Помилка визначення мови: {e}")
+            logger.warning("Помилка визначення мови: %s", e)
             self.language = "unknown"
     
     def __str__(self):
@@ -86,52 +145,52 @@ class Article:
 class NewsParser:
     """RSS/HTML парсер новин"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.seen_db = pathlib.Path('data/seen.json')
-        self.seen_urls = self._load_seen_urls()
-
-    def _load_seen_urls(self) -> set:
-        """Завантажує список вже оброблених URL"""
-        if self.seen_db.exists():
+    def __init__(self, transport: Optional[HttpTransport] = None,
+                 subscriptions: Optional[SubscriptionRegistry] = None,
+                 stream_threshold: int = STREAM_FEED_BYTES,
+                 cpu_pool: Optional[CpuPool] = None,
+                 state: Optional[StateBackend] = None):
+        self.transport = transport or shared_transport()
+        # Розбір HTML сторінок (без пулу - у потоці, що завантажує)
+        self.cpu_pool = cpu_pool or CpuPool(0)
+        self.stream_threshold = stream_threshold
+        self.streamed_feeds = 0
+        self.subscriptions = subscriptions or SubscriptionRegistry.default(KEYWORDS)
+        # Оброблені URL (STATE_BACKEND; старий data/seen.json імпортується один раз)
+        self.seen = SeenStore(state or shared_backend(), 'parser', legacy_path='data/seen.json')
+        self.host_health = HostHealthRegistry()
+        self.extraction = ExtractionProfiles()
+        self.boilerplate = BoilerplateFilter()
+        self.recent_entries = 0
+        self.watermarks_db = pathlib.Path('data/feed_watermarks.json')
+        self.watermarks = self._load_watermarks()
+        self.watermark_skipped = 0
+
+    def _load_watermarks(self) -> dict:
+        """Завантажує позначки найновіших оброблених записів по стрічках"""
+        if self.watermarks_db.exists():
             try:
-                return set(json.loads(self.seen_db.read_text(encoding='utf-8')))
+                return json.loads(self.watermarks_db.read_text(encoding='utf-8'))
             except (json.JSONDecodeError, FileNotFoundError):
-                return set()
-        return set()
+                return {}
+        return {}
 
-    def _save_seen_urls(self):
-        """Зберігає список оброблених URL (максимум 1000 записів)"""
-        self.seen_db.parent.mkdir(exist_ok=True)
-
-        # Обмежуємо до 1000 записів
-        if len(self.seen_urls) > 1000:
-            # Залишаємо тільки останні 1000 записів
-            self.seen_urls = set(list(self.seen_urls)[-1000:])
-
-        self.seen_db.write_text(json.dumps(list(self.seen_urls)), encoding='utf-8')
+    def _save_watermarks(self):
+        """Зберігає позначки стрічок"""
+        self.watermarks_db.parent.mkdir(exist_ok=True)
+        self.watermarks_db.write_text(json.dumps(self.watermarks), encoding='utf-8')
 
     def _is_url_seen(self, url: str) -> bool:
         """Перевіряє чи URL вже оброблений"""
-        uid = hashlib.sha256(url.encode()).hexdigest()
-        return uid in self.seen_urls
+        return url in self.seen
 
     def _mark_url_as_seen(self, url: str):
-        """Позначає URL як оброблений"""
-        uid = hashlib.sha256(url.encode()).hexdigest()
-        self.seen_urls.add(uid)
-        self._save_seen_urls()
+        """Позначає URL як оброблений (дописується у сховище стану)"""
+        self.seen.add(url)
     
     def _clean_text(self, text: str) -> str:
         """Очищає текст від HTML тегів"""
-        if not text:
-            return ""
-        soup = BeautifulSoup(text, 'html.parser')
-        clean_text = soup.get_text()
-        return re.sub(r'\s+', ' ', clean_text).strip()
+        return clean_text(text)
     
     def _parse_date(self, date_string: str) -> Optional[datetime]:
         """Парсить дату з RSS"""
@@ -141,7 +200,7 @@ class NewsParser:
                 parsed_date = pytz.UTC.localize(parsed_date)
             return parsed_date
         except Exception as e:
-            logger.warning(f"Не вдалося розпарсити дату: {date_string}")
+            logger.warning("Не вдалося розпарсити дату: %s", date_string)
             return None
     
     def _is_recent(self, published_date: datetime, hours: int = 24) -> bool:
@@ -151,170 +210,289 @@ class NewsParser:
         now = datetime.now(pytz.UTC)
         return published_date >= (now - timedelta(hours=hours))
     
-    def _contains_ukraine_keywords(self, text: str, language: str = 'de') -> bool:
-        """Перевіряє наявність ключових слів про Україну з регулярними виразами"""
-        # Визначаємо мову для ключових слів
-        lang_map = {'de': 'de', 'fr': 'fr', 'en': 'en', 'uk': 'uk'}
-        lang_key = lang_map.get(language, 'de')  # За замовчуванням німецька
-
-        # Перевіряємо всі мови якщо конкретна не знайдена
-        languages_to_check = [lang_key] if lang_key in KEYWORDS else ['de', 'fr', 'en', 'uk']
-
-        for lang in languages_to_check:
-            if lang in KEYWORDS:
-                for pattern in KEYWORDS[lang]:
-                    if re.search(pattern, text, re.IGNORECASE):
-                        return True
-        return False
-    
+    def _download_feed(self, feed_url: str):
+        """
+        Завантажує стрічку через спільний транспорт
+
+        Великі стрічки розбираються потоково (записи віддаються по одному і
+        розбір зупиняється на старих записах), решта - через feedparser.
+        """
+        if urlparse(feed_url).scheme not in ('http', 'https'):
+            # Локальні файли (архіви, бенчмарки)
+            path = pathlib.Path(feed_url)
+            if not path.is_file():
+                return feedparser.parse(feed_url)
+            return self._parse_feed(path.read_bytes(), {'content-location': feed_url,
+                                                         'content-type': 'application/xml'})
+
+        timeout = self.host_health.timeout_for(feed_url, FEED_TIMEOUT)
+        started = time.monotonic()
+        try:
+            response = self.transport.get(feed_url, timeout=timeout)
+        except requests.RequestException as e:
+            self.host_health.record_failure(feed_url, str(e))
+            raise
+
+        if is_host_failure(response.status_code):
+            self.host_health.record_failure(feed_url, f"HTTP {response.status_code}")
+        response.raise_for_status()
+        self.host_health.record_success(feed_url, time.monotonic() - started)
+
+        headers = {'content-location': response.url}
+        if response.headers.get('Content-Type'):
+            headers['content-type'] = response.headers['Content-Type']
+        return self._parse_feed(response.content, headers)
+
+    def _parse_feed(self, content: bytes, headers: dict):
+        if len(content) < self.stream_threshold:
+            return feedparser.parse(content, response_headers=headers)
+        self.streamed_feeds += 1
+        cutoff = time.time() - 24 * 3600
+        return StreamedFeed(iter_entries(content, cutoff=cutoff))
+
+    def _article_from_entry(self, entry, source_name: str) -> Optional[Article]:
+        """
+        Стаття про Україну із запису стрічки або None
+
+        Спільний шлях для опитування й push (WebSub): свіжість, дедуплікація
+        та ключові слова підписок. Релевантний URL одразу позначається
+        обробленим.
+        """
+        # Парсимо дату
+        published_date = None
+        if hasattr(entry, 'published'):
+            published_date = self._parse_date(entry.published)
+        elif hasattr(entry, 'updated'):
+            published_date = self._parse_date(entry.updated)
+
+        # Фільтруємо за часом (останні 24 години)
+        if not published_date or not self._is_recent(published_date):
+            return None
+
+        # Створюємо статтю
+        title = self._clean_text(getattr(entry, 'title', ''))
+        description = self._clean_text(getattr(entry, 'summary', ''))
+        url = getattr(entry, 'link', '')
+
+        if not title or not url:
+            return None
+
+        # Перевіряємо унікальність
+        if self._is_url_seen(url):
+            return None
+
+        self.recent_entries += 1
+
+        # Без жодного ключового слова жодної підписки стаття не
+        # релевантна - не витрачаємо час на визначення мови
+        text_to_check = f"{title} {description}"
+        if not self.subscriptions.prefilter.search(text_to_check):
+            return None
+
+        article = Article(title, description, url, source_name, published_date)
+
+        # Перевіряємо ключові слова всіх підписок з урахуванням мови
+        article.subscriptions = self.subscriptions.match(text_to_check, article.language)
+        if not article.subscriptions:
+            return None
+        article.is_ukraine_related = True
+        article.relevance = self.subscriptions.score(text_to_check)
+        logger.info("Знайдено статтю про Україну: %s (%s)", article.title,
+                    ', '.join(sub.name for sub in article.subscriptions))
+        # Позначаємо як оброблений тільки релевантні статті
+        self._mark_url_as_seen(url)
+        return article
+
+    def iter_pushed_feed(self, content: bytes, source_name: str,
+                         content_type: Optional[str] = None) -> Iterator[Article]:
+        """
+        Статті про Україну з тіла push-повідомлення (WebSub): хаб надсилає
+        стрічку з новими записами, тож завантаження та позначки не потрібні
+        """
+        headers = {'content-type': content_type} if content_type else {}
+        feed = self._parse_feed(content, headers)
+        if feed.bozo:
+            logger.warning("Push від %s має помилки: %s", source_name, feed.bozo_exception)
+        for entry in feed.entries:
+            article = self._article_from_entry(entry, source_name)
+            if article is not None:
+                yield article
+
     def parse_rss_feed(self, feed_url: str, source_name: str) -> List[Article]:
-        """Парсить RSS стрічку через feedparser"""
-        articles = []
-        
+        """Парсить RSS стрічку через feedparser (тільки статті про Україну)"""
+        return list(self.iter_rss_feed(feed_url, source_name))
+
+    def iter_rss_feed(self, feed_url: str, source_name: str) -> Iterator[Article]:
+        """
+        Генератор статей про Україну з однієї RSS стрічки
+
+        Нерелевантні записи відкидаються одразу і не зберігаються в пам'яті.
+        """
+        if not self.host_health.allow(feed_url):
+            return
+
         try:
-            logger.info(f"Парсимо RSS: {source_name} ({feed_url})")
-            feed = feedparser.parse(feed_url)
+            logger.info("Парсимо RSS: %s (%s)", source_name, feed_url)
+            feed = self._download_feed(feed_url)
 
             if feed.bozo:
-                logger.warning(f"RSS стрічка {source_name} має помилки: {feed.bozo_exception}")
+                logger.warning("RSS стрічка %s має помилки: %s", source_name, feed.bozo_exception)
 
-            if not feed.entries:
-                logger.warning(f"RSS стрічка {source_name} порожня - немає статей")
-                return articles
+            # Для потокового розбору кількість записів наперед невідома
+            total = len(feed.entries) if isinstance(feed.entries, list) else None
+            if total == 0:
+                logger.warning("RSS стрічка %s порожня - немає статей", source_name)
+                return
 
-            logger.info(f"Знайдено {len(feed.entries)} статей в {source_name}")
+            if total is not None:
+                logger.info("Знайдено %d статей в %s", total, source_name)
+            else:
+                logger.info("Потоковий розбір великої стрічки %s", source_name)
 
-            for entry in feed.entries:
-                # Парсимо дату
-                published_date = None
-                if hasattr(entry, 'published'):
-                    published_date = self._parse_date(entry.published)
-                elif hasattr(entry, 'updated'):
-                    published_date = self._parse_date(entry.updated)
-                
-                # Фільтруємо за часом (останні 24 години)
-                if not published_date or not self._is_recent(published_date):
-                    continue
-                
-                # Створюємо статтю
-                title = self._clean_text(getattr(entry, 'title', ''))
-                description = self._clean_text(getattr(entry, 'summary', ''))
-                url = getattr(entry, 'link', '')
-                
-                if not title or not url:
-                    continue
+            # Позначка "найновіший оброблений запис" з попереднього запуску
+            mark = self.watermarks.get(feed_url)
+            mark_ts = mark['published'] if mark else None
+            mark_guids = set(mark['guids']) if mark else set()
+            newest_ts, newest_guids = mark_ts, list(mark_guids)
 
-                # Перевіряємо унікальність
-                if self._is_url_seen(url):
-                    continue
+            # Рання зупинка лише для стрічки, впорядкованої від нових: список
+            # записів перевіряємо весь наперед, потоковий - по ходу розбору
+            timestamps = None
+            if total is not None:
+                timestamps = [entry_timestamp(entry) for entry in feed.entries]
+                known = [ts for ts in timestamps if ts is not None]
+                descending = all(a >= b for a, b in zip(known, known[1:]))
+            else:
+                descending = True
+            previous_ts = None
+            older_run = 0
 
-                article = Article(title, description, url, source_name, published_date)
+            for index, entry in enumerate(feed.entries):
+                entry_ts = timestamps[index] if timestamps is not None else entry_timestamp(entry)
+                guid = entry.get('id') or entry.get('link', '')
 
-                # Перевіряємо ключові слова з урахуванням мови
-                text_to_check = f"{article.title} {article.description}"
-                if self._contains_ukraine_keywords(text_to_check, article.language):
-                    article.is_ukraine_related = True
-                    logger.info(f"Знайдено статтю про Україну: {article.title}")
-                    # Позначаємо як оброблений тільки релевантні статті
-                    self._mark_url_as_seen(url)
+                if entry_ts is not None:
+                    if previous_ts is not None and entry_ts > previous_ts:
+                        descending = False
+                    previous_ts = entry_ts
 
-                articles.append(article)
+                    if mark_ts is not None and (
+                            entry_ts < mark_ts or (entry_ts == mark_ts and guid in mark_guids)):
+                        older_run += 1
+                        if descending and (total is not None or older_run >= WATERMARK_STOP_RUN):
+                            # Стрічка впорядкована від нових - далі лише оброблені записи
+                            self.watermark_skipped += total - index if total else 1
+                            break
+                        self.watermark_skipped += 1
+                        continue
+                    older_run = 0
+
+                    if newest_ts is None or entry_ts > newest_ts:
+                        newest_ts, newest_guids = entry_ts, [guid]
+                    elif entry_ts == newest_ts and guid not in newest_guids:
+                        newest_guids.append(guid)
+
+                article = self._article_from_entry(entry, source_name)
+                if article is not None:
+                    yield article
+
+            if newest_ts is not None:
+                self.watermarks[feed_url] = {'published': newest_ts, 'guids': newest_guids}
                 
         except Exception as e:
-            logger.error(f"Помилка парсингу RSS {source_name}: {e}")
-        
-        return articles
+            logger.error("Помилка парсингу RSS %s: %s", source_name, e)
     
     def fetch_full_text(self, article: Article) -> str:
         """Завантажує повний текст статті через BeautifulSoup"""
+        if not self.host_health.allow(article.url):
+            return ""
+
         try:
-            logger.info(f"Завантажуємо повний текст: {article.url}")
-            response = self.session.get(article.url, timeout=15)
+            logger.info("Завантажуємо повний текст: %s", article.url)
+            timeout = self.host_health.timeout_for(article.url, FETCH_TIMEOUT)
+            started = time.monotonic()
+            try:
+                response = self.transport.get(article.url, timeout=timeout)
+            except requests.RequestException as e:
+                self.host_health.record_failure(article.url, str(e))
+                raise
+
+            if is_host_failure(response.status_code):
+                self.host_health.record_failure(article.url, f"HTTP {response.status_code}")
+            else:
+                self.host_health.record_success(article.url, time.monotonic() - started)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Видаляємо непотрібні елементи
-            for element in soup(['script', 'style', 'nav', 'header', 'footer']):
-                element.decompose()
-            
-            # Селектори для різних сайтів
-            selectors = {
-                'swissinfo.ch': ['.article__content', '[data-testid="article-content"]'],
-                'letemps.ch': ['.article-content', '.article__content'],
-                '20min.ch': ['.article-content', '.ArticleDetail_content'],
-                'nzz.ch': ['.articlecomponent', '.article-content']
-            }
-            
-            content = ""
-            site_key = None
-            
-            # Визначаємо сайт
-            for key in selectors.keys():
-                if key in article.url:
-                    site_key = key
-                    break
+            # Профіль домену: спершу селектор, що вже спрацьовував.
+            # Розбір, очищення та визначення мови - у пулі процесів
+            domain = domain_of(article.url)
+            page = self.cpu_pool.parse_page(response.content, self.extraction.candidates(domain))
+            self.extraction.apply(domain, page.extraction)
             
-            # Пробуємо специфічні селектори
-            if site_key:
-                for selector in selectors[site_key]:
-                    elements = soup.select(selector)
-                    if elements:
-                        content = elements[0].get_text()
-                        break
-            
-            # Fallback до загальних селекторів
-            if not content:
-                for selector in ['article', '.article', '.content', 'main']:
-                    elements = soup.select(selector)
-                    if elements:
-                        content = elements[0].get_text()
-                        break
-            
-            # Останній fallback - весь текст
-            if not content:
-                content = soup.get_text()
-            
-            clean_content = self._clean_text(content)
+            # Банери, тизери та підписи не потрапляють до LLM
+            clean_content, removed_tokens = self.boilerplate.strip(domain, page.text)
+            if removed_tokens:
+                logger.info("Відкинуто шаблонний текст: ~%d токенів", removed_tokens)
+            if page.language and article.language in (None, 'unknown'):
+                article.language = page.language
             
             if len(clean_content) < 100:
-                logger.warning(f"Занадто короткий текст з {article.url}")
+                logger.warning("Занадто короткий текст з %s", article.url)
                 return ""
             
             article.full_text = clean_content
-            logger.info(f"Отримано {len(clean_content)} символів")
+            logger.info("Отримано %d символів", len(clean_content))
             return clean_content
             
         except Exception as e:
-            logger.error(f"Помилка завантаження тексту з {article.url}: {e}")
+            logger.error("Помилка завантаження тексту з %s: %s", article.url, e)
             return ""
     
     def parse_all_feeds(self) -> List[Article]:
         """Парсить всі RSS стрічки"""
-        all_articles = []
-        
-        for source_name, feed_url in LIST_RSS.items():
-            articles = self.parse_rss_feed(feed_url, source_name)
-            all_articles.extend(articles)
-        
-        logger.info(f"Знайдено {len(all_articles)} статей за останні 24 години")
+        return list(self.iter_all_feeds())
+
+    def iter_all_feeds(self, feeds: Optional[Dict[str, str]] = None) -> Iterator[Article]:
+        """
+        Генератор статей про Україну з усіх RSS стрічок
+
+        Args:
+            feeds: Словник {джерело: URL}, за замовчуванням LIST_RSS
+        """
+        found = 0
+        for source_name, feed_url in (feeds or LIST_RSS).items():
+            for article in self.iter_rss_feed(feed_url, source_name):
+                found += 1
+                yield article
         
-        # Фільтруємо статті про Україну
-        ukraine_articles = [a for a in all_articles if a.is_ukraine_related]
-        logger.info(f"З них {len(ukraine_articles)} про Україну")
+        logger.info(f"Знайдено {self.recent_entries} статей за останні 24 години")
+        logger.info(f"З них {found} про Україну")
+        logger.info(f"Пропущено за позначками стрічок: {self.watermark_skipped}")
+        if self.streamed_feeds:
+            logger.info(f"Розібрано потоково: {self.streamed_feeds} стрічок")
         
-        return ukraine_articles
+        self.host_health.save()
+        self._save_watermarks()
+        self.seen.flush()
     
     def get_articles_with_full_text(self, articles: List[Article]) -> List[Article]:
         """Завантажує повний текст для списку статей"""
         for article in articles:
             self.fetch_full_text(article)
             # Затримка між запитами
-            import time
             time.sleep(1)
         
+        self.save_state()
         return articles
 
+    def save_state(self):
+        """Зберігає стан хостів, профілі витягування тексту, шаблонні абзаци та оброблені URL"""
+        self.host_health.save()
+        self.extraction.save()
+        self.boilerplate.save()
+        self._save_watermarks()
+        self.seen.flush()
+
 
 def main():
     """Тестування парсера"""
@@ -0,0 +1,172 @@
+"""Потоковий пайплайн з обмеженими чергами між етапами"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Маркер завершення роботи для воркерів етапу
+_STOP = object()
+
+
+class Stage:
+    """Етап пайплайну: функція, кількість воркерів та розмір вхідної черги"""
+
+    def __init__(self, name: str, func: Callable[[Any], Any],
+                 workers: int = 1, queue_size: int = 10):
+        """
+        Args:
+            name: Назва етапу (для логів і статистики)
+            func: Функція обробки одного елемента; None означає "відкинути"
+            workers: Кількість паралельних воркерів
+            queue_size: Максимальна глибина вхідної черги (backpressure)
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+
+        # Статистика етапу
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_queue_depth = 0
+        self.first_output_at = None
+        self._finished_workers = 0
+        self._lock = threading.Lock()
+
+    def put(self, item: Any):
+        """Кладе елемент у вхідну чергу (блокується, якщо черга повна)"""
+        self.queue.put(item)
+        depth = self.queue.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def stats(self, wall_time: float) -> dict:
+        """Повертає статистику етапу"""
+        capacity = self.workers * wall_time
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'max_queue_depth': self.max_queue_depth,
+            'queue_depth': self.queue.qsize(),
+            'utilization': self.busy_time / capacity if capacity else 0.0
+        }
+
+
+class Pipeline:
+    """
+    Виконує етапи конвеєром: кожен елемент проходить усі етапи незалежно,
+    тож перший результат з'являється без очікування інших елементів
+    """
+
+    def __init__(self, stages: List[Stage], describe: Callable[[Any], str] = str):
+        """
+        Args:
+            stages: Етапи у порядку виконання
+            describe: Функція опису елемента для повідомлень про помилки
+        """
+        if not stages:
+            raise ValueError("Пайплайн потребує хоча б один етап")
+        self.stages = stages
+        self.describe = describe
+        self.started_at = None
+        self.finished_at = None
+
+    def _worker(self, index: int):
+        """Цикл воркера етапу"""
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                break
+
+            started = time.monotonic()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                result = None
+                with stage._lock:
+                    stage.failed += 1
+                logger.error("Помилка етапу %s для %s: %s", stage.name, self.describe(item), e)
+            else:
+                with stage._lock:
+                    if result is None:
+                        stage.dropped += 1
+                    else:
+                        stage.processed += 1
+                        if stage.first_output_at is None:
+                            stage.first_output_at = time.monotonic()
+            finally:
+                with stage._lock:
+                    stage.busy_time += time.monotonic() - started
+
+            if result is not None and next_stage is not None:
+                next_stage.put(result)
+
+        # Останній воркер етапу закриває наступний етап
+        with stage._lock:
+            stage._finished_workers += 1
+            last = stage._finished_workers == stage.workers
+        if last and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.queue.put(_STOP)
+
+    def run(self, source: Iterable[Any]) -> dict:
+        """
+        Проганяє всі елементи джерела через етапи
+
+        Args:
+            source: Ітерабельне джерело елементів (може бути генератором)
+
+        Returns:
+            Статистика виконання
+        """
+        self.started_at = time.monotonic()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index,),
+                    name=f"{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        first = self.stages[0]
+        try:
+            for item in source:
+                first.put(item)
+        finally:
+            for _ in range(first.workers):
+                first.queue.put(_STOP)
+            for thread in threads:
+                thread.join()
+            self.finished_at = time.monotonic()
+
+        return self.stats()
+
+    def time_to_first_output(self) -> Optional[float]:
+        """Час від старту до першого результату останнього етапу"""
+        last = self.stages[-1]
+        if self.started_at is None or last.first_output_at is None:
+            return None
+        return last.first_output_at - self.started_at
+
+    def stats(self) -> dict:
+        """Статистика всіх етапів"""
+        end = self.finished_at or time.monotonic()
+        wall_time = end - self.started_at if self.started_at else 0.0
+        return {
+            'wall_time': wall_time,
+            'time_to_first_output': self.time_to_first_output(),
+            'stages': {stage.name: stage.stats(wall_time) for stage in self.stages}
+        }
@@ -0,0 +1,159 @@
+"""Опціональне семплювальне профілювання етапів пайплайну"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Вмикається змінною середовища PROFILE_STAGES=1 або прапорцем --profile
+PROFILE_ENV = 'PROFILE_STAGES'
+PROFILE_FLAG = '--profile'
+
+# Інтервал семплювання (секунди)
+SAMPLE_INTERVAL = 0.005
+
+# Скільки функцій показувати у текстовому звіті етапу
+REPORT_TOP = 30
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StageProfiler:
+    """
+    Семплює стеки потоків, що виконують обгорнуті етапи, і пише
+    текстовий звіт для кожного етапу та collapsed-stack файл для флеймграфа
+    """
+
+    def __init__(self, output_dir: str = 'profiles', interval: float = SAMPLE_INTERVAL):
+        self.output_dir = os.path.join(output_dir, datetime.now().strftime('%Y%m%d-%H%M%S'))
+        self.interval = interval
+        self.samples = defaultdict(Counter)
+        self.wall_time = Counter()
+        self.calls = Counter()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, argv: Optional[list] = None) -> Optional['StageProfiler']:
+        """Повертає профайлер, якщо профілювання ввімкнено, інакше None"""
+        argv = sys.argv if argv is None else argv
+        if os.getenv(PROFILE_ENV, '').lower() in ('1', 'true', 'yes') or PROFILE_FLAG in argv:
+            return cls()
+        return None
+
+    def _enter(self, stage: str) -> Optional[str]:
+        thread_id = threading.get_ident()
+        with self._lock:
+            previous = self._active.get(thread_id)
+            self._active[thread_id] = stage
+        return previous
+
+    def _exit(self, stage: str, previous: Optional[str], started: float):
+        thread_id = threading.get_ident()
+        with self._lock:
+            if previous is None:
+                self._active.pop(thread_id, None)
+            else:
+                self._active[thread_id] = previous
+            self.wall_time[stage] += time.perf_counter() - started
+            self.calls[stage] += 1
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Обгортає функцію: її виконання зараховується до етапу"""
+        def wrapped(*args, **kwargs):
+            previous = self._enter(stage)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(stage, previous, started)
+        wrapped.__name__ = getattr(func, '__name__', stage)
+        return wrapped
+
+    def wrap_iter(self, stage: str, iterable: Iterable) -> Iterator:
+        """Обгортає генератор: кожен крок ітерації зараховується до етапу"""
+        iterator = iter(iterable)
+        while True:
+            previous = self._enter(stage)
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit(stage, previous, started)
+            yield item
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                active = list(self._active.items())
+            for thread_id, stage in active:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[stage][tuple(stack)] += 1
+
+    def start(self):
+        """Запускає потік семплювання"""
+        self._thread = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self._thread.start()
+        logger.info(f"🔬 Профілювання етапів ввімкнено (інтервал {self.interval * 1000:.0f} мс)")
+
+    def stop(self) -> str:
+        """Зупиняє семплювання і записує звіти; повертає директорію звітів"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(os.path.join(self.output_dir, 'all.collapsed'), 'w', encoding='utf-8') as combined:
+            for stage, stacks in self.samples.items():
+                with open(os.path.join(self.output_dir, f'{stage}.collapsed'), 'w', encoding='utf-8') as f:
+                    for stack, count in stacks.items():
+                        line = ';'.join(stack)
+                        f.write(f"{line} {count}\n")
+                        combined.write(f"{stage};{line} {count}\n")
+                self._write_report(stage, stacks)
+
+        logger.info(f"🔬 Профілі етапів записано в {self.output_dir}")
+        return self.output_dir
+
+    def _write_report(self, stage: str, stacks: Counter):
+        """Текстовий звіт: власний та сукупний час функцій"""
+        total = sum(stacks.values()) or 1
+        own, inclusive = Counter(), Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+
+        lines = [
+            f"Етап: {stage}",
+            f"Викликів: {self.calls[stage]}, час: {self.wall_time[stage]:.2f} с, семплів: {total}",
+            "",
+            f"{'власний':>8} {'сукупний':>9}  функція"
+        ]
+        for label, count in own.most_common(REPORT_TOP):
+            lines.append(f"{count / total:>8.1%} {inclusive[label] / total:>9.1%}  {label}")
+
+        with open(os.path.join(self.output_dir, f'{stage}.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,451 @@
+"""Сховища стану між запусками: файл, SQLite, гілка git, S3-сумісне сховище"""
+
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import subprocess
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Ключ - перші 16 байт sha256 (замість 64 символів hex у JSON)
+KEY_SIZE = 16
+
+# Скільки останніх ключів зберігати в кожному просторі імен
+SEEN_LIMIT = 10000
+
+
+def key_of(text: str) -> bytes:
+    """Компактний ключ для URL"""
+    return hashlib.sha256(text.encode()).digest()[:KEY_SIZE]
+
+
+def pack_keys(keys: Iterable[bytes]) -> bytes:
+    """Знімок простору імен: стиснута послідовність 16-байтних ключів"""
+    return zlib.compress(b''.join(keys), 6)
+
+
+def unpack_keys(data: bytes) -> List[bytes]:
+    raw = zlib.decompress(data)
+    return [raw[i:i + KEY_SIZE] for i in range(0, len(raw) - len(raw) % KEY_SIZE, KEY_SIZE)]
+
+
+class StateBackend(ABC):
+    """
+    Сховище множин ключів за просторами імен ('parser', 'telegram_default'...)
+
+    append дописує нові ключі, replace - перезаписує простір після
+    обрізання, flush - відправляє накопичені зміни (для віддалених сховищ).
+    """
+
+    name = 'base'
+
+    @abstractmethod
+    def load(self, namespace: str) -> List[bytes]:
+        ...
+
+    @abstractmethod
+    def append(self, namespace: str, keys: List[bytes]):
+        ...
+
+    @abstractmethod
+    def replace(self, namespace: str, keys: List[bytes]):
+        ...
+
+    def flush(self):
+        pass
+
+
+class FileBackend(StateBackend):
+    """Двійковий журнал на простір імен: ключі лише дописуються в кінець"""
+
+    name = 'file'
+
+    def __init__(self, directory: str = 'data/state'):
+        self.directory = pathlib.Path(directory)
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str) -> pathlib.Path:
+        return self.directory / f'{namespace}.seen'
+
+    def load(self, namespace: str) -> List[bytes]:
+        path = self._path(namespace)
+        if not path.exists():
+            return []
+        raw = path.read_bytes()
+        tail = len(raw) % KEY_SIZE
+        if tail:
+            # Обірваний запис останнього запуску
+            logger.warning(f"Відрізано недописаний ключ у {path}")
+            raw = raw[:-tail]
+            os.truncate(path, len(raw))
+        return [raw[i:i + KEY_SIZE] for i in range(0, len(raw), KEY_SIZE)]
+
+    def append(self, namespace: str, keys: List[bytes]):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._path(namespace), 'ab') as f:
+                f.write(b''.join(keys))
+
+    def replace(self, namespace: str, keys: List[bytes]):
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(namespace)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(b''.join(keys))
+            os.replace(tmp, path)
+
+
+class SqliteBackend(StateBackend):
+    """Одна таблиця SQLite (ns, key) з порядком додавання"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = 'data/state.db'):
+        pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen ('
+            'ns TEXT NOT NULL, key BLOB NOT NULL, seq INTEGER NOT NULL, '
+            'PRIMARY KEY (ns, key)) WITHOUT ROWID'
+        )
+        self._lock = threading.Lock()
+
+    def load(self, namespace: str) -> List[bytes]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key FROM seen WHERE ns = ? ORDER BY seq', (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def append(self, namespace: str, keys: List[bytes]):
+        seq = time.time_ns()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO seen (ns, key, seq) VALUES (?, ?, ?)',
+                [(namespace, key, seq + i) for i, key in enumerate(keys)])
+
+    def replace(self, namespace: str, keys: List[bytes]):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM seen WHERE ns = ?', (namespace,))
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO seen (ns, key, seq) VALUES (?, ?, ?)',
+                [(namespace, key, i) for i, key in enumerate(keys)])
+
+
+class SnapshotBackend(StateBackend):
+    """
+    Основа для віддалених сховищ: стан тримається в пам'яті, а flush
+    відправляє стиснуті знімки лише змінених просторів імен
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _fetch(self, namespace: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def _store(self, snapshots: Dict[str, bytes]):
+        ...
+
+    def load(self, namespace: str) -> List[bytes]:
+        with self._lock:
+            if namespace not in self._data:
+                blob = self._fetch(namespace)
+                self._data[namespace] = unpack_keys(blob) if blob else []
+            return list(self._data[namespace])
+
+    def append(self, namespace: str, keys: List[bytes]):
+        with self._lock:
+            self._data.setdefault(namespace, []).extend(keys)
+            self._dirty.add(namespace)
+
+    def replace(self, namespace: str, keys: List[bytes]):
+        with self._lock:
+            self._data[namespace] = list(keys)
+            self._dirty.add(namespace)
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshots = {ns: pack_keys(self._data[ns]) for ns in self._dirty}
+            self._dirty = set()
+        try:
+            self._store(snapshots)
+            logger.info(f"💾 Стан збережено ({self.name}): "
+                        f"{', '.join(snapshots)}, {sum(map(len, snapshots.values()))} байт")
+        except Exception as e:
+            with self._lock:
+                self._dirty.update(snapshots)
+            logger.error(f"Не вдалося зберегти стан ({self.name}): {e}")
+
+
+class GitSnapshotBackend(SnapshotBackend):
+    """
+    Знімки у окремій гілці репозиторію (за замовчуванням 'state').
+    Коміти створюються через git plumbing - робоча копія не змінюється.
+    """
+
+    name = 'git'
+
+    def __init__(self, branch: str = 'state', remote: Optional[str] = 'origin',
+                 repo_dir: str = '.'):
+        """
+        Args:
+            branch: Гілка зі станом
+            remote: Віддалений репозиторій (None - лише локальна гілка)
+            repo_dir: Каталог репозиторію
+        """
+        super().__init__()
+        self.branch = branch
+        self.remote = remote
+        self.repo_dir = repo_dir
+        self.ref = f'refs/state/{branch}' if remote else f'refs/heads/{branch}'
+        self._tree = None
+
+    def _git(self, *args, input: Optional[bytes] = None, check: bool = True) -> bytes:
+        env = dict(os.environ)
+        env.setdefault('GIT_AUTHOR_NAME', 'news-bot')
+        env.setdefault('GIT_AUTHOR_EMAIL', 'news-bot@users.noreply.github.com')
+        env.setdefault('GIT_COMMITTER_NAME', env['GIT_AUTHOR_NAME'])
+        env.setdefault('GIT_COMMITTER_EMAIL', env['GIT_AUTHOR_EMAIL'])
+        result = subprocess.run(['git', *args], cwd=self.repo_dir, input=input,
+                                capture_output=True, env=env)
+        if check and result.returncode:
+            raise RuntimeError(f"git {args[0]}: {result.stderr.decode().strip()}")
+        return result.stdout if not result.returncode else b''
+
+    def _load_tree(self) -> Dict[str, str]:
+        """{файл: blob} останнього знімка (гілку отримуємо один раз за запуск)"""
+        if self._tree is None:
+            if self.remote:
+                self._git('fetch', '--quiet', '--depth=1', self.remote,
+                          f'+refs/heads/{self.branch}:{self.ref}', check=False)
+            listing = self._git('ls-tree', self.ref, check=False).decode()
+            self._tree = {}
+            for line in listing.splitlines():
+                meta, name = line.split('\t', 1)
+                self._tree[name] = meta.split()[2]
+        return self._tree
+
+    def _fetch(self, namespace: str) -> Optional[bytes]:
+        blob = self._load_tree().get(f'{namespace}.seen.z')
+        return self._git('cat-file', 'blob', blob) if blob else None
+
+    def _store(self, snapshots: Dict[str, bytes]):
+        tree = dict(self._load_tree())
+        for namespace, data in snapshots.items():
+            tree[f'{namespace}.seen.z'] = self._git('hash-object', '-w', '--stdin',
+                                                    input=data).decode().strip()
+        listing = ''.join(f'100644 blob {blob}\t{name}\n' for name, blob in sorted(tree.items()))
+        tree_id = self._git('mktree', input=listing.encode()).decode().strip()
+
+        parent = self._git('rev-parse', '--verify', '--quiet', self.ref, check=False).decode().strip()
+        args = ['commit-tree', tree_id, '-m', f'state: {", ".join(sorted(snapshots))}']
+        if parent:
+            args += ['-p', parent]
+        commit = self._git(*args).decode().strip()
+        self._git('update-ref', self.ref, commit)
+        if self.remote:
+            self._git('push', '--quiet', self.remote, f'{commit}:refs/heads/{self.branch}')
+        self._tree = tree
+
+
+def _sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign_v4(method: str, url: str, payload: bytes, access_key: str, secret_key: str,
+            region: str, service: str = 's3', now: Optional[datetime.datetime] = None) -> dict:
+    """
+    Заголовки AWS Signature Version 4 для запиту (path-style URL, без query)
+
+    Returns:
+        Заголовки Authorization, x-amz-date, x-amz-content-sha256
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date = now.strftime('%Y%m%d')
+    parsed = urlparse(url)
+    payload_hash = _sha256_hex(payload)
+
+    headers = {'host': parsed.netloc, 'x-amz-content-sha256': payload_hash, 'x-amz-date': amz_date}
+    signed_headers = ';'.join(sorted(headers))
+    canonical_headers = ''.join(f'{name}:{headers[name]}\n' for name in sorted(headers))
+    canonical_request = '\n'.join([
+        method, quote(parsed.path or '/', safe='/-_.~'), parsed.query,
+        canonical_headers, signed_headers, payload_hash
+    ])
+
+    scope = f'{date}/{region}/{service}/aws4_request'
+    string_to_sign = '\n'.join(['AWS4-HMAC-SHA256', amz_date, scope,
+                                _sha256_hex(canonical_request.encode())])
+    key = _hmac(f'AWS4{secret_key}'.encode(), date)
+    for part in (region, service, 'aws4_request'):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    return {
+        'Authorization': (f'AWS4-HMAC-SHA256 Credential={access_key}/{scope}, '
+                          f'SignedHeaders={signed_headers}, Signature={signature}'),
+        'x-amz-date': amz_date,
+        'x-amz-content-sha256': payload_hash
+    }
+
+
+class S3Backend(SnapshotBackend):
+    """Знімок на простір імен як об'єкт S3-сумісного сховища (path-style)"""
+
+    name = 's3'
+
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = 'us-east-1', prefix: str = 'state/', transport=None):
+        super().__init__()
+        from http_client import shared_transport
+        self.endpoint = endpoint.rstrip('/')
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix
+        self.transport = transport or shared_transport()
+
+    def _url(self, namespace: str) -> str:
+        return f'{self.endpoint}/{self.bucket}/{self.prefix}{namespace}.seen.z'
+
+    def _fetch(self, namespace: str) -> Optional[bytes]:
+        url = self._url(namespace)
+        headers = sign_v4('GET', url, b'', self.access_key, self.secret_key, self.region)
+        response = self.transport.get(url, headers=headers)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+    def _store(self, snapshots: Dict[str, bytes]):
+        for namespace, data in snapshots.items():
+            url = self._url(namespace)
+            headers = sign_v4('PUT', url, data, self.access_key, self.secret_key, self.region)
+            headers['Content-Type'] = 'application/octet-stream'
+            self.transport.put(url, data=data, headers=headers).raise_for_status()
+
+
+def open_backend(kind: Optional[str] = None) -> StateBackend:
+    """
+    Сховище за STATE_BACKEND: file (за замовчуванням), sqlite, git, s3
+
+    git: STATE_GIT_BRANCH (state), STATE_GIT_REMOTE (origin; порожньо - локальна гілка)
+    s3: STATE_S3_ENDPOINT, STATE_S3_BUCKET, STATE_S3_ACCESS_KEY, STATE_S3_SECRET_KEY,
+        STATE_S3_REGION (us-east-1), STATE_S3_PREFIX (state/)
+    """
+    kind = (kind or os.getenv('STATE_BACKEND') or 'file').lower()
+    if kind == 'file':
+        return FileBackend()
+    if kind == 'sqlite':
+        return SqliteBackend()
+    if kind == 'git':
+        return GitSnapshotBackend(os.getenv('STATE_GIT_BRANCH', 'state'),
+                                  os.getenv('STATE_GIT_REMOTE', 'origin') or None)
+    if kind == 's3':
+        return S3Backend(os.environ['STATE_S3_ENDPOINT'], os.environ['STATE_S3_BUCKET'],
+                         os.environ['STATE_S3_ACCESS_KEY'], os.environ['STATE_S3_SECRET_KEY'],
+                         os.getenv('STATE_S3_REGION', 'us-east-1'),
+                         os.getenv('STATE_S3_PREFIX', 'state/'))
+    raise ValueError(f"Невідоме сховище стану: {kind}")
+
+
+_shared_backend = None
+_shared_lock = threading.Lock()
+
+
+def shared_backend() -> StateBackend:
+    """Одне сховище на процес для парсера і всіх Telegram клієнтів"""
+    global _shared_backend
+    with _shared_lock:
+        if _shared_backend is None:
+            _shared_backend = open_backend()
+        return _shared_backend
+
+
+def _legacy_keys(path: pathlib.Path) -> List[bytes]:
+    """
+    Ключі зі старого seen.json: список sha256 (парсер) або {'urls': [...]}
+    (Telegram). Обидва формати дають ті самі ключі, що й key_of(url).
+    """
+    data = json.loads(path.read_text(encoding='utf-8'))
+    if isinstance(data, dict):
+        return [key_of(url) for url in data.get('urls', [])]
+    return [bytes.fromhex(uid)[:KEY_SIZE] for uid in data]
+
+
+class SeenStore:
+    """Множина оброблених URL поверх сховища стану (порядок додавання зберігається)"""
+
+    def __init__(self, backend: StateBackend, namespace: str,
+                 max_items: int = SEEN_LIMIT, legacy_path: Optional[str] = None):
+        """
+        Args:
+            backend: Сховище стану
+            namespace: Простір імен ('parser', 'telegram_default'...)
+            max_items: Скільки останніх ключів зберігати
+            legacy_path: Старий seen.json для одноразового імпорту
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.max_items = max_items
+        self._lock = threading.Lock()
+
+        started = time.perf_counter()
+        keys = backend.load(namespace)
+        if not keys and legacy_path and pathlib.Path(legacy_path).exists():
+            try:
+                keys = _legacy_keys(pathlib.Path(legacy_path))[-max_items:]
+                backend.replace(namespace, keys)
+                logger.info(f"Імпортовано {len(keys)} записів з {legacy_path} у '{namespace}'")
+            except (ValueError, AttributeError, TypeError) as e:
+                logger.warning(f"Не вдалося імпортувати {legacy_path}: {e}")
+        self._keys = dict.fromkeys(keys)
+        logger.debug("Стан '%s' (%s): %d ключів за %.1f мс", namespace, backend.name,
+                     len(self._keys), (time.perf_counter() - started) * 1000)
+
+    def __contains__(self, url: str) -> bool:
+        return key_of(url) in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, url: str):
+        """Додає URL; старі ключі відкидаються, коли їх набирається в півтора рази більше ліміту"""
+        key = key_of(url)
+        with self._lock:
+            if key in self._keys:
+                return
+            self._keys[key] = None
+            if len(self._keys) > self.max_items * 3 // 2:
+                keys = list(self._keys)[-self.max_items:]
+                self._keys = dict.fromkeys(keys)
+                self.backend.replace(self.namespace, keys)
+            else:
+                self.backend.append(self.namespace, [key])
+
+    def flush(self):
+        self.backend.flush()
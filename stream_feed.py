@@ -0,0 +1,172 @@
+"""Потоковий розбір RSS/Atom через lxml.iterparse для великих стрічок"""
+
+import calendar
+import io
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_tz, mktime_tz
+from typing import Iterator, Optional
+
+import feedparser
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+RSS1 = '{http://purl.org/rss/1.0/}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+CONTENT = '{http://purl.org/rss/1.0/modules/content/}'
+
+ENTRY_TAGS = ('item', f'{RSS1}item', f'{ATOM}entry')
+
+# Скільки старих записів поспіль вважати ознакою кінця свіжої частини
+OLD_ENTRIES_TO_STOP = 3
+
+
+class FeedEntry:
+    """
+    Легкий запис стрічки з тими ж полями, що й у feedparser
+    (title, summary, link, id, published/updated та *_parsed).
+    Відсутні поля не встановлюються, тож hasattr працює як у feedparser.
+    """
+
+    __slots__ = ('title', 'summary', 'link', 'id', 'published', 'updated',
+                 'published_parsed', 'updated_parsed')
+
+    def get(self, name: str, default=None):
+        return getattr(self, name, default)
+
+
+def parse_feed_date(value: str) -> Optional[time.struct_time]:
+    """RFC 822 (RSS) або ISO 8601 (Atom) → struct_time в UTC"""
+    value = value.strip()
+    if not value:
+        return None
+    parsed = parsedate_tz(value)
+    if parsed:
+        return time.gmtime(mktime_tz(parsed))
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).timetuple()
+
+
+def _text(element) -> str:
+    if element is None:
+        return ''
+    if len(element):
+        return ''.join(element.itertext())
+    return element.text or ''
+
+
+def _build_entry(element) -> FeedEntry:
+    entry = FeedEntry()
+    atom = element.tag.startswith(ATOM)
+    ns = ATOM if atom else (RSS1 if element.tag.startswith(RSS1) else '')
+
+    title = element.find(f'{ns}title')
+    if title is not None:
+        entry.title = _text(title)
+
+    if atom:
+        summary = element.find(f'{ATOM}summary')
+        if summary is None:
+            summary = element.find(f'{ATOM}content')
+        for link in element.iterfind(f'{ATOM}link'):
+            if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+                entry.link = link.get('href')
+                break
+        guid = element.find(f'{ATOM}id')
+        dates = (('published', element.find(f'{ATOM}published')),
+                 ('updated', element.find(f'{ATOM}updated')))
+    else:
+        summary = element.find(f'{ns}description')
+        if summary is None:
+            summary = element.find(f'{CONTENT}encoded')
+        link = element.find(f'{ns}link')
+        if link is not None and link.text:
+            entry.link = link.text.strip()
+        guid = element.find('guid')
+        dates = (('published', element.find('pubDate')),
+                 ('updated', element.find(f'{DC}date')))
+
+    if summary is not None:
+        entry.summary = _text(summary)
+    if guid is not None and guid.text:
+        entry.id = guid.text.strip()
+    elif getattr(entry, 'link', None):
+        entry.id = entry.link
+
+    for field, node in dates:
+        if node is not None and node.text:
+            setattr(entry, field, node.text.strip())
+            parsed = parse_feed_date(node.text)
+            if parsed:
+                setattr(entry, f'{field}_parsed', parsed)
+    return entry
+
+
+def _parse_entries(content: bytes) -> Iterator:
+    """Записи в порядку документа; після помилки XML - решта записів від feedparser"""
+    yielded = 0
+    context = etree.iterparse(io.BytesIO(content), events=('end',), tag=ENTRY_TAGS,
+                              huge_tree=True, resolve_entities=False)
+    try:
+        for _, element in context:
+            entry = _build_entry(element)
+
+            # Звільняємо розібраний елемент і вже оброблених сусідів
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            yielded += 1
+            yield entry
+    except etree.XMLSyntaxError as e:
+        # feedparser терпимий до невизначених сутностей (&nbsp;) і битої розмітки
+        logger.warning("Потоковий розбір зупинився після %d записів (%s), "
+                       "решту розбирає feedparser", yielded, e)
+        yield from feedparser.parse(content).entries[yielded:]
+    finally:
+        del context
+
+
+def iter_entries(content: bytes, cutoff: Optional[float] = None) -> Iterator:
+    """
+    Віддає записи стрічки по одному, звільняючи пам'ять розібраних елементів
+
+    Args:
+        content: Байти XML документа
+        cutoff: Час (UTC, секунди); після кількох старіших записів поспіль
+                розбір зупиняється (стрічки зазвичай впорядковані від нових)
+
+    Якщо документ некоректний, записи після місця помилки бере з feedparser.
+    """
+    old_in_row = 0
+    for entry in _parse_entries(content):
+        yield entry
+
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if cutoff is not None and parsed:
+            if calendar.timegm(parsed) < cutoff:
+                old_in_row += 1
+                if old_in_row >= OLD_ENTRIES_TO_STOP:
+                    return
+            else:
+                old_in_row = 0
+
+
+class StreamedFeed:
+    """Результат з інтерфейсом feedparser.parse, де entries - генератор"""
+
+    __slots__ = ('entries',)
+
+    bozo = False
+    bozo_exception = None
+
+    def __init__(self, entries: Iterator):
+        self.entries = entries
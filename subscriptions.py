@@ -0,0 +1,154 @@
+"""Підписки: кілька каналів з власними ключовими словами поверх одного парсингу"""
+
+import json
+import logging
+import os
+import pathlib
+import re
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIPTIONS_FILE = 'subscriptions.json'
+
+# Мова статті → набір ключових слів (невідомі мови перевіряємо німецькими)
+LANG_MAP = {'de': 'de', 'fr': 'fr', 'en': 'en', 'uk': 'uk'}
+DEFAULT_LANG = 'de'
+
+
+class Subscription:
+    """Канал з власними правилами відбору та параметрами виводу"""
+
+    __slots__ = ('name', 'channel', 'keywords', 'languages', 'translate', 'summarize')
+
+    def __init__(self, name: str, channel: str, keywords: Dict[str, List[str]],
+                 languages: Optional[List[str]] = None,
+                 translate: bool = True, summarize: bool = True):
+        """
+        Args:
+            name: Унікальна назва підписки
+            channel: ID Telegram каналу
+            keywords: Регулярні вирази за мовами {'de': [...], 'fr': [...]}
+            languages: Приймати лише статті цими мовами (None - усі)
+            translate: Перекладати українською
+            summarize: Створювати синопсис
+        """
+        self.name = name
+        self.channel = channel
+        self.keywords = keywords
+        self.languages = set(languages) if languages else None
+        self.translate = translate
+        self.summarize = summarize
+
+    @property
+    def seen_file(self) -> str:
+        """Старий JSON файл опублікованих URL цього каналу (для імпорту)"""
+        return 'data/seen.json' if self.name == 'default' else f'data/seen_{self.name}.json'
+
+    @property
+    def seen_namespace(self) -> str:
+        """Простір імен опублікованих URL каналу у сховищі стану"""
+        return f'telegram_{self.name}'
+
+    def __repr__(self):
+        return f"Subscription({self.name} → {self.channel})"
+
+
+class SubscriptionRegistry:
+    """
+    Компілює ключові слова всіх підписок один раз: кожен унікальний
+    шаблон перевіряється не більше одного разу на статтю, тож вартість
+    залежить від кількості унікальних шаблонів, а не каналів
+    """
+
+    def __init__(self, subscriptions: List[Subscription]):
+        if not subscriptions:
+            raise ValueError("Потрібна хоча б одна підписка")
+        names = [sub.name for sub in subscriptions]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Назви підписок повторюються: {names}")
+
+        self.subscriptions = subscriptions
+        self.patterns = []
+        index = {}
+        # (підписка, мова) → індекси унікальних шаблонів
+        self._rules = []
+        for sub in subscriptions:
+            rules = {}
+            for lang, patterns in sub.keywords.items():
+                ids = []
+                for pattern in patterns:
+                    if pattern not in index:
+                        index[pattern] = len(self.patterns)
+                        self.patterns.append(re.compile(pattern, re.IGNORECASE))
+                    ids.append(index[pattern])
+                rules[lang] = ids
+            self._rules.append(rules)
+
+        # Попередній фільтр: будь-який шаблон будь-якої підписки
+        self.prefilter = re.compile(
+            '|'.join(f'(?:{p.pattern})' for p in self.patterns), re.IGNORECASE
+        )
+
+    @classmethod
+    def default(cls, keywords: Dict[str, List[str]], channel: str = '',
+                translate: bool = True, summarize: bool = True) -> 'SubscriptionRegistry':
+        """Одна підписка з глобальними KEYWORDS"""
+        return cls([Subscription('default', channel, keywords,
+                                 translate=translate, summarize=summarize)])
+
+    @classmethod
+    def load(cls, keywords: Dict[str, List[str]], channel: str = '',
+             translate: bool = True, summarize: bool = True,
+             path: Optional[str] = None) -> 'SubscriptionRegistry':
+        """
+        Завантажує підписки з JSON файлу (SUBSCRIPTIONS_FILE або subscriptions.json)
+
+        Формат: список об'єктів {name, channel, keywords, languages, translate, summarize}.
+        keywords: "default" означає глобальні KEYWORDS. Без файлу - одна
+        підписка "default" на TELEGRAM_CHANNEL.
+        """
+        file = pathlib.Path(path or os.getenv('SUBSCRIPTIONS_FILE', SUBSCRIPTIONS_FILE))
+        if not file.exists():
+            return cls.default(keywords, channel, translate, summarize)
+
+        data = json.loads(file.read_text(encoding='utf-8'))
+        subscriptions = []
+        for item in data:
+            sub_keywords = item.get('keywords', 'default')
+            subscriptions.append(Subscription(
+                name=item['name'],
+                channel=item.get('channel') or channel,
+                keywords=keywords if sub_keywords == 'default' else sub_keywords,
+                languages=item.get('languages'),
+                translate=item.get('translate', translate),
+                summarize=item.get('summarize', summarize)
+            ))
+        logger.info(f"Завантажено {len(subscriptions)} підписок з {file}")
+        return cls(subscriptions)
+
+    def score(self, text: str) -> int:
+        """Сила збігу: кількість різних шаблонів, знайдених у тексті"""
+        return sum(1 for pattern in self.patterns if pattern.search(text))
+
+    def match(self, text: str, language: Optional[str]) -> List[Subscription]:
+        """
+        Повертає підписки, ключові слова яких знайдено в тексті
+
+        Текст уже має пройти prefilter - викликач перевіряє його до
+        визначення мови.
+        """
+        lang_key = LANG_MAP.get(language, DEFAULT_LANG)
+        results = {}
+        matched = []
+        for sub, rules in zip(self.subscriptions, self._rules):
+            if sub.languages and language not in sub.languages:
+                continue
+            for pattern_id in rules.get(lang_key, ()):
+                found = results.get(pattern_id)
+                if found is None:
+                    found = results[pattern_id] = bool(self.patterns[pattern_id].search(text))
+                if found:
+                    matched.append(sub)
+                    break
+        return matched
@@ -2,7 +2,12 @@
 
 import openai
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from llm_budget import (BudgetExceeded, TokenBudget, chat_completion, estimate_tokens,
+                        SUMMARY_CHUNK_TOKENS, SUMMARY_MAX_CHUNKS, SUMMARY_WINDOW_CHARS)
+from translation_memory import split_sentences
 
 logger = logging.getLogger(__name__)
 
@@ -10,14 +15,16 @@ logger = logging.getLogger(__name__)
 class Summarizer:
     """Клас для створення синопсисів статей"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, budget: Optional[TokenBudget] = None):
         """
         Ініціалізація резюматора
         
         Args:
             api_key: OpenAI API ключ
+            budget: Бюджет токенів (None - без обліку)
         """
         self.client = openai.OpenAI(api_key=api_key)
+        self.budget = budget
     
     def create_summary(self, text: str) -> Optional[str]:
         """
@@ -52,13 +59,9 @@ class Summarizer:
 Розгорнутий синопсис:""".format(text=text)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.3
+            response = chat_completion(
+                self.client, self.budget, prompt,
+                max_tokens=500, temperature=0.3
             )
             
             summary = response.choices[0].message.content.strip()
@@ -70,12 +73,57 @@ class Summarizer:
                 logger.error("GPT повернув порожній синопсис")
                 return None
                 
+        except BudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"Помилка створення синопсису: {e}")
             return None
     
+    def _summarize_chunk(self, chunk: str, number: int, total: int) -> Optional[str]:
+        """Ключові факти однієї частини довгого тексту"""
+        prompt = f"""Випиши ключові факти з частини {number} з {total} новинної статті українською мовою (2–4 речення).
+
+Збережи: хто, що, де, коли, числа та цитати, важливі для новини. Без вступів і оцінок.
+
+Частина статті:
+---
+{chunk}
+---
+
+Ключові факти:"""
+
+        try:
+            response = chat_completion(
+                self.client, self.budget, prompt,
+                max_tokens=200, temperature=0.2
+            )
+            return response.choices[0].message.content.strip() or None
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка резюмування частини {number}/{total}: {e}")
+            return None
+
+    def _summarize_chunks(self, text: str) -> List[str]:
+        """
+        Map-етап: частини резюмуються одночасно, тож затримка близька
+        до одного короткого виклику незалежно від довжини статті
+
+        Returns:
+            Факти частин у порядку тексту (без частин, що не вдалися)
+        """
+        chunks = split_chunks(text)
+        logger.info(f"Довгий текст ({len(text)} символів): резюмуємо {len(chunks)} частин паралельно")
+        with ThreadPoolExecutor(max_workers=min(len(chunks), SUMMARY_MAX_CHUNKS),
+                                thread_name_prefix='summary') as executor:
+            futures = [executor.submit(self._summarize_chunk, chunk, number, len(chunks))
+                       for number, chunk in enumerate(chunks, 1)]
+            facts = [future.result() for future in futures]
+        return [fact for fact in facts if fact]
+
     def create_summary_from_parts(self, title: str, description: str, 
-                                 full_text: str = None) -> Optional[str]:
+                                 full_text: str = None,
+                                 source_text: str = None) -> Optional[str]:
         """
         Створює синопсис з різних частин статті
         
@@ -83,6 +131,8 @@ class Summarizer:
             title: Заголовок українською
             description: Опис українською
             full_text: Повний текст українською (опціонально)
+            source_text: Повний текст мовою оригіналу; довгий текст резюмується
+                         по частинах з нього, бо переклад може бути неповним
             
         Returns:
             Синопсис або None у разі помилки
@@ -96,12 +146,18 @@ class Summarizer:
         if description:
             text_parts.append(f"Опис: {description}")
         
-        if full_text:
-            # Якщо повний текст довгий, беремо перші 2000 символів
-            if len(full_text) > 2000:
-                text_parts.append(f"Текст: {full_text[:2000]}...")
+        long_text = source_text if source_text and len(source_text) > SUMMARY_WINDOW_CHARS else full_text
+        if long_text and len(long_text) > SUMMARY_WINDOW_CHARS:
+            # Довгий текст: факти з кожної частини паралельно (українською), синопсис - з фактів
+            facts = self._summarize_chunks(long_text)
+            if facts:
+                text_parts.append("Ключові факти з усього тексту:\n" + "\n".join(
+                    f"- {fact}" for fact in facts))
             else:
-                text_parts.append(f"Текст: {full_text}")
+                text = full_text or source_text
+                text_parts.append(f"Текст: {text[:SUMMARY_WINDOW_CHARS]}...")
+        elif full_text:
+            text_parts.append(f"Текст: {full_text}")
         
         if not text_parts:
             logger.warning("Немає тексту для резюмування")
@@ -111,6 +167,54 @@ class Summarizer:
         return self.create_summary(combined_text)
 
 
+def split_chunks(text: str, chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+                 max_chunks: int = SUMMARY_MAX_CHUNKS) -> List[str]:
+    """
+    Ділить текст на частини по ~chunk_tokens токенів за межами абзаців
+    (задовгі абзаци - за межами речень). Частин не більше max_chunks:
+    розмір частини пропорційно збільшується, а якщо через неподільні
+    абзаци їх однаково забагато - підбирається більший.
+    """
+    total = estimate_tokens(text)
+    chunk_tokens = max(chunk_tokens, -(-total // max_chunks))
+
+    pieces = []
+    for paragraph in text.split('\n\n'):
+        if estimate_tokens(paragraph) > chunk_tokens:
+            pieces.extend(split_sentences(paragraph)[0])
+        elif paragraph.strip():
+            pieces.append(paragraph.strip())
+
+    sizes = [estimate_tokens(piece) for piece in pieces]
+    groups = _pack(sizes, chunk_tokens)
+    if len(groups) > max_chunks:
+        # Неподільні абзаци не вмістилися - найменший розмір частини,
+        # за якого частин не більше max_chunks (кількість спадає з розміром)
+        low, high = chunk_tokens + 1, max(sum(sizes), 1)
+        while low < high:
+            middle = (low + high) // 2
+            if len(_pack(sizes, middle)) <= max_chunks:
+                high = middle
+            else:
+                low = middle + 1
+        groups = _pack(sizes, low)
+    return ['\n\n'.join(pieces[i] for i in group) for group in groups]
+
+
+def _pack(sizes: List[int], chunk_tokens: int) -> List[List[int]]:
+    """Жадібне пакування частин тексту (індекси) по chunk_tokens токенів"""
+    groups, current, current_tokens = [], [], 0
+    for index, tokens in enumerate(sizes):
+        if current and current_tokens + tokens > chunk_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
 def main():
     """Тестування резюматора"""
     import os
@@ -2,59 +2,44 @@
 
 import logging
 from typing import Optional, List
-import json
 import os
-from datetime import datetime
-import requests
+
+from http_client import HttpTransport, shared_transport
+from state_backend import SeenStore, shared_backend
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_URL = "https://api.telegram.org"
+
 
 class TelegramClient:
     """Клас для роботи з Telegram Bot API"""
 
-    def __init__(self, token: str, channel_id: str):
+    def __init__(self, token: str, channel_id: str,
+                 transport: Optional[HttpTransport] = None,
+                 seen_file: str = "data/seen.json",
+                 api_url: Optional[str] = None,
+                 seen: Optional[SeenStore] = None):
         """
         Ініціалізація Telegram клієнта
 
         Args:
             token: Telegram Bot Token
             channel_id: ID каналу для публікації
+            transport: HTTP транспорт (за замовчуванням спільний)
+            seen_file: Старий JSON файл опублікованих URL (імпортується один раз)
+            api_url: Адреса Bot API (TELEGRAM_API_URL або api.telegram.org)
+            seen: Опубліковані URL у сховищі стану (за замовчуванням простір 'telegram')
         """
+        self.transport = transport or shared_transport()
         self.token = token
         self.channel_id = channel_id
-        self.base_url = f"https://api.telegram.org/bot{token}"
-        self.seen_file = "data/seen.json"
+        api_url = api_url or os.getenv('TELEGRAM_API_URL') or TELEGRAM_API_URL
+        self.base_url = f"{api_url.rstrip('/')}/bot{token}"
+        self.seen_file = seen_file
 
-        # Створюємо директорію для даних
-        os.makedirs("data", exist_ok=True)
-
-        # Завантажуємо список опублікованих URL
-        self.seen_urls = self._load_seen_urls()
-    
-    def _load_seen_urls(self) -> set:
-        """Завантажує список опублікованих URL"""
-        try:
-            if os.path.exists(self.seen_file):
-                with open(self.seen_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return set(data.get('urls', []))
-        except Exception as e:
-            logger.warning(f"Не вдалося завантажити seen.json: {e}")
-        
-        return set()
-    
-    def _save_seen_urls(self):
-        """Зберігає список опублікованих URL"""
-        try:
-            data = {
-                'urls': list(self.seen_urls),
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.seen_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Не вдалося зберегти seen.json: {e}")
+        # Опубліковані URL (сховище стану за STATE_BACKEND)
+        self.seen = seen or SeenStore(shared_backend(), 'telegram', legacy_path=seen_file)
     
     def _escape_markdown_v2(self, text: str) -> str:
         """Екранує спеціальні символи для Markdown V2"""
@@ -118,18 +103,17 @@ class TelegramClient:
     
     def is_url_seen(self, url: str) -> bool:
         """Перевіряє, чи була стаття вже опублікована"""
-        return url in self.seen_urls
+        return url in self.seen
     
     def mark_url_as_seen(self, url: str):
         """Позначає URL як опублікований"""
-        self.seen_urls.add(url)
-        self._save_seen_urls()
+        self.seen.add(url)
     
-    def _send_telegram_request(self, method: str, data: dict) -> dict:
+    def _send_telegram_request(self, method: str, data: dict, timeout: float = 30) -> dict:
         """Надсилає запит до Telegram API"""
         try:
             url = f"{self.base_url}/{method}"
-            response = requests.post(url, json=data, timeout=30)
+            response = self.transport.post(url, json=data, timeout=timeout)
             return response.json()
         except Exception as e:
             logger.error(f"Помилка запиту до Telegram API: {e}")
@@ -200,6 +184,29 @@ class TelegramClient:
         """
         return self.send_message_sync(title, summary, full_text, url, source)
     
+    def get_updates(self, offset: Optional[int] = None, timeout: int = 25) -> List[dict]:
+        """Довге опитування нових повідомлень боту (getUpdates)"""
+        data = {"timeout": timeout, "allowed_updates": ["message"]}
+        if offset is not None:
+            data["offset"] = offset
+        result = self._send_telegram_request("getUpdates", data, timeout=timeout + 10)
+        if not result.get("ok"):
+            logger.warning(f"getUpdates не вдався: {result.get('description')}")
+            return []
+        return result.get("result", [])
+
+    def send_text(self, chat_id, text: str) -> Optional[int]:
+        """Надсилає звичайний текст (без Markdown) у чат"""
+        result = self._send_telegram_request("sendMessage", {
+            "chat_id": chat_id,
+            "text": text[:4096],
+            "disable_web_page_preview": True
+        })
+        if result.get("ok"):
+            return result["result"]["message_id"]
+        logger.error(f"Помилка відповіді в чат {chat_id}: {result.get('description')}")
+        return None
+
     def test_connection(self) -> bool:
         """Тестує з'єднання з Telegram"""
         try:
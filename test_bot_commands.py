@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Тест бот-команд /search та /latest проти локального фейкового Bot API"""
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from archive import ArticleArchive
+from bot_commands import BotCommands
+from telegram_client import TelegramClient
+
+ARTICLES = [
+    {'title': 'Статус S продовжено до 2026 року', 'summary': 'Федеральна рада продовжила статус захисту S.',
+     'url': 'https://example.ch/status-s', 'source': 'srf', 'original_language': 'de',
+     'original_title': 'Schutzstatus S wird verlängert', 'original_description': 'Der Bundesrat hat entschieden.'},
+    {'title': 'Біженці з України в Женеві', 'summary': 'Кантон відкрив новий центр притулку.',
+     'url': 'https://example.ch/geneve', 'source': 'rts', 'original_language': 'fr',
+     'original_title': 'Réfugiés ukrainiens à Genève', 'original_description': 'Un nouveau centre d\'asile.'},
+]
+
+
+class FakeBotApi(BaseHTTPRequestHandler):
+    """getUpdates віддає заготовлені повідомлення, sendMessage їх запам'ятовує"""
+
+    updates = []
+    sent = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+        method = self.path.rsplit('/', 1)[-1]
+        if method == 'getUpdates':
+            offset = body.get('offset') or 0
+            result = [u for u in self.updates if u['update_id'] >= offset]
+        elif method == 'sendMessage':
+            self.sent.append(body)
+            result = {'message_id': len(self.sent)}
+        else:
+            result = {}
+        payload = json.dumps({'ok': True, 'result': result}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def message(update_id: int, text: str) -> dict:
+    return {'update_id': update_id, 'message': {'chat': {'id': 42}, 'text': text}}
+
+
+def test_bot_commands():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBotApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeBotApi.sent.clear()
+    FakeBotApi.updates[:] = [
+        message(1, '/search статус'),
+        message(2, '/search@UkrNewsBot réfugiés'),
+        message(3, '/latest 1'),
+        message(4, '/search вибори'),
+        message(5, 'просто текст'),
+    ]
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            archive = ArticleArchive(f'{directory}/archive.jsonl', f'{directory}/index.json')
+            for article in ARTICLES:
+                assert archive.add(article)
+            assert not archive.add(ARTICLES[0]), "дублікат URL не має потрапити в архів"
+            archive.save()
+
+            client = TelegramClient('TOKEN', '', seen_file=f'{directory}/seen.json',
+                                    api_url=f'http://127.0.0.1:{server.server_port}')
+            bot = BotCommands(client, archive, offset_file=f'{directory}/offset.json')
+
+            assert bot.poll_once(timeout=0) == 4
+            replies = [sent['text'] for sent in FakeBotApi.sent]
+            assert 'https://example.ch/status-s' in replies[0]
+            assert 'https://example.ch/geneve' in replies[1]
+            assert 'https://example.ch/geneve' in replies[2] and 'status-s' not in replies[2]
+            assert replies[3].startswith('Нічого не знайдено')
+
+            # Наступне опитування починається після останнього оновлення
+            assert bot.offset == 6
+            assert bot.poll_once(timeout=0) == 0
+
+            # Індекс відновлюється з диска і доповнюється новими записами
+            archive.add({**ARTICLES[1], 'url': 'https://example.ch/geneve-2'})
+            reloaded = ArticleArchive(f'{directory}/archive.jsonl', f'{directory}/index.json')
+            assert len(reloaded) == 3
+            assert len(reloaded.search('Женеві')) == 2
+    finally:
+        server.shutdown()
+
+    print("✅ /search, /latest та індекс архіву працюють")
+
+
+if __name__ == "__main__":
+    print("🤖 Тест бот-команд")
+    print("=" * 40)
+    test_bot_commands()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Тест сховищ стану: файл, SQLite, гілка git та S3 проти локального фейкового сервера"""
+
+import datetime
+import hashlib
+import json
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from state_backend import (FileBackend, GitSnapshotBackend, S3Backend, SeenStore,
+                           SqliteBackend, sign_v4)
+
+ACCESS_KEY = 'test-access'
+SECRET_KEY = 'test-secret'
+URLS = [f'https://example.ch/news/{i}' for i in range(2000)]
+
+
+class FakeS3(BaseHTTPRequestHandler):
+    """Зберігає об'єкти в пам'яті й перевіряє підпис SigV4 кожного запиту"""
+
+    objects = {}
+
+    def _authorized(self, payload: bytes) -> bool:
+        amz_date = self.headers['x-amz-date']
+        now = datetime.datetime.strptime(amz_date, '%Y%m%dT%H%M%SZ').replace(
+            tzinfo=datetime.timezone.utc)
+        url = f'http://{self.headers["Host"]}{self.path}'
+        expected = sign_v4(self.command, url, payload, ACCESS_KEY, SECRET_KEY, 'us-east-1', now=now)
+        return self.headers['Authorization'] == expected['Authorization']
+
+    def _reply(self, status: int, body: bytes = b''):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not self._authorized(b''):
+            return self._reply(403)
+        if self.path not in self.objects:
+            return self._reply(404)
+        self._reply(200, self.objects[self.path])
+
+    def do_PUT(self):
+        payload = self.rfile.read(int(self.headers['Content-Length']))
+        if not self._authorized(payload):
+            return self._reply(403)
+        self.objects[self.path] = payload
+        self._reply(200)
+
+    def log_message(self, *args):
+        pass
+
+
+def check_backend(make_backend, label: str):
+    """Записує ключі, відкриває сховище заново й перевіряє відновлення"""
+    backend = make_backend()
+    store = SeenStore(backend, 'parser', max_items=1000)
+    for url in URLS:
+        store.add(url)
+    store.add(URLS[-1])
+    store.flush()
+
+    started = time.perf_counter()
+    restored = SeenStore(make_backend(), 'parser', max_items=1000)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    assert URLS[-1] in restored and URLS[-1000] in restored, label
+    assert URLS[0] not in restored, f"{label}: найстаріші ключі мали бути відкинуті"
+    assert 'https://example.ch/other' not in restored, label
+    assert len(SeenStore(make_backend(), 'telegram_default')) == 0, label
+    print(f"✅ {label}: {len(restored)} ключів відновлено за {elapsed:.1f} мс")
+
+
+def test_state_backends():
+    with tempfile.TemporaryDirectory() as directory:
+        check_backend(lambda: FileBackend(f'{directory}/state'), 'file')
+        check_backend(lambda: SqliteBackend(f'{directory}/state.db'), 'sqlite')
+
+        # Старий seen.json парсера імпортується один раз
+        legacy = f'{directory}/seen.json'
+        with open(legacy, 'w') as f:
+            json.dump([hashlib.sha256(url.encode()).hexdigest() for url in URLS[:10]], f)
+        imported = SeenStore(FileBackend(f'{directory}/legacy'), 'parser', legacy_path=legacy)
+        assert URLS[3] in imported and len(imported) == 10
+
+        # Гілка стану в репозиторії з віддаленим "origin"
+        remote, work = f'{directory}/remote.git', f'{directory}/work'
+        subprocess.run(['git', 'init', '--quiet', '--bare', remote], check=True)
+        subprocess.run(['git', 'init', '--quiet', work], check=True)
+        subprocess.run(['git', '-C', work, 'remote', 'add', 'origin', remote], check=True)
+        check_backend(lambda: GitSnapshotBackend('state', 'origin', work), 'git')
+        branches = subprocess.run(['git', '-C', remote, 'branch'], capture_output=True, text=True).stdout
+        assert 'state' in branches
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeS3)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        endpoint = f'http://127.0.0.1:{server.server_port}'
+        check_backend(lambda: S3Backend(endpoint, 'bucket', ACCESS_KEY, SECRET_KEY), 's3')
+        assert '/bucket/state/parser.seen.z' in FakeS3.objects
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    print("💾 Тест сховищ стану")
+    print("=" * 40)
+    test_state_backends()
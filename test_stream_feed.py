@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Тест потокового розбору стрічок з некоректним XML посередині"""
+
+import calendar
+import time
+
+from stream_feed import iter_entries
+
+
+def make_rss(count: int, broken: int = None) -> bytes:
+    """RSS з count записами від нових до старих; запис broken містить &nbsp;"""
+    now = int(time.time())
+    items = []
+    for i in range(count):
+        pub_date = time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(now - i * 3600))
+        space = '&nbsp;' if i == broken else ' '
+        items.append(
+            f"<item><title>Новина{space}{i}</title>"
+            f"<link>https://example.ch/{i}</link>"
+            f"<pubDate>{pub_date}</pubDate></item>"
+        )
+    return f"<rss version='2.0'><channel><title>t</title>{''.join(items)}</channel></rss>".encode()
+
+
+def test_undefined_entity_in_later_item():
+    entries = list(iter_entries(make_rss(10, broken=3)))
+    assert [entry.get('link') for entry in entries] == [f"https://example.ch/{i}" for i in range(10)]
+    assert entries[3].get('title').endswith('3')
+
+
+def test_cutoff_after_recovery():
+    # Записи 0-4 свіжі, далі старші за cutoff: зупинка після трьох старих поспіль
+    cutoff = calendar.timegm(time.gmtime()) - 4.5 * 3600
+    entries = list(iter_entries(make_rss(10, broken=2), cutoff=cutoff))
+    assert len(entries) == 8
+
+
+if __name__ == "__main__":
+    print("📰 Тест потокового розбору")
+    print("=" * 40)
+    test_undefined_entity_in_later_item()
+    test_cutoff_after_recovery()
+    print("✅ Гаразд")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Тест push-режиму WebSub проти локального хаба: підписка, підтвердження, підписи, дедуплікація"""
+
+import os
+import secrets
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode
+
+import requests
+
+from parser import NewsParser
+from state_backend import FileBackend
+from websub import PushIngestor, discover_hub, sign
+
+
+def item(title: str, slug: str) -> str:
+    return (f"<item><title>{title}</title><link>https://example.ch/{slug}</link>"
+            f"<description>Der Bundesrat hat entschieden.</description>"
+            f"<pubDate>{formatdate(time.time() - 600)}</pubDate></item>")
+
+
+def rss(hub: str, *items: str) -> bytes:
+    head = f'<atom:link rel="hub" href="{hub}/hub"/><atom:link rel="self" href="{hub}/feed.xml"/>' if hub else ''
+    return (f'<?xml version="1.0"?><rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">'
+            f'<channel><title>Test</title>{head}{"".join(items)}</channel></rss>').encode()
+
+
+FIRST = item('Schutzstatus S für Ukrainer verlängert', 'status-s')
+PLAIN = item('Flüchtlinge aus der Ukraine finden Arbeit', 'arbeit')
+PUSHED = item('Kanton eröffnet neues Asylzentrum für Geflüchtete', 'asyl')
+FORGED = item('Gefälschte Meldung über Ukrainer', 'forged')
+
+
+class FakeHub(BaseHTTPRequestHandler):
+    """Віддає стрічки, приймає підписки й підтверджує їх через callback"""
+
+    base = ''
+    subscribers = {}
+    verified = []
+
+    def _reply(self, status: int, body: bytes = b'', headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/feed.xml':
+            self._reply(200, rss(self.base, FIRST), {
+                'Content-Type': 'application/rss+xml',
+                'Link': f'<{self.base}/hub>; rel="hub", <{self.base}/feed.xml>; rel="self"'})
+        elif self.path == '/plain.xml':
+            self._reply(200, rss('', PLAIN), {'Content-Type': 'application/rss+xml'})
+        else:
+            self._reply(404)
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        request = {name: values[0] for name, values in form.items()}
+        self._reply(202)
+        # Підтвердження наміру - окремим запитом після відповіді, як у справжнього хаба
+        threading.Thread(target=self.verify, args=(request,), daemon=True).start()
+
+    @classmethod
+    def verify(cls, request: dict):
+        challenge = secrets.token_hex(8)
+        response = requests.get(request['hub.callback'], params={
+            'hub.mode': request['hub.mode'], 'hub.topic': request['hub.topic'],
+            'hub.challenge': challenge, 'hub.lease_seconds': '600'}, timeout=5)
+        if response.status_code == 200 and response.text == challenge:
+            cls.subscribers[request['hub.topic']] = request
+            cls.verified.append(request['hub.topic'])
+
+    @classmethod
+    def publish(cls, topic: str, body: bytes, secret: str = None) -> int:
+        subscriber = cls.subscribers[topic]
+        response = requests.post(subscriber['hub.callback'], data=body, timeout=5, headers={
+            'Content-Type': 'application/rss+xml',
+            'X-Hub-Signature': sign(secret or subscriber['hub.secret'], body)})
+        return response.status_code
+
+    def log_message(self, *args):
+        pass
+
+
+def wait_for(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_discover_hub():
+    hub, topic = discover_hub(rss('https://hub.example'), {}, 'https://news.example/rss')
+    assert (hub, topic) == ('https://hub.example/hub', 'https://hub.example/feed.xml')
+    hub, topic = discover_hub(b'<feed><link rel="hub" href="/hub"/></feed>', {}, 'https://news.example/rss')
+    assert (hub, topic) == ('https://news.example/hub', 'https://news.example/rss')
+    assert discover_hub(rss(''), {}, 'https://news.example/rss')[0] is None
+
+
+def test_websub_push():
+    hub_server = ThreadingHTTPServer(('127.0.0.1', 0), FakeHub)
+    threading.Thread(target=hub_server.serve_forever, daemon=True).start()
+    base = FakeHub.base = f'http://127.0.0.1:{hub_server.server_port}'
+    FakeHub.subscribers.clear()
+    FakeHub.verified.clear()
+    topic = f'{base}/feed.xml'
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        # Стан парсера (data/...) - у тимчасовому каталозі
+        os.chdir(directory)
+        ingestor = None
+        try:
+            parser = NewsParser(state=FileBackend(f'{directory}/state'))
+            ingestor = PushIngestor(parser, 'http://placeholder', host='127.0.0.1', port=0,
+                                    feeds={'Hub News': topic, 'Plain News': f'{base}/plain.xml'},
+                                    poll_interval=3600, fallback_interval=3600)
+            ingestor.callback_url = f'http://127.0.0.1:{ingestor.port}'
+            ingestor.start()
+            ingestor.subscribe_all()
+            assert wait_for(lambda: FakeHub.verified), "хаб не підтвердив підписку"
+            assert FakeHub.verified == [topic], "підписка лише на стрічку з хабом"
+            assert ingestor.summary()['subscriptions'] == 1
+
+            # Чужий топік або невідомий callback не підтверджуються
+            callback = FakeHub.subscribers[topic]['hub.callback']
+            query = {'hub.mode': 'subscribe', 'hub.challenge': 'x', 'hub.topic': f'{base}/other.xml'}
+            assert requests.get(f'{callback}?{urlencode(query)}', timeout=5).status_code == 404
+            query['hub.topic'] = topic
+            assert requests.get(f'{ingestor.callback_url}/websub/unknown?{urlencode(query)}',
+                                timeout=5).status_code == 404
+
+            collected = []
+            consumer = threading.Thread(target=lambda: collected.extend(ingestor.iter_articles()),
+                                        daemon=True)
+            consumer.start()
+            # Повторне повідомлення і записи, вже отримані опитуванням, не дублюються
+            assert FakeHub.publish(topic, rss(base, PUSHED, FIRST)) == 202
+            assert FakeHub.publish(topic, rss(base, PUSHED, FIRST)) == 202
+            # Підроблений підпис: хаб отримує 2xx, але вміст відкидається
+            assert FakeHub.publish(topic, rss(base, FORGED), secret='wrong') == 202
+            assert wait_for(lambda: ingestor.received == 3 and ingestor.pushes.empty())
+            ingestor.stop()
+            consumer.join(timeout=10)
+            assert not consumer.is_alive()
+
+            titles = sorted(article.title for article in collected)
+            assert titles == ['Flüchtlinge aus der Ukraine finden Arbeit',
+                              'Kanton eröffnet neues Asylzentrum für Geflüchtete',
+                              'Schutzstatus S für Ukrainer verlängert'], titles
+            summary = ingestor.summary()
+            assert summary['rejected'] == 1
+            assert summary['pushed_articles'] == 1 and summary['polled_articles'] == 2
+            print(f"✅ WebSub: {summary}")
+
+            # Підписка з секретом переживає перезапуск
+            ingestor.save()
+            restored = PushIngestor(parser, ingestor.callback_url, host='127.0.0.1', port=0)
+            assert restored.subscriptions[topic]['secret'] == FakeHub.subscribers[topic]['hub.secret']
+            restored.stop()
+        finally:
+            if ingestor is not None:
+                ingestor.stop()
+            os.chdir(cwd)
+            hub_server.shutdown()
+
+
+if __name__ == "__main__":
+    print("📬 Тест WebSub")
+    print("=" * 40)
+    test_discover_hub()
+    test_websub_push()
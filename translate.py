@@ -2,22 +2,48 @@
 
 import openai
 import logging
-from typing import Optional
+from typing import Iterator, List, Optional
+
+from llm_budget import BudgetExceeded, TokenBudget, chat_completion
+from translation_memory import TranslationMemory, join_sentences, parse_segments, split_sentences
 
 logger = logging.getLogger(__name__)
 
+# Пакетний переклад речень: речень і символів оригіналу в одному
+# запиті (переклад має вміститися у max_tokens відповіді)
+BATCH_SEGMENTS = 40
+BATCH_CHARS = 3000
+
+
+def _batches(sentences: List[str]) -> Iterator[List[str]]:
+    """Ділить речення на пакети в межах BATCH_SEGMENTS і BATCH_CHARS"""
+    batch, size = [], 0
+    for sentence in sentences:
+        if batch and (len(batch) == BATCH_SEGMENTS or size + len(sentence) > BATCH_CHARS):
+            yield batch
+            batch, size = [], 0
+        batch.append(sentence)
+        size += len(sentence)
+    if batch:
+        yield batch
+
 
 class Translator:
     """Клас для перекладу текстів через OpenAI API"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, budget: Optional[TokenBudget] = None,
+                 memory: Optional[TranslationMemory] = None):
         """
         Ініціалізація перекладача
         
         Args:
             api_key: OpenAI API ключ
+            budget: Бюджет токенів (None - без обліку)
+            memory: Пам'ять перекладів речень (None - перекладати текст цілком)
         """
         self.client = openai.OpenAI(api_key=api_key)
+        self.budget = budget
+        self.memory = memory
     
     def classify_ukraine_related(self, text: str) -> str:
         """
@@ -46,13 +72,9 @@ Respond with only: "Ukraine-in-CH", "Status-S", or "Other"
 Classification:""".format(text=text)
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=10,
-                temperature=0.1
+            response = chat_completion(
+                self.client, self.budget, prompt,
+                max_tokens=10, temperature=0.1
             )
             
             result = response.choices[0].message.content.strip()
@@ -64,6 +86,8 @@ Classification:""".format(text=text)
             else:
                 return "Other"
             
+        except BudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"Помилка GPT класифікації: {e}")
             return "Other"
@@ -72,6 +96,10 @@ Classification:""".format(text=text)
         """
         Перекладає текст українською мовою
         
+        З пам'яттю перекладів у LLM йдуть лише речення, яких ще немає
+        в пам'яті (пакетами в межах BATCH_SEGMENTS/BATCH_CHARS); текст
+        збирається з перекладів у початковому порядку.
+        
         Args:
             text: Текст для перекладу
             source_language: Мова оригіналу (auto для автовизначення)
@@ -81,20 +109,85 @@ Classification:""".format(text=text)
         """
         if not text.strip():
             return None
-        
-        # Формуємо промпт залежно від мови
+        if self.memory is None:
+            return self._translate_text(text, source_language)
+
+        sentences, separators = split_sentences(text)
+        translations = [self.memory.lookup(sentence, source_language) for sentence in sentences]
+        missing = [i for i, translation in enumerate(translations) if translation is None]
+
+        if not missing:
+            logger.info(f"Переклад з пам'яті ({len(sentences)} речень)")
+
+        position = 0
+        for batch in _batches([sentences[i] for i in missing]):
+            segments = self._translate_batch(batch, source_language)
+            if segments is None:
+                return None
+            for sentence, translation in zip(batch, segments):
+                translations[missing[position]] = translation
+                self.memory.remember(sentence, source_language, translation)
+                position += 1
+        return join_sentences(translations, separators)
+
+    def translate_many(self, texts: List[str], source_language: str) -> List[Optional[str]]:
+        """
+        Перекладає багато коротких текстів однієї мови (заголовки, описи)
+        спільними пакетами речень
+
+        Однакові речення різних текстів перекладаються один раз, відомі
+        беруться з пам'яті перекладів. Текст, речення якого не вдалося
+        перекласти пакетом, перекладається окремо.
+
+        Returns:
+            Переклади в порядку текстів (None для порожніх і неперекладених)
+        """
+        split = [split_sentences(text) if text and text.strip() else ([], []) for text in texts]
+        known = {}
+        pending = []
+        for sentences, _ in split:
+            for sentence in sentences:
+                if sentence in known:
+                    continue
+                translation = self.memory.lookup(sentence, source_language) if self.memory else None
+                known[sentence] = translation
+                if translation is None:
+                    pending.append(sentence)
+
+        for batch in _batches(pending):
+            segments = self._translate_segments(batch, source_language, same_text=False)
+            for original, translation in zip(batch, segments or ()):
+                known[original] = translation
+                if self.memory is not None:
+                    self.memory.remember(original, source_language, translation)
+
+        results = []
+        for text, (sentences, separators) in zip(texts, split):
+            if not sentences:
+                results.append(None)
+            elif all(known[sentence] is not None for sentence in sentences):
+                results.append(join_sentences([known[sentence] for sentence in sentences], separators))
+            else:
+                results.append(self.translate_to_ukrainian(text, source_language))
+        return results
+
+    @staticmethod
+    def _lang_instruction(source_language: str) -> str:
         if source_language == "de":
-            lang_instruction = "з німецької на українську"
+            return "з німецької на українську"
         elif source_language == "fr":
-            lang_instruction = "з французької на українську"
+            return "з французької на українську"
         elif source_language == "it":
-            lang_instruction = "з італійської на українську"
+            return "з італійської на українську"
         elif source_language == "en":
-            lang_instruction = "з англійської на українську"
-        else:
-            lang_instruction = "українською мовою"
-        
-        prompt = f"""Переклади текст {lang_instruction}, зберігаючи офіційний новинний стиль.
+            return "з англійської на українську"
+        elif source_language == "rm":
+            return "з ретороманської на українську"
+        return "українською мовою"
+
+    def _translate_text(self, text: str, source_language: str) -> Optional[str]:
+        """Перекладає текст одним запитом"""
+        prompt = f"""Переклади текст {self._lang_instruction(source_language)}, зберігаючи офіційний новинний стиль.
 
 Вимоги:
 - Дотримуйся точності фактів
@@ -110,13 +203,9 @@ Classification:""".format(text=text)
 Переклад українською:"""
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3
+            response = chat_completion(
+                self.client, self.budget, prompt,
+                max_tokens=2000, temperature=0.3
             )
             
             translation = response.choices[0].message.content.strip()
@@ -128,10 +217,78 @@ Classification:""".format(text=text)
                 logger.error("GPT повернув порожній переклад")
                 return None
                 
+        except BudgetExceeded:
+            raise
         except Exception as e:
             logger.error(f"Помилка перекладу: {e}")
             return None
 
+    def _translate_batch(self, sentences: List[str], source_language: str) -> Optional[List[str]]:
+        """
+        Перекладає пакет речень одного тексту. Якщо відповідь не відповідає
+        формату (зокрема обрізана), пакет перекладається половинами, а одне
+        речення - звичайним запитом; решта пакетів не перекладається повторно.
+        """
+        if len(sentences) == 1:
+            translation = self._translate_text(sentences[0], source_language)
+            return None if translation is None else [translation]
+        segments = self._translate_segments(sentences, source_language)
+        if segments is not None:
+            return segments
+        middle = len(sentences) // 2
+        first = self._translate_batch(sentences[:middle], source_language)
+        if first is None:
+            return None
+        second = self._translate_batch(sentences[middle:], source_language)
+        return None if second is None else first + second
+
+    def _translate_segments(self, sentences: List[str], source_language: str,
+                            same_text: bool = True) -> Optional[List[str]]:
+        """
+        Перекладає пронумеровані речення одним запитом
+
+        Args:
+            same_text: Речення з одного тексту (False - незалежні речення різних текстів)
+
+        Returns:
+            Переклади в порядку речень або None (помилка чи порушений формат)
+        """
+        numbered = '\n'.join(f"[{number}] {sentence}" for number, sentence in enumerate(sentences, 1))
+        context = ("Речення йдуть підряд з одного тексту, враховуй контекст" if same_text
+                   else "Речення з різних текстів, перекладай кожне окремо")
+        prompt = f"""Переклади пронумеровані речення {self._lang_instruction(source_language)}, зберігаючи офіційний новинний стиль.
+
+Вимоги:
+- Дотримуйся точності фактів
+- Використовуй нейтральний тон
+- {context}
+- Кожен переклад з нового рядка з тим самим номером: [n] переклад
+
+Речення:
+---
+{numbered}
+---
+
+Переклад українською:"""
+
+        try:
+            response = chat_completion(
+                self.client, self.budget, prompt,
+                max_tokens=2000, temperature=0.3
+            )
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Помилка перекладу: {e}")
+            return None
+
+        segments = parse_segments(response.choices[0].message.content or '', len(sentences))
+        if segments is None:
+            logger.warning(f"Переклад {len(sentences)} речень не відповідає формату")
+        else:
+            logger.info(f"Переклад виконано ({len(sentences)} нових речень)")
+        return segments
+
 
 def main():
     """Тестування перекладача"""
@@ -0,0 +1,249 @@
+"""Пам'ять перекладів: повторне використання вже перекладених речень"""
+
+import json
+import logging
+import pathlib
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+
+from llm_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Коротші речення ("Mehr dazu.") не зберігаються: без контексту переклад ненадійний
+MIN_SEGMENT_CHARS = 30
+
+# Скільки речень на мову зберігається (найдавніше використані відкидаються)
+MAX_ENTRIES = 20000
+
+# Нечіткий збіг: схожість послідовності слів і кожного заміненого слова
+FUZZY_RATIO = 0.9
+WORD_RATIO = 0.8
+
+# Слова, за якими шукаються кандидати для нечіткого збігу
+INDEX_WORD_LENGTH = 6
+INDEX_WORDS = 4
+
+# Кінець речення: .!?… (можливо з лапками чи дужкою) і пробіли; або перенесення рядка
+SENTENCE_END = re.compile(r'[.!?…]["»“”\')]*(\s+)|(\n+)')
+QUOTES = str.maketrans({'«': '"', '»': '"', '„': '"', '“': '"', '”': '"', '’': "'", '‘': "'"})
+SEGMENT_LINE = re.compile(r'^\s*\[(\d+)\]\s*(.*)$')
+
+
+def split_sentences(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Ділить текст на речення
+
+    Returns:
+        (речення, роздільники) - роздільник i стоїть після речення i
+        (пробіл або перенесення рядків), join_sentences збирає текст назад
+    """
+    sentences, separators = [], []
+    position = 0
+    for match in SENTENCE_END.finditer(text):
+        group = 1 if match.group(1) is not None else 2
+        following = text[match.end():match.end() + 1]
+        # "z.B. die", "Nr. 5" - не кінець речення
+        if group == 1 and '\n' not in match.group(1) and (following.islower() or following.isdigit()):
+            continue
+        sentence = text[position:match.start(group)].strip()
+        newlines = min(match.group(group).count('\n'), 2)
+        if sentence:
+            sentences.append(sentence)
+            separators.append('\n' * newlines or ' ')
+        elif separators and newlines:
+            separators[-1] = '\n' * max(newlines, separators[-1].count('\n'))
+        position = match.end()
+    tail = text[position:].strip()
+    if tail:
+        sentences.append(tail)
+        separators.append('')
+    elif separators:
+        separators[-1] = ''
+    return sentences, separators
+
+
+def join_sentences(sentences: List[str], separators: List[str]) -> str:
+    return ''.join(sentence + separator for sentence, separator in zip(sentences, separators))
+
+
+def normalize(sentence: str) -> str:
+    """Ключ точного збігу: регістр, лапки та пробіли не враховуються"""
+    return ' '.join(sentence.translate(QUOTES).lower().split())
+
+
+def _words(normalized: str) -> List[str]:
+    return re.findall(r'\w+', normalized)
+
+
+def is_near_duplicate(words: List[str], other: List[str]) -> bool:
+    """
+    Майже те саме речення: відрізняються лише окремі слова, і кожне з них
+    схоже на відповідне (друкарська помилка, відмінок). Додані чи вилучені
+    слова та будь-які зміни чисел збіг відхиляють - інакше переклад
+    сусіднього речення підмінив би факти.
+    """
+    matcher = SequenceMatcher(None, words, other, autojunk=False)
+    if matcher.ratio() < FUZZY_RATIO:
+        return False
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        if tag != 'replace' or i2 - i1 != j2 - j1:
+            return False
+        for word, other_word in zip(words[i1:i2], other[j1:j2]):
+            if any(ch.isdigit() for ch in word + other_word):
+                return False
+            if SequenceMatcher(None, word, other_word).ratio() < WORD_RATIO:
+                return False
+    return True
+
+
+class TranslationMemory:
+    """
+    Речення оригіналу → переклад, окремо для кожної мови оригіналу.
+    Точний збіг - за нормалізованим реченням, нечіткий - за індексом
+    довгих слів з перевіркою is_near_duplicate.
+    """
+
+    def __init__(self, path: str = 'data/translation_memory.json',
+                 max_entries: int = MAX_ENTRIES):
+        self.path = pathlib.Path(path)
+        self.max_entries = max_entries
+        self.today = datetime.now(pytz.UTC).date().isoformat()
+        # мова → {нормалізоване речення: [переклад, дата використання]}
+        self.entries: Dict[str, Dict[str, list]] = {}
+        # мова → {довге слово: {нормалізовані речення}}
+        self.index: Dict[str, Dict[str, set]] = {}
+        self._lock = threading.Lock()
+
+        self.segments = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.tokens_saved = 0
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return
+        for language, items in data.items():
+            for key, translation, used in items:
+                self._insert(language, key, translation, used)
+
+    def save(self):
+        """Зберігає пам'ять (не більше max_entries найсвіжіших речень на мову)"""
+        with self._lock:
+            data = {
+                language: sorted(([key, translation, used] for key, (translation, used) in entries.items()),
+                                 key=lambda item: item[2])[-self.max_entries:]
+                for language, entries in self.entries.items()
+            }
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+        tmp.replace(self.path)
+
+    def _insert(self, language: str, key: str, translation: str, used: str):
+        self.entries.setdefault(language, {})[key] = [translation, used]
+        postings = self.index.setdefault(language, {})
+        for word in _index_words(_words(key)):
+            postings.setdefault(word, set()).add(key)
+
+    def _fuzzy(self, language: str, key: str) -> Optional[str]:
+        postings = self.index.get(language)
+        if not postings:
+            return None
+        words = _words(key)
+        index_words = _index_words(words)
+        candidates = Counter()
+        for word in index_words:
+            candidates.update(postings.get(word, ()))
+        # Кандидат має містити більшість довгих слів речення
+        needed = max(1, len(index_words) - 1)
+        for candidate, shared in candidates.most_common(5):
+            if shared < needed:
+                break
+            if abs(len(candidate) - len(key)) > len(key) // 10 + 2:
+                continue
+            if is_near_duplicate(words, _words(candidate)):
+                return candidate
+        return None
+
+    def lookup(self, sentence: str, language: str) -> Optional[str]:
+        """Переклад речення з пам'яті (None - немає збігу)"""
+        key = normalize(sentence)
+        with self._lock:
+            self.segments += 1
+            if len(key) < MIN_SEGMENT_CHARS:
+                return None
+            entry = self.entries.get(language, {}).get(key)
+            if entry is not None:
+                self.exact_hits += 1
+            else:
+                match = self._fuzzy(language, key)
+                if match is None:
+                    return None
+                entry = self.entries[language][match]
+                self.fuzzy_hits += 1
+            entry[1] = self.today
+            # Заощаджено: речення в промпті та його переклад у відповіді
+            self.tokens_saved += estimate_tokens(sentence) + estimate_tokens(entry[0])
+            return entry[0]
+
+    def remember(self, sentence: str, language: str, translation: str):
+        key = normalize(sentence)
+        if len(key) < MIN_SEGMENT_CHARS or not translation.strip():
+            return
+        with self._lock:
+            self._insert(language, key, translation.strip(), self.today)
+
+    def summary(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.fuzzy_hits
+            return {
+                'segments': self.segments,
+                'exact': self.exact_hits,
+                'fuzzy': self.fuzzy_hits,
+                'hit_rate': hits / self.segments if self.segments else 0.0,
+                'tokens_saved': self.tokens_saved,
+                'entries': sum(len(entries) for entries in self.entries.values())
+            }
+
+
+def _index_words(words: List[str]) -> List[str]:
+    """Найдовші (найрідкісніші) слова речення для пошуку кандидатів"""
+    long_words = sorted({word for word in words if len(word) >= INDEX_WORD_LENGTH},
+                        key=lambda word: (-len(word), word))
+    return long_words[:INDEX_WORDS]
+
+
+def parse_segments(response: str, expected: int) -> Optional[List[str]]:
+    """
+    Розбирає відповідь у форматі '[n] переклад' по рядку на сегмент
+
+    Returns:
+        Переклади в порядку номерів або None, якщо формат порушено
+    """
+    translations = {}
+    current = None
+    for line in response.splitlines():
+        match = SEGMENT_LINE.match(line)
+        if match:
+            current = int(match.group(1))
+            translations[current] = match.group(2).strip()
+        elif current is not None and line.strip():
+            translations[current] += ' ' + line.strip()
+    if sorted(translations) != list(range(1, expected + 1)) or not all(translations.values()):
+        return None
+    return [translations[number] for number in range(1, expected + 1)]
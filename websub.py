@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Push-режим (WebSub): підписка на хаби стрічок і локальний callback сервер
+
+Стрічки, що оголошують хаб (Link заголовок або <atom:link rel="hub">),
+надсилають нові записи самі - статті потрапляють у той самий шлях
+дедуплікації й обробки, що й при опитуванні. Стрічки без хаба
+опитуються як звичайно, а стрічки з хабом - зрідка, на випадок
+пропущених повідомлень.
+
+    WEBSUB_CALLBACK_URL=https://news.example.ch python websub.py
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import pathlib
+import queue
+import re
+import secrets
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import requests
+
+from http_client import HttpTransport, shared_transport
+from parser import KEYWORDS, LIST_RSS, Article, NewsParser
+
+logger = logging.getLogger(__name__)
+
+# Оренда підписки, яку просимо в хаба (хаб може дати іншу)
+LEASE_SECONDS = 10 * 86400
+
+# Підписка поновлюється заздалегідь, за стільки до кінця оренди
+RENEW_MARGIN = 3600
+# Як часто перевіряти строки оренди (і повторювати невдалі поновлення)
+RENEW_CHECK_INTERVAL = 300
+
+# Опитування стрічок без хаба та резервне опитування стрічок з хабом
+POLL_INTERVAL = 15 * 60
+FALLBACK_POLL_INTERVAL = 4 * 3600
+
+# Тіло push-повідомлення більше за це відкидається (байти)
+MAX_PUSH_BYTES = 5 * 1024 * 1024
+
+SIGNATURE_METHODS = {'sha1': hashlib.sha1, 'sha256': hashlib.sha256, 'sha512': hashlib.sha512}
+
+# Хаб шукається лише на початку стрічки - до першого запису
+DISCOVERY_BYTES = 64 * 1024
+_LINK_TAG = re.compile(rb'<(?:atom:)?link\b[^>]*>', re.IGNORECASE)
+_ATTRIBUTE = re.compile(rb'''\b(rel|href)\s*=\s*["']([^"']*)["']''', re.IGNORECASE)
+
+
+def discover_hub(content: bytes, links: Optional[dict] = None,
+                 feed_url: str = '') -> Tuple[Optional[str], str]:
+    """
+    Хаб і топік стрічки
+
+    Args:
+        content: Тіло стрічки
+        links: Розібраний Link заголовок ({rel: {'url': ...}}, як response.links)
+        feed_url: URL, з якого завантажено стрічку (топік за замовчуванням)
+
+    Returns:
+        (URL хаба або None, URL топіка)
+    """
+    links = links or {}
+    hub = links.get('hub', {}).get('url')
+    topic = links.get('self', {}).get('url')
+    for tag in _LINK_TAG.findall(content[:DISCOVERY_BYTES]):
+        attributes = {name.lower(): value for name, value in _ATTRIBUTE.findall(tag)}
+        rel = attributes.get(b'rel', b'').lower().split()
+        href = attributes.get(b'href', b'').decode('utf-8', 'replace').strip()
+        if not href:
+            continue
+        if b'hub' in rel and not hub:
+            hub = urljoin(feed_url, href)
+        elif b'self' in rel and not topic:
+            topic = urljoin(feed_url, href)
+    return hub, topic or feed_url
+
+
+def sign(secret: str, body: bytes, method: str = 'sha256') -> str:
+    """Значення X-Hub-Signature для тіла повідомлення"""
+    digest = hmac.new(secret.encode('utf-8'), body, SIGNATURE_METHODS[method]).hexdigest()
+    return f'{method}={digest}'
+
+
+def verify_signature(secret: str, body: bytes, header: Optional[str]) -> bool:
+    """Перевіряє X-Hub-Signature (sha1/sha256/sha512) за спільним секретом"""
+    if not header or '=' not in header:
+        return False
+    method, _, digest = header.partition('=')
+    if method.lower() not in SIGNATURE_METHODS:
+        return False
+    return hmac.compare_digest(sign(secret, body, method.lower()), f'{method.lower()}={digest.lower()}')
+
+
+class PushIngestor:
+    """
+    Підписки на хаби, callback сервер і єдине джерело статей для конвеєра:
+    push-повідомлення та опитування стрічок без хаба
+
+    Обробники HTTP лише кладуть перевірені повідомлення в чергу - розбір і
+    дедуплікація відбуваються в потоці конвеєра, як і при опитуванні.
+    """
+
+    def __init__(self, parser: NewsParser, callback_url: str,
+                 feeds: Optional[Dict[str, str]] = None,
+                 host: str = '0.0.0.0', port: int = 8080,
+                 transport: Optional[HttpTransport] = None,
+                 lease_seconds: int = LEASE_SECONDS,
+                 poll_interval: float = POLL_INTERVAL,
+                 fallback_interval: float = FALLBACK_POLL_INTERVAL,
+                 state_path: str = 'data/websub.json'):
+        self.parser = parser
+        self.callback_url = callback_url.rstrip('/')
+        self.feeds = feeds or LIST_RSS
+        self.transport = transport or shared_transport()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.fallback_interval = fallback_interval
+        self.path = pathlib.Path(state_path)
+        # топік → {source, feed, hub, id, secret, state, expires}
+        self.subscriptions = self._load()
+        self.pushes: 'queue.Queue[Tuple[str, bytes, Optional[str]]]' = queue.Queue()
+        self.received = 0
+        self.rejected = 0
+        self.pushed_articles = 0
+        self.polled_articles = 0
+        self._last_poll: Dict[str, float] = {}
+        self._last_renew = time.monotonic()
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, parser: NewsParser, **kwargs) -> Optional['PushIngestor']:
+        """Push-режим з WEBSUB_* змінних; None, якщо не задано WEBSUB_CALLBACK_URL"""
+        callback_url = os.getenv('WEBSUB_CALLBACK_URL', '').strip()
+        if not callback_url:
+            return None
+        return cls(parser, callback_url,
+                   host=os.getenv('WEBSUB_HOST', '0.0.0.0'),
+                   port=int(os.getenv('WEBSUB_PORT', '8080')),
+                   lease_seconds=int(os.getenv('WEBSUB_LEASE_SECONDS', str(LEASE_SECONDS))),
+                   poll_interval=float(os.getenv('POLL_INTERVAL_SECONDS', str(POLL_INTERVAL))),
+                   fallback_interval=float(os.getenv('POLL_FALLBACK_SECONDS',
+                                                     str(FALLBACK_POLL_INTERVAL))),
+                   **kwargs)
+
+    def _load(self) -> dict:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Не вдалося завантажити {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Зберігає підписки (секрети потрібні для перевірки після перезапуску)"""
+        with self._lock:
+            data = json.dumps(self.subscriptions, indent=1)
+        self.path.parent.mkdir(exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        tmp.write_text(data, encoding='utf-8')
+        tmp.replace(self.path)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_port
+
+    def start(self):
+        """Запускає callback сервер у фоновому потоці"""
+        self._thread = threading.Thread(target=self.server.serve_forever,
+                                        name='websub-callback', daemon=True)
+        self._thread.start()
+        logger.info(f"📬 WebSub callback слухає порт {self.port} ({self.callback_url})")
+
+    def stop(self):
+        """Зупиняє джерело статей і callback сервер"""
+        self._stopped.set()
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread = None
+        self.server.server_close()
+
+    # --- Підписки ---
+
+    def _subscription(self, subscription_id: str) -> Optional[Tuple[str, dict]]:
+        with self._lock:
+            for topic, subscription in self.subscriptions.items():
+                if subscription['id'] == subscription_id:
+                    return topic, subscription
+        return None
+
+    def _active(self, source_name: str) -> bool:
+        """Чи приходять записи стрічки через push (активна й неприпинена оренда)"""
+        now = time.time()
+        with self._lock:
+            return any(s['source'] == source_name and s['state'] == 'active' and s['expires'] > now
+                       for s in self.subscriptions.values())
+
+    def subscribe(self, source_name: str, feed_url: str) -> bool:
+        """
+        Знаходить хаб стрічки і надсилає запит на підписку
+
+        Хаб підтверджує підписку окремим GET на callback (див. _verify),
+        тому тут підписка лише стає 'pending'.
+        """
+        try:
+            response = self.transport.get(feed_url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"WebSub: не вдалося завантажити {source_name}: {e}")
+            return False
+
+        hub, topic = discover_hub(response.content, response.links, response.url or feed_url)
+        if not hub:
+            logger.info(f"WebSub: {source_name} не оголошує хаб - лише опитування")
+            return False
+
+        with self._lock:
+            previous = self.subscriptions.get(topic, {})
+            subscription = {
+                'source': source_name, 'feed': feed_url, 'hub': hub,
+                # Той самий callback між поновленнями, новий секрет - при новій підписці
+                'id': previous.get('id') or secrets.token_urlsafe(12),
+                'secret': previous.get('secret') or secrets.token_hex(32),
+                'state': 'active' if previous.get('state') == 'active' else 'pending',
+                'expires': previous.get('expires', 0),
+            }
+            self.subscriptions[topic] = subscription
+
+        try:
+            response = self.transport.post(hub, timeout=15, data={
+                'hub.mode': 'subscribe',
+                'hub.topic': topic,
+                'hub.callback': f"{self.callback_url}/websub/{subscription['id']}",
+                'hub.secret': subscription['secret'],
+                'hub.lease_seconds': str(self.lease_seconds),
+            })
+        except requests.RequestException as e:
+            logger.warning(f"WebSub: хаб {hub} недоступний для {source_name}: {e}")
+            return False
+        if response.status_code not in (202, 204):
+            logger.warning(f"WebSub: хаб {hub} відхилив підписку {source_name}: "
+                           f"HTTP {response.status_code} {response.text[:200]}")
+            return False
+        logger.info(f"📨 WebSub: запит підписки {source_name} → {hub}")
+        return True
+
+    def subscribe_all(self):
+        """Підписується на всі стрічки з хабом (чинні підписки лише поновлює вчасно)"""
+        for source_name, feed_url in self.feeds.items():
+            if not self._active(source_name) or self._expiring(source_name):
+                self.subscribe(source_name, feed_url)
+        self.save()
+
+    def _expiring(self, source_name: str) -> bool:
+        deadline = time.time() + RENEW_MARGIN
+        with self._lock:
+            return any(s['source'] == source_name and s['state'] == 'active' and s['expires'] < deadline
+                       for s in self.subscriptions.values())
+
+    def renew(self):
+        """Поновлює підписки, оренда яких скоро закінчиться"""
+        for source_name, feed_url in self.feeds.items():
+            if self._expiring(source_name):
+                self.subscribe(source_name, feed_url)
+
+    # --- Callback сервер ---
+
+    def _verify(self, subscription_id: str, params: dict) -> Optional[str]:
+        """Підтвердження (або відмова) хаба: challenge, якщо підписку просили ми"""
+        found = self._subscription(subscription_id)
+        topic = params.get('hub.topic', [''])[0]
+        mode = params.get('hub.mode', [''])[0]
+        if found is None or found[0] != topic:
+            return None
+        _, subscription = found
+        if mode == 'denied':
+            logger.warning(f"WebSub: хаб відмовив у підписці {subscription['source']}: "
+                           f"{params.get('hub.reason', [''])[0]}")
+            with self._lock:
+                subscription['state'] = 'denied'
+            return ''
+        if mode != 'subscribe':
+            # Відписок ми не надсилаємо - чужий запит не підтверджуємо
+            return None
+        lease = int(params.get('hub.lease_seconds', [self.lease_seconds])[0])
+        with self._lock:
+            subscription['state'] = 'active'
+            subscription['expires'] = time.time() + lease
+        logger.info(f"✅ WebSub: підписку {subscription['source']} підтверджено на {lease // 3600} год")
+        return params.get('hub.challenge', [''])[0]
+
+    def _receive(self, subscription_id: str, body: bytes, signature: Optional[str],
+                 content_type: Optional[str]):
+        """Кладе в чергу повідомлення з правильним підписом, решту відкидає"""
+        found = self._subscription(subscription_id)
+        if found is None:
+            return
+        _, subscription = found
+        with self._lock:
+            self.received += 1
+        if not verify_signature(subscription['secret'], body, signature):
+            with self._lock:
+                self.rejected += 1
+            logger.warning(f"⚠️ WebSub: невірний підпис повідомлення {subscription['source']} - відкинуто")
+            return
+        self.pushes.put((subscription['source'], body, content_type))
+
+    def _handler(self):
+        ingestor = self
+
+        class CallbackHandler(BaseHTTPRequestHandler):
+            def _subscription_id(self) -> Optional[str]:
+                path = urlparse(self.path).path
+                prefix = '/websub/'
+                return path[len(prefix):] if path.startswith(prefix) else None
+
+            def _reply(self, status: int, body: bytes = b''):
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                subscription_id = self._subscription_id()
+                challenge = None
+                if subscription_id:
+                    challenge = ingestor._verify(subscription_id, parse_qs(urlparse(self.path).query))
+                if challenge is None:
+                    self._reply(404)
+                else:
+                    self._reply(200, challenge.encode('utf-8'))
+
+            def do_POST(self):
+                subscription_id = self._subscription_id()
+                if not subscription_id or ingestor._subscription(subscription_id) is None:
+                    self._reply(404)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                if length > MAX_PUSH_BYTES:
+                    self._reply(413)
+                    return
+                body = self.rfile.read(length)
+                # Хаб отримує 2xx і для невірного підпису (вимога WebSub),
+                # щоб підробник не міг перевіряти свої спроби
+                self._reply(202)
+                ingestor._receive(subscription_id, body, self.headers.get('X-Hub-Signature'),
+                                  self.headers.get('Content-Type'))
+
+            def log_message(self, format, *args):
+                logger.debug("WebSub callback: " + format, *args)
+
+        return CallbackHandler
+
+    # --- Джерело статей ---
+
+    def _due_feeds(self) -> Dict[str, str]:
+        """Стрічки, яким час на опитування (з push - рідше, як резерв)"""
+        now = time.monotonic()
+        due = {}
+        for source_name, feed_url in self.feeds.items():
+            interval = self.fallback_interval if self._active(source_name) else self.poll_interval
+            last = self._last_poll.get(source_name)
+            if last is None or now - last >= interval:
+                due[source_name] = feed_url
+        return due
+
+    def _poll(self, feeds: Dict[str, str]) -> Iterator[Article]:
+        for source_name, feed_url in feeds.items():
+            self._last_poll[source_name] = time.monotonic()
+            for article in self.parser.iter_rss_feed(feed_url, source_name):
+                self.polled_articles += 1
+                yield article
+
+    def iter_articles(self, checkpoint: Optional[Callable[[], None]] = None,
+                      checkpoint_interval: float = 15 * 60) -> Iterator[Article]:
+        """
+        Нескінченне джерело статей для конвеєра, доки не викликано stop()
+
+        Args:
+            checkpoint: Збереження стану (парсер, архів...) раз на checkpoint_interval
+            checkpoint_interval: Інтервал збереження, секунди
+        """
+        last_checkpoint = time.monotonic()
+        while not self._stopped.is_set():
+            # Опитування спершу: при старті воно наздоганяє пропущене, поки
+            # хаби підтверджують підписки
+            yield from self._poll(self._due_feeds())
+            if time.monotonic() - self._last_renew >= RENEW_CHECK_INTERVAL:
+                self._last_renew = time.monotonic()
+                self.renew()
+
+            try:
+                source_name, body, content_type = self.pushes.get(timeout=1)
+            except queue.Empty:
+                pass
+            else:
+                for article in self.parser.iter_pushed_feed(body, source_name, content_type):
+                    self.pushed_articles += 1
+                    yield article
+
+            if time.monotonic() - last_checkpoint >= checkpoint_interval:
+                last_checkpoint = time.monotonic()
+                self.save()
+                self.parser.save_state()
+                if checkpoint:
+                    checkpoint()
+
+    def summary(self) -> dict:
+        now = time.time()
+        with self._lock:
+            active = sum(1 for s in self.subscriptions.values()
+                         if s['state'] == 'active' and s['expires'] > now)
+            return {
+                'subscriptions': active,
+                'received': self.received,
+                'rejected': self.rejected,
+                'pushed_articles': self.pushed_articles,
+                'polled_articles': self.polled_articles,
+            }
+
+
+def main():
+    """Довготривалий push-режим: той самий конвеєр, що й у main_mvp.py"""
+    import main_mvp
+    from analytics import ArticleHistory
+    from archive import ArticleArchive
+    from fetch_policy import FetchPolicy
+    from llm_budget import TokenBudget
+    from subscriptions import SubscriptionRegistry
+
+    main_mvp.setup_logging()
+    config = main_mvp.load_environment_variables()
+    subscriptions = SubscriptionRegistry.load(
+        KEYWORDS, channel=config['telegram_channel'],
+        translate=main_mvp.USE_TRANSLATION, summarize=main_mvp.USE_SUMMARIZATION
+    )
+    parser = NewsParser(subscriptions=subscriptions)
+    ingestor = PushIngestor.from_env(parser)
+    if ingestor is None:
+        raise ValueError("Відсутня змінна середовища WEBSUB_CALLBACK_URL")
+
+    budget = TokenBudget.from_env()
+    translator, summarizer, telegram_clients = main_mvp.create_clients(config, subscriptions, budget)
+    if not next(iter(telegram_clients.values())).test_connection():
+        raise Exception("Не вдалося підключитися до Telegram")
+
+    policy = FetchPolicy(parser.host_health, budget)
+    archive = ArticleArchive()
+    history = ArticleHistory()
+
+    def checkpoint(final: bool = False):
+        budget.save()
+        translator.memory.save()
+        archive.save()
+        # Статті, які воркери ще публікують, чекають на свій resolve
+        history.save(keep_pending=not final)
+        # Наступний фрагмент історії - як окремий запуск
+        history.start_run()
+        logger.info(f"💾 WebSub: {ingestor.summary()}")
+
+    signal.signal(signal.SIGTERM, lambda *args: ingestor.stop())
+    ingestor.start()
+    ingestor.subscribe_all()
+    pipeline = main_mvp.build_pipeline(parser, translator, summarizer, telegram_clients,
+                                       policy=policy, archive=archive, history=history)
+    try:
+        stats = pipeline.run(ingestor.iter_articles(checkpoint))
+        main_mvp.log_pipeline_stats(stats, ingestor.pushed_articles + ingestor.polled_articles, parser)
+    except KeyboardInterrupt:
+        logger.info("WebSub режим зупинено")
+        ingestor.stop()
+    finally:
+        ingestor.save()
+        parser.save_state()
+        checkpoint(final=True)
+
+
+if __name__ == "__main__":
+    main()